@@ -5,10 +5,11 @@ from fastapi import (
 )
 
 from fastapi.security import OAuth2PasswordRequestForm
+from kernel.routing import AppRoute
 from auth.repository.bll import UserService
 from auth.repository.dal import (
     IAuthDataAccessLayer,
-    AuthDataAccessLayer
+    get_auth_data_access_layer
 )
 from auth.authorization import (
     create_access_token,
@@ -16,7 +17,7 @@ from auth.authorization import (
 )
 
 
-authentication_router = APIRouter()
+authentication_router = APIRouter(route_class=AppRoute)
 
 
 @authentication_router.post(
@@ -26,7 +27,7 @@ authentication_router = APIRouter()
 )
 async def login(
     user_data: OAuth2PasswordRequestForm=Depends(),
-    dal: IAuthDataAccessLayer = Depends(AuthDataAccessLayer)
+    dal: IAuthDataAccessLayer = Depends(get_auth_data_access_layer)
 ) -> Token:
     """
     Authenticates a user and returns an access token.
@@ -8,13 +8,14 @@ from .schemas import (
     RegisterUser,
     RegisterUserOut
 )
+from kernel.routing import AppRoute
 from auth.repository.bll import UserService
 from auth.repository.dal import (
-    AuthDataAccessLayer,
-    IAuthDataAccessLayer
+    IAuthDataAccessLayer,
+    get_auth_data_access_layer
 )
 
-registration_router = APIRouter()
+registration_router = APIRouter(route_class=AppRoute)
 
 
 @registration_router.post(
@@ -24,7 +25,7 @@ registration_router = APIRouter()
 )
 async def register(
     user_data: RegisterUser,
-    dal: IAuthDataAccessLayer = Depends(AuthDataAccessLayer)
+    dal: IAuthDataAccessLayer = Depends(get_auth_data_access_layer)
 ) -> RegisterUserOut:
     """
     Registers a new user.
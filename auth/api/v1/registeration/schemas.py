@@ -80,3 +80,7 @@ class RegisterUserOut(BaseModel):
         username (EmailStr): The registered user's email address.
     """
     username: EmailStr
+
+    class Config:
+        # registration returns a User or a UserRecord, depending on the backend
+        orm_mode = True
@@ -1,3 +1,4 @@
 from .token import create_access_token
 from .schema import Token
 from .token import get_current_user
+from .token import decode_access_token
@@ -1,3 +1,5 @@
+import time
+import hashlib
 import logging
 from typing import Annotated
 from datetime import (
@@ -15,20 +17,27 @@ from fastapi.security import OAuth2PasswordBearer
 from kernel.settings.auth import (
     SECRET_KEY,
     ALGORITHM,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL
 )
 from auth.repository.bll import UserService
 from auth.repository.dal import (
     IAuthDataAccessLayer,
-    AuthDataAccessLayer
+    get_auth_data_access_layer
 )
 from .schema import Token
 from auth.exceptions import credentials_exception
+from utils.cache import TTLCache
+from kernel.context import current_request
+from kernel.metrics import PhaseTimer
 
 
 
 coreLogger = logging.getLogger('core')
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/login")
+# verified claims keyed by the sha256 digest of the token
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
 
 def create_access_token(data: dict) -> Token:
     """
@@ -48,9 +57,34 @@ def create_access_token(data: dict) -> Token:
     coreLogger.info(f"JWT access token was created for user: {data.get('sub')}")
     return token
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verifies the access token and returns its claims. Verified claims are
+    cached, so a token that is reused skips the signature check until it
+    expires.
+
+    Args:
+        token (str): The encoded access token.
+
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        JWTError: If the token is invalid or expired.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        ttl = TOKEN_CACHE_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
+
 async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
-        dal: IAuthDataAccessLayer = Depends(AuthDataAccessLayer)
+        dal: IAuthDataAccessLayer = Depends(get_auth_data_access_layer)
 ):
     """
     Verifies the provided access token and returns the corresponding user.
@@ -65,19 +99,22 @@ async def get_current_user(
         credentials_exception: If the access token is invalid or expired.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            coreLogger.error(
-                "Credential error while verifying access token"
-                f"user: {username}"
-            )
-            raise credentials_exception
+        with PhaseTimer('auth'):
+            payload = decode_access_token(token)
     except JWTError as e:
         coreLogger.error(
-            "Credential error while verifying access token"
-            f"user: {username}, error: {e}"
+            f"Credential error while verifying access token, error: {e}"
             )
         raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
+        coreLogger.error(
+            "Credential error while verifying access token"
+            f"user: {username}"
+        )
+        raise credentials_exception
+    context = current_request()
+    if context is not None:
+        context.user = username
     user = await UserService.get_user(dal, username)
     return user
@@ -5,6 +5,10 @@ from pydantic import (
     Field,
     EmailStr
 )
+from pymongo import (
+    IndexModel,
+    ASCENDING
+)
 
 class User(Document):
     """
@@ -16,6 +20,7 @@ class User(Document):
 
     Settings:
         name (str): The name of the database collection for User documents.
+        indexes (list): a unique index on username.
 
     Methods:
         __str__() -> str:
@@ -39,6 +44,13 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel(
+                [("username", ASCENDING)],
+                name="username_unique",
+                unique=True
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username}"
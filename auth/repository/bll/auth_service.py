@@ -8,10 +8,13 @@ from fastapi import (
 from utils.hash import Hash
 from auth.models import User
 from auth.repository.dal import IAuthDataAccessLayer
+from auth.repository.cache import user_cache
 from auth.exceptions import credentials_exception
+from database.exceptions import DuplicateEntryError
+from kernel.metrics import PhaseTimer
 
 
-coreLogger = logging.getLogger('core')
+coreLogger = logging.getLogger('core.auth')
 
 
 class UserService:
@@ -42,24 +45,29 @@ class UserService:
             HTTPException: If the username is already in use or if
             the passwords do not match.
         """
-        user = await dal.get_user(username)
-        if user:
+        if not password1 == password2:
+            coreLogger.error("User: %s, entered unmacthed passes", username)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Passwords do not match"
+            )
+        with PhaseTimer('hash'):
+            hashed_password = await Hash.bcrypt_pass_async(password1)
+        # the unique index on username rejects existing users
+        try:
+            with PhaseTimer('dal'):
+                user = await dal.create_user(username, hashed_password)
+        except DuplicateEntryError:
             coreLogger.error(
-                f"User: {username} tried to register an existing user"
+                "User: %s tried to register an existing user",
+                username
             )
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="username already in use"
             )
-        if not password1 == password2:
-            coreLogger.error(f"User: {username}, entered unmacthed passes")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Passwords do not match"
-            )
-        hashed_password = Hash.bcrypt_pass(password1)
-        coreLogger.info(f"User: {username}, was registered")
-        return await dal.create_user(username, hashed_password)
+        coreLogger.info("User: %s, was registered", username)
+        return user
 
     @classmethod
     async def verify_credentials(
@@ -83,25 +91,30 @@ class UserService:
         Raises:
             HTTPException: If the username or password is invalid.
         """
-        user = await dal.get_user(username)
+        with PhaseTimer('dal'):
+            user = await dal.get_user(username)
         if not user:
             coreLogger.error(
-                f"Login attempt with a non-existant user, username: {username}"
+                "Login attempt with a non-existant user, username: %s",
+                username
             )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Invalid credentials, "
                 "user with the provided username does not exist"
             )
-        if not Hash.verify_password(password, user.password):
+        with PhaseTimer('hash'):
+            verified = await Hash.verify_password_async(password, user.password)
+        if not verified:
             coreLogger.error(
-                f"Login attempt with wrong password, username: {username}"
+                "Login attempt with wrong password, username: %s",
+                username
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials, invalid password"
             )
-        coreLogger.info(f"user: {username} has logged-in")
+        coreLogger.info("user: %s has logged-in", username)
         return user
 
     @classmethod
@@ -111,7 +124,9 @@ class UserService:
             username: str,
     ) -> User:
         """
-        Checks if user exists if it doesn't raises credentials error
+        Checks if user exists if it doesn't raises credentials error.
+        Users are served from the user cache, concurrent lookups of the
+        same uncached user share one database query.
 
         Args:
             dal (ITaskDataAccessLayer): data access layer of user model
@@ -123,11 +138,16 @@ class UserService:
         Raises:
             credential_exception: If the username doesn't exist
         """
-        user = await dal.get_user(username)
+        with PhaseTimer('dal'):
+            user = await user_cache.get_or_load(
+                username,
+                lambda: dal.get_user(username)
+            )
         if user is None:
             coreLogger.error(
-                    "Credential error while verifying access token"
-                    f"user: {username}, user does not exist."
-                )
+                "Credential error while verifying access token"
+                "user: %s, user does not exist.",
+                username
+            )
             raise credentials_exception
         return user
@@ -0,0 +1,15 @@
+from kernel.settings.auth import (
+    USER_CACHE_SIZE,
+    USER_CACHE_TTL
+)
+from utils.cache import (
+    AsyncTTLCache,
+    SingleFlight
+)
+
+
+# users looked up by get_current_user, keyed by username
+user_cache = AsyncTTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+# user reads in flight, shared by the concurrent requests that make them
+user_read_flight = SingleFlight()
@@ -1,2 +1,6 @@
 from .auth_queryset import AuthDataAccessLayer
 from .interface import IAuthDataAccessLayer
+from .memory_auth_queryset import MemoryAuthDataAccessLayer
+from .sqlite_auth_queryset import SQLiteAuthDataAccessLayer
+from .coalesced_auth_queryset import CoalescedAuthDataAccessLayer
+from .factory import get_auth_data_access_layer
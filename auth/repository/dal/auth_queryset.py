@@ -1,7 +1,11 @@
 from typing import List
 
+from pymongo.errors import DuplicateKeyError
+
 from .interface import IAuthDataAccessLayer
 from auth.models import User
+from auth.repository.cache import user_cache
+from database.exceptions import DuplicateEntryError
 
 
 class AuthDataAccessLayer(IAuthDataAccessLayer):
@@ -40,9 +44,15 @@ class AuthDataAccessLayer(IAuthDataAccessLayer):
 
         Returns:
             User: The newly created user.
+
+        Raises:
+            DuplicateEntryError: If the username is already in use.
         """
         user = User(username=username, password=password)
-        return await user.insert()
+        try:
+            return await user.insert()
+        except DuplicateKeyError as e:
+            raise DuplicateEntryError(username) from e
 
     async def delete_user(self, user: User) -> bool:
         """
@@ -54,7 +64,15 @@ class AuthDataAccessLayer(IAuthDataAccessLayer):
         Returns:
             bool: True if the user was deleted successfully, False otherwise.
         """
-        return await user.delete()
+        # invalidated again once written, a lookup that missed the cache
+        # during the write may have cached the old user
+        user_cache.invalidate(user.username)
+        try:
+            result = await user.delete()
+        finally:
+            user_cache.invalidate(user.username)
+        # a user deleted concurrently gives a DeleteResult counting nothing
+        return result is not None and result.deleted_count > 0
 
     async def update_user(self, user: User, fields: dict) -> User:
         """
@@ -67,4 +85,8 @@ class AuthDataAccessLayer(IAuthDataAccessLayer):
         Returns:
             User: The updated user.
         """
-        return await user.update({"$set": fields})
+        user_cache.invalidate(user.username)
+        try:
+            return await user.update({"$set": fields})
+        finally:
+            user_cache.invalidate(user.username)
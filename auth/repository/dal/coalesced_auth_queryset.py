@@ -0,0 +1,97 @@
+from typing import List
+
+from .interface import IAuthDataAccessLayer
+from auth.models import User
+from utils.cache import SingleFlight
+
+
+class CoalescedAuthDataAccessLayer(IAuthDataAccessLayer):
+    """
+    Shares the user lookups of the wrapped data access layer between
+    concurrent identical calls, e.g. the logins of one user from
+    many clients at once. A write through it forgets the reads in flight
+    of the user and of the list of users.
+
+    Args:
+        dal (IAuthDataAccessLayer): the wrapped data access layer
+        flight (SingleFlight): the reads in flight, shared by every instance
+    """
+    def __init__(self, dal: IAuthDataAccessLayer, flight: SingleFlight):
+        self.dal = dal
+        self.flight = flight
+
+    def _forget(self, username: str) -> None:
+        self.flight.forget(('get_user', username))
+        self.flight.forget(('get_all_users',))
+
+    async def get_all_users(self) -> List[User]:
+        """
+        Returns a list of all users, one read answers every call in flight.
+
+        Returns:
+            List[User]: A list of all users.
+        """
+        return await self.flight.do(('get_all_users',), self.dal.get_all_users)
+
+    async def get_user(self, username: str) -> User:
+        """
+        Returns the user with the provided username, shared by the logins of
+        the user in flight.
+
+        Args:
+            username (str): The username of the user to be returned.
+
+        Returns:
+            User: The user with the provided username.
+        """
+        return await self.flight.do(
+            ('get_user', username),
+            lambda: self.dal.get_user(username)
+        )
+
+    async def create_user(self, username: str, password: str) -> User:
+        """
+        Creates a new user, then forgets the lookups of the username in
+        flight.
+
+        Args:
+            username (str): The username of the new user.
+            password (str): The password of the new user.
+
+        Returns:
+            User: The newly created user.
+        """
+        user = await self.dal.create_user(username, password)
+        self._forget(username)
+        return user
+
+    async def delete_user(self, user: User) -> bool:
+        """
+        Deletes the provided user, then forgets the lookups of the user in
+        flight.
+
+        Args:
+            user (User): The user to be deleted.
+
+        Returns:
+            bool: True if the user was deleted successfully, False otherwise.
+        """
+        deleted = await self.dal.delete_user(user)
+        self._forget(user.username)
+        return deleted
+
+    async def update_user(self, user: User, fields: dict) -> User:
+        """
+        Updates the provided user, then forgets the lookups of the user in
+        flight.
+
+        Args:
+            user (User): The user to be updated.
+            fields (dict): A dictionary of fields to update.
+
+        Returns:
+            User: The updated user.
+        """
+        user = await self.dal.update_user(user, fields)
+        self._forget(user.username)
+        return user
@@ -0,0 +1,36 @@
+from .interface import IAuthDataAccessLayer
+from .auth_queryset import AuthDataAccessLayer
+from .memory_auth_queryset import MemoryAuthDataAccessLayer
+from .sqlite_auth_queryset import SQLiteAuthDataAccessLayer
+from .coalesced_auth_queryset import CoalescedAuthDataAccessLayer
+from auth.repository.cache import user_read_flight
+from database.backends import (
+    coalesces_reads,
+    get_data_access_layer_class
+)
+from kernel.settings.database import STORAGE_BACKEND
+
+
+DATA_ACCESS_LAYERS = {
+    'mongodb': AuthDataAccessLayer,
+    'memory': MemoryAuthDataAccessLayer,
+    'sqlite': SQLiteAuthDataAccessLayer,
+}
+
+
+data_access_layer_class = get_data_access_layer_class(
+    DATA_ACCESS_LAYERS,
+    STORAGE_BACKEND
+)
+coalesce_reads = coalesces_reads(STORAGE_BACKEND)
+
+
+def get_auth_data_access_layer() -> IAuthDataAccessLayer:
+    """
+    Dependency that returns the user data access layer of the configured
+    storage backend, its reads coalesced when it is enabled.
+    """
+    dal = data_access_layer_class()
+    if coalesce_reads:
+        return CoalescedAuthDataAccessLayer(dal, user_read_flight)
+    return dal
@@ -0,0 +1,94 @@
+from typing import (
+    Dict,
+    List,
+    Optional
+)
+
+from .interface import IAuthDataAccessLayer
+from .records import UserRecord
+from auth.repository.cache import user_cache
+from database.exceptions import DuplicateEntryError
+
+
+# users of this process, keyed by username
+user_store: Dict[str, UserRecord] = {}
+
+
+class MemoryAuthDataAccessLayer(IAuthDataAccessLayer):
+    """
+    A data access layer that keeps the users in the memory of the process,
+    the counterpart of MemoryTaskDataAccessLayer. Users do not survive
+    restarts and worker processes do not share them.
+    """
+
+    async def get_all_users(self) -> List[UserRecord]:
+        """
+        Returns a list of all users of this process.
+
+        Returns:
+            List[UserRecord]: A list of all users of this process.
+        """
+        return list(user_store.values())
+
+    async def get_user(self, username: str) -> Optional[UserRecord]:
+        """
+        Returns the user with the provided username.
+
+        Args:
+            username (str): The username of the user to be returned.
+
+        Returns:
+            Optional[UserRecord]: The user with the provided username, None
+            if there is none.
+        """
+        return user_store.get(username)
+
+    async def create_user(self, username: str, password: str) -> UserRecord:
+        """
+        Creates a new user with the provided username and password.
+
+        Args:
+            username (str): The username of the new user.
+            password (str): The password of the new user.
+
+        Returns:
+            UserRecord: The newly created user.
+
+        Raises:
+            DuplicateEntryError: If the username is already in use.
+        """
+        if username in user_store:
+            raise DuplicateEntryError(username)
+        user = user_store[username] = UserRecord.new(username, password)
+        return user
+
+    async def delete_user(self, user: UserRecord) -> bool:
+        """
+        Deletes the provided user from the users of this process.
+
+        Args:
+            user (UserRecord): The user to be deleted.
+
+        Returns:
+            bool: True if the user was deleted successfully, False otherwise.
+        """
+        user_cache.invalidate(user.username)
+        return user_store.pop(user.username, None) is not None
+
+    async def update_user(self, user: UserRecord, fields: dict) -> UserRecord:
+        """
+        Updates the provided user with the provided fields.
+
+        Args:
+            user (UserRecord): The user to be updated.
+            fields (dict): A dictionary of fields to update.
+
+        Returns:
+            UserRecord: The updated user.
+        """
+        user_cache.invalidate(user.username)
+        user_store.pop(user.username, None)
+        for field, value in fields.items():
+            setattr(user, field, value)
+        user_store[user.username] = user
+        return user
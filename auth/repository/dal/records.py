@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+
+
+class UserRecord:
+    """
+    A user of the storage backends other than MongoDB, it has the
+    attributes of a User document the services and response models read.
+    """
+    __slots__ = ('id', 'username', 'password', 'created')
+
+    def __init__(
+            self,
+            id: Any,
+            username: str,
+            password: str,
+            created: datetime
+    ):
+        self.id = id
+        self.username = username
+        self.password = password
+        self.created = created
+
+    @classmethod
+    def new(cls, username: str, password: str) -> 'UserRecord':
+        return cls(ObjectId(), username, password, datetime.now())
+
+    def __str__(self):
+        return f"{self.username}"
+
+    def __repr__(self):
+        return f"<user: {self.username}>"
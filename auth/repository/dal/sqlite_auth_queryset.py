@@ -0,0 +1,176 @@
+import sqlite3
+from datetime import datetime
+from typing import (
+    List,
+    Optional
+)
+
+from .interface import IAuthDataAccessLayer
+from .records import UserRecord
+from auth.repository.cache import user_cache
+from database.sqlite import (
+    SQLitePool,
+    sqlite_pool
+)
+from database.exceptions import DuplicateEntryError
+
+
+COLUMNS = "id, username, password, created"
+UPDATABLE_COLUMNS = ('username', 'password')
+
+
+def to_record(row: Optional[tuple]) -> Optional[UserRecord]:
+    if row is None:
+        return None
+    id, username, password, created = row
+    return UserRecord(id, username, password, datetime.fromisoformat(created))
+
+
+def _fetch_all(connection: sqlite3.Connection, sql: str, params: tuple) -> list:
+    return connection.execute(sql, params).fetchall()
+
+
+def _fetch_one(
+        connection: sqlite3.Connection,
+        sql: str,
+        params: tuple
+) -> Optional[tuple]:
+    return connection.execute(sql, params).fetchone()
+
+
+class SQLiteAuthDataAccessLayer(IAuthDataAccessLayer):
+    """
+    A data access layer that stores the users in SQLite, the counterpart
+    of SQLiteTaskDataAccessLayer.
+
+    Args:
+        pool (SQLitePool): the connections, the pool of the process when
+        not given
+    """
+    def __init__(self, pool: SQLitePool = None):
+        self.pool = pool or sqlite_pool
+
+    async def get_all_users(self) -> List[UserRecord]:
+        """
+        Returns a list of all users in the users table.
+
+        Returns:
+            List[UserRecord]: A list of all users in the users table.
+        """
+        rows = await self.pool.read(
+            _fetch_all,
+            f"SELECT {COLUMNS} FROM users",
+            ()
+        )
+        return [to_record(row) for row in rows]
+
+    async def get_user(self, username: str) -> Optional[UserRecord]:
+        """
+        Returns the user with the provided username.
+
+        Args:
+            username (str): The username of the user to be returned.
+
+        Returns:
+            Optional[UserRecord]: The user with the provided username, None
+            if there is none.
+        """
+        row = await self.pool.read(
+            _fetch_one,
+            f"SELECT {COLUMNS} FROM users WHERE username = ?",
+            (username,)
+        )
+        return to_record(row)
+
+    async def create_user(self, username: str, password: str) -> UserRecord:
+        """
+        Creates a new user with the provided username and password.
+
+        Args:
+            username (str): The username of the new user.
+            password (str): The password of the new user.
+
+        Returns:
+            UserRecord: The newly created user.
+
+        Raises:
+            DuplicateEntryError: If the username is already in use.
+        """
+        user = UserRecord.new(username, password)
+        user.id = str(user.id)
+
+        def insert(connection: sqlite3.Connection) -> None:
+            try:
+                connection.execute(
+                    f"INSERT INTO users ({COLUMNS}) VALUES (?, ?, ?, ?)",
+                    (
+                        user.id,
+                        user.username,
+                        user.password,
+                        user.created.isoformat(timespec='microseconds')
+                    )
+                )
+            except sqlite3.IntegrityError as e:
+                raise DuplicateEntryError(username) from e
+
+        await self.pool.write(insert)
+        return user
+
+    async def delete_user(self, user: UserRecord) -> bool:
+        """
+        Deletes the provided user from the users table.
+
+        Args:
+            user (UserRecord): The user to be deleted.
+
+        Returns:
+            bool: True if the user was deleted successfully, False otherwise.
+        """
+        user_cache.invalidate(user.username)
+
+        def delete(connection: sqlite3.Connection) -> bool:
+            return connection.execute(
+                "DELETE FROM users WHERE id = ?",
+                (user.id,)
+            ).rowcount > 0
+
+        # the row is deleted on the writer thread of the pool, a get_user
+        # reading meanwhile on another connection can still cache it
+        try:
+            return await self.pool.write(delete)
+        finally:
+            user_cache.invalidate(user.username)
+
+    async def update_user(self, user: UserRecord, fields: dict) -> UserRecord:
+        """
+        Updates the provided user with the provided fields.
+
+        Args:
+            user (UserRecord): The user to be updated.
+            fields (dict): A dictionary of fields to update.
+
+        Returns:
+            UserRecord: The updated user.
+
+        Raises:
+            ValueError: If a field is not an updatable column.
+        """
+        unknown = set(fields) - set(UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown user fields: {', '.join(unknown)}")
+        user_cache.invalidate(user.username)
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                f"UPDATE users SET {assignments} WHERE id = ?",
+                list(fields.values()) + [user.id]
+            )
+
+        try:
+            await self.pool.write(update)
+        finally:
+            user_cache.invalidate(user.username)
+        for field, value in fields.items():
+            setattr(user, field, value)
+        return user
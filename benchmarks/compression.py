@@ -0,0 +1,80 @@
+"""
+Compares the codings and levels of settings.fastapi.COMPRESSION on the
+body of GET /v1/tasks/ for a list of tasks: compression ratio, CPU time,
+and the time to deliver the body (CPU time plus transfer) on a few link
+speeds, which is the tradeoff COMPRESSION_LEVELS tunes.
+
+Codings whose package is not installed are skipped.
+
+usage:
+    python -m benchmarks.compression --tasks 10000
+"""
+import time
+import json
+import argparse
+
+from utils.compression import (
+    CODINGS,
+    create_stream
+)
+from .task_serialization import make_documents
+
+
+LEVELS = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 8, 11),
+    'zstd': (1, 3, 9, 19),
+}
+# link speeds in bytes per second
+LINKS = {
+    '10Mbit': 10e6 / 8,
+    '100Mbit': 100e6 / 8,
+    '1Gbit': 1e9 / 8,
+}
+
+
+def make_body(tasks: int) -> bytes:
+    documents = make_documents(tasks)
+    for document in documents:
+        del document['_id'], document['revision_id']
+    return json.dumps(
+        {"tasks": documents},
+        default=str,
+        separators=(',', ':')
+    ).encode()
+
+
+def main(args: argparse.Namespace) -> None:
+    body = make_body(args.tasks)
+    print(f"body of {args.tasks} tasks: {len(body) / 1e6:.2f}MB")
+    print(
+        f"{'coding':>8} {'level':>6} {'ratio':>7} {'cpu':>9} "
+        + ' '.join(f"{link:>9}" for link in LINKS)
+    )
+    print(
+        f"{'none':>8} {'':>6} {1:>7.1f} {0:>7.1f}ms "
+        + ' '.join(f"{len(body) / speed * 1000:>7.1f}ms"
+                   for speed in LINKS.values())
+    )
+    for coding, levels in LEVELS.items():
+        if not CODINGS[coding][1]:
+            print(f"{coding:>8} skipped, its package is not installed")
+            continue
+        for level in levels:
+            start = time.perf_counter()
+            compressed = create_stream(coding, level).finish(body)
+            cpu = time.perf_counter() - start
+            print(
+                f"{coding:>8} {level:>6} {len(body) / len(compressed):>7.1f}"
+                f" {cpu * 1000:>7.1f}ms "
+                + ' '.join(
+                    f"{(cpu + len(compressed) / speed) * 1000:>7.1f}ms"
+                    for speed in LINKS.values()
+                )
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=10000)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+Seeds N tasks and measures how the task lookups of the DAL scale with and
+without the indexes declared on the models.
+
+usage:
+    python -m benchmarks.indexes --sizes 1000 10000 100000 \
+        --url mongodb://localhost:27017
+"""
+import asyncio
+import argparse
+import random
+from datetime import datetime
+
+from beanie import init_beanie
+
+from auth.models import User
+from tasks.models import Task
+from tasks.repository.dal import (
+    TaskDataAccessLayer,
+    TaskOrder,
+    TaskQuery
+)
+from .utils import (
+    get_database,
+    measure,
+    summarize
+)
+
+
+async def seed(size: int, users: int) -> None:
+    collection = Task.get_motor_collection()
+    batch = []
+    for i in range(size):
+        batch.append({
+            "title": f"task {i}",
+            "description": "benchmark task",
+            "is_completed": bool(i % 2),
+            "user": f"user{i % users}@example.com",
+            "created": datetime.now(),
+            "completed_on": datetime.now() if i % 2 else None,
+        })
+        if len(batch) == 10_000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+
+async def run_queries(size: int, users: int, queries: int) -> dict:
+    dal = TaskDataAccessLayer()
+
+    async def get_task():
+        i = random.randrange(size)
+        await dal.get_task(f"user{i % users}@example.com", f"task {i}")
+
+    async def get_all_tasks():
+        await dal.get_all_tasks(f"user{random.randrange(users)}@example.com")
+
+    async def completed_tasks():
+        await dal.get_all_tasks(
+            f"user{random.randrange(users)}@example.com",
+            TaskQuery(is_completed=True, order=TaskOrder.CREATED_DESC)
+        )
+
+    async def title_prefix():
+        await dal.get_all_tasks(
+            f"user{random.randrange(users)}@example.com",
+            TaskQuery(title_prefix=f"task {random.randrange(10)}")
+        )
+
+    return {
+        "get_task": summarize(await measure(get_task, queries)),
+        "get_all_tasks": summarize(await measure(get_all_tasks, queries)),
+        "completed_tasks": summarize(await measure(completed_tasks, queries)),
+        "title_prefix": summarize(await measure(title_prefix, queries)),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    database = get_database(args.url)
+    for size in args.sizes:
+        await database.client.drop_database(database.name)
+        await init_beanie(database=database, document_models=[User, Task])
+        await seed(size, args.users)
+
+        await Task.get_motor_collection().drop_indexes()
+        without_indexes = await run_queries(size, args.users, args.queries)
+
+        await Task.get_motor_collection().create_indexes(
+            Task.Settings.indexes
+        )
+        with_indexes = await run_queries(size, args.users, args.queries)
+
+        for name in with_indexes:
+            print(
+                f"{size:>9} docs {name:<16} "
+                f"no index: {without_indexes[name]} | "
+                f"indexed: {with_indexes[name]}"
+            )
+    await database.client.drop_database(database.name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
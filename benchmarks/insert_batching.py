@@ -0,0 +1,103 @@
+"""
+Measures the task inserts batched by settings.tasks.CREATE_BATCH_WINDOW_MS
+against one insert per create_task, for each window of --windows:
+throughput of --tasks creates from --concurrency concurrent callers, and
+the latency of each create, which the window adds to.
+
+A window of 0 is the unbatched create_task.
+
+mongomock runs on the event loop and has no network round trip to save,
+unless --url points at a local mongod.
+
+usage:
+    python -m benchmarks.insert_batching --windows 0 1 2 5 10 \
+        --concurrency 50 --tasks 2000 --url mongodb://localhost:27017
+"""
+import time
+import asyncio
+import logging
+import argparse
+from typing import List
+
+from beanie import init_beanie
+
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import TaskDataAccessLayer
+from tasks.repository.dal.task_queryset import insert_tasks
+from utils.batch import WriteBatcher
+from .utils import (
+    get_database,
+    summarize
+)
+
+
+async def run_window(
+        window_ms: float,
+        args: argparse.Namespace
+) -> dict:
+    batcher = None
+    if window_ms > 0:
+        batcher = WriteBatcher(insert_tasks, args.batch_size, window_ms / 1000)
+    dal = TaskDataAccessLayer(batcher)
+    user = "batching@example.com"
+    latencies: List[float] = []
+    indexes = iter(range(args.tasks))
+
+    async def worker():
+        for index in indexes:
+            start = time.perf_counter()
+            await dal.create_task(f"task {index}", user)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": round(args.tasks / elapsed, 1),
+        "batches": batcher.batches if batcher else args.tasks,
+        **summarize(latencies),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger('core').setLevel(logging.WARNING)
+    database = get_database(args.url)
+    await database.client.drop_database(database.name)
+    await init_beanie(database=database, document_models=[Task, TaskVersion])
+    try:
+        for window_ms in args.windows:
+            # every window starts from empty collections
+            await Task.get_motor_collection().delete_many({})
+            await TaskVersion.get_motor_collection().delete_many({})
+            result = await run_window(window_ms, args)
+            print(
+                f"window {window_ms:>5}ms"
+                f" {result['throughput']:>9.1f} inserts/s"
+                f" {result['batches']:>6} batches"
+                f" p50 {result['p50']:>8.3f}ms"
+                f" p95 {result['p95']:>8.3f}ms"
+                f" p99 {result['p99']:>8.3f}ms"
+            )
+    finally:
+        await database.client.drop_database(database.name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument(
+        '--windows',
+        type=float,
+        nargs='+',
+        default=[0, 1, 2, 5, 10]
+    )
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,47 @@
+"""
+Compares the throughput of verifying the same access token with
+jose.jwt.decode on every call against decode_access_token, which serves
+reused tokens from the verified token cache. Uses the SECRET_KEY and
+ALGORITHM of settings.toml.
+
+usage:
+    python -m benchmarks.jwt_decode --calls 100000
+"""
+import argparse
+import time
+
+from jose import jwt
+
+from kernel.settings.auth import (
+    SECRET_KEY,
+    ALGORITHM
+)
+from auth.authorization import (
+    create_access_token,
+    decode_access_token
+)
+
+
+def throughput(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return calls / (time.perf_counter() - start)
+
+
+def main(args: argparse.Namespace) -> None:
+    token = create_access_token({"sub": "benchmark@example.com"}).access_token
+    uncached = throughput(
+        lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]),
+        args.calls
+    )
+    cached = throughput(lambda: decode_access_token(token), args.calls)
+    print(f"algorithm: {ALGORITHM}")
+    print(f"jwt.decode:          {uncached:>12,.0f} decodes/s")
+    print(f"decode_access_token: {cached:>12,.0f} decodes/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=100000)
+    main(parser.parse_args())
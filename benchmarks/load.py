@@ -0,0 +1,222 @@
+"""
+Load test of kernel.application.app, run in-process through an ASGI
+client against mongomock-motor or, with --url, a local mongod.
+
+Each scenario sends --requests requests from --concurrency concurrent
+clients, in this order, on the tasks the previous ones made:
+
+    register  POST /v1/auth/register, one new user per request
+    login     POST /v1/auth/login as the same user
+    create    POST /v1/tasks/
+    list      GET /v1/tasks/
+    complete  PATCH /v1/tasks/{title}
+    delete    DELETE /v1/tasks/{title}
+
+Throughput and p50/p95/p99 latency of every scenario are written as JSON
+to --output. With --baseline the results are compared with a previous
+output and the run fails when a scenario's p95 latency grew, or its
+throughput dropped, by more than --threshold.
+
+mongomock never uses indexes and runs on the event loop, compare runs of
+the same backend on the same machine only.
+
+usage:
+    python -m benchmarks.load --requests 200 --concurrency 10 \
+        --output baseline.json
+    python -m benchmarks.load --requests 200 --concurrency 10 \
+        --baseline baseline.json --threshold 0.2
+"""
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import platform
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List
+)
+
+from .utils import (
+    app_client,
+    login,
+    summarize
+)
+
+
+PASSWORD = 'Benchmark-1'
+SCENARIOS = ('register', 'login', 'create', 'list', 'complete', 'delete')
+# what compare checks: (metric, whether a higher value is better)
+COMPARED = (('p95', False), ('throughput', True))
+
+
+async def run_scenario(
+        operation: Callable[[int], Awaitable],
+        requests: int,
+        concurrency: int
+) -> Dict[str, float]:
+    """
+    Calls `operation` with 0 .. requests - 1 from `concurrency` workers
+    and summarizes its latencies. Responses with a 4xx or 5xx status are
+    counted as errors.
+    """
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            response = await operation(index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": round(requests / elapsed, 2),
+        "errors": errors,
+        **summarize(latencies),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # every run gets its own users, so runs against a mongod do not collide
+    run_id = uuid.uuid4().hex[:8]
+    username = f"load-{run_id}@example.com"
+    titles = [f"load task {i}" for i in range(args.requests)]
+    results = {}
+    async with app_client(args.url) as client:
+        headers = await login(client, username, PASSWORD)
+        operations = {
+            'register': lambda i: client.post('/v1/auth/register', json={
+                'username': f"load-{run_id}-{i}@example.com",
+                'password1': PASSWORD,
+                'password2': PASSWORD,
+            }),
+            'login': lambda i: client.post(
+                '/v1/auth/login',
+                data={'username': username, 'password': PASSWORD}
+            ),
+            'create': lambda i: client.post(
+                '/v1/tasks/',
+                json={'title': titles[i]},
+                headers=headers
+            ),
+            'list': lambda i: client.get('/v1/tasks/', headers=headers),
+            'complete': lambda i: client.patch(
+                f'/v1/tasks/{titles[i]}',
+                headers=headers
+            ),
+            'delete': lambda i: client.delete(
+                f'/v1/tasks/{titles[i]}',
+                headers=headers
+            ),
+        }
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                operations[name],
+                args.requests,
+                args.concurrency
+            )
+            print(f"{name:>10} {format_result(results[name])}")
+    return {
+        "meta": {
+            "backend": "mongod" if args.url else "mongomock",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def format_result(result: Dict[str, float]) -> str:
+    return (
+        f"{result['throughput']:>9.1f} req/s"
+        f" p50 {result['p50']:>8.2f}ms"
+        f" p95 {result['p95']:>8.2f}ms"
+        f" p99 {result['p99']:>8.2f}ms"
+        f" errors {result['errors']}"
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compares the scenarios of two runs.
+
+    Args:
+        results (dict): output of this run
+        baseline (dict): output of the baseline run
+        threshold (float): allowed relative regression, 0.2 is 20%
+
+    Returns:
+        List[str]: a description of every regression, empty if none.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED:
+            if not base[metric]:
+                continue
+            change = (result[metric] - base[metric]) / base[metric]
+            if higher_is_better:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{name} {metric}: {base[metric]} -> {result[metric]}"
+                    f" ({change:+.0%} worse)"
+                )
+    if results["meta"] != baseline.get("meta"):
+        print(
+            "warning: the baseline ran with other parameters: "
+            f"{baseline.get('meta')}",
+            file=sys.stderr
+        )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    # per-request logs would be a large part of what is measured
+    for name in ('core', 'access'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    results = await run(args)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline:
+        regressions = compare(results, json.load(baseline), args.threshold)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument(
+        '--scenarios',
+        nargs='+',
+        choices=SCENARIOS,
+        default=list(SCENARIOS)
+    )
+    parser.add_argument('--output', default=None, help='json results file')
+    parser.add_argument('--baseline', default=None, help='json results file')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
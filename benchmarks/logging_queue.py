@@ -0,0 +1,68 @@
+"""
+Compares request throughput of GET /v1/tasks/ with the handlers of
+configs/logging/logging.toml written synchronously from the request
+against the same handlers behind a bounded queue.
+
+The file handler writes to a temporary directory and the console handler
+to /dev/null.
+
+usage:
+    python -m benchmarks.logging_queue --requests 2000
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import logging
+import logging.config
+
+from kernel.settings.logging import (
+    load_logging_config,
+    enqueue_handlers
+)
+from .utils import (
+    app_client,
+    login
+)
+
+
+def configure(directory: str, queue_size: int) -> list:
+    conf = load_logging_config()
+    conf['handlers']['coreHandler']['filename'] = os.path.join(
+        directory, 'core.log'
+    )
+    conf['handlers']['consoleHandler']['stream'] = open(os.devnull, 'w')
+    logging.config.dictConfig(conf)
+    if not queue_size:
+        return []
+    return enqueue_handlers(conf['loggers'], queue_size, 'block')
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with app_client(args.url) as client:
+        headers = await login(
+            client, 'logging-benchmark@example.com', 'Benchmark-1'
+        )
+        await client.post(
+            '/v1/tasks/',
+            json={'title': 'logging benchmark'},
+            headers=headers
+        )
+        for name, queue_size in (('synchronous', 0), ('queued', 10000)):
+            with tempfile.TemporaryDirectory() as directory:
+                listeners = configure(directory, queue_size)
+                start = time.perf_counter()
+                for _ in range(args.requests):
+                    await client.get('/v1/tasks/', headers=headers)
+                elapsed = time.perf_counter() - start
+                for listener in listeners:
+                    listener.stop()
+            print(f"{name:<12} {args.requests / elapsed:>10,.0f} requests/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--requests', type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
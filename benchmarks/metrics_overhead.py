@@ -0,0 +1,78 @@
+"""
+Measures the per-request cost of RequestContextMiddleware (request
+context, latency histogram, in-flight gauge) and of one PhaseTimer.
+
+The middleware wraps an ASGI app that answers right away and is called
+directly, without a server or client, so the difference from calling the
+bare app is the cost of the middleware alone. The access logger is
+disabled so logging is not part of the number.
+
+usage:
+    python -m benchmarks.metrics_overhead --requests 100000
+"""
+import time
+import asyncio
+import argparse
+import logging
+
+from kernel.context import RequestContext, request_context
+from kernel.metrics import PhaseTimer
+from kernel.middleware import RequestContextMiddleware
+
+
+class Route:
+    path = '/v1/tasks/'
+
+
+SCOPE = {'type': 'http', 'method': 'GET', 'path': '/v1/tasks/'}
+
+
+async def endpoint(scope, receive, send):
+    scope['route'] = Route
+    await send({'type': 'http.response.start', 'status': 200})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def receive():
+    return {'type': 'http.request'}
+
+
+async def send(message):
+    pass
+
+
+async def per_request(app, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def per_phase(phases: int) -> float:
+    token = request_context.set(RequestContext(dict(SCOPE, route=Route)))
+    start = time.perf_counter()
+    for _ in range(phases):
+        with PhaseTimer('dal'):
+            pass
+    elapsed = time.perf_counter() - start
+    request_context.reset(token)
+    return elapsed / phases
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger('access').disabled = True
+    bare = await per_request(endpoint, args.requests)
+    wrapped = await per_request(
+        RequestContextMiddleware(endpoint),
+        args.requests
+    )
+    print(f"bare app         {bare * 1e6:>8.2f} us/request")
+    print(f"with middleware  {wrapped * 1e6:>8.2f} us/request")
+    print(f"overhead         {(wrapped - bare) * 1e6:>8.2f} us/request")
+    print(f"phase timer      {per_phase(args.requests) * 1e6:>8.2f} us/phase")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=100000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Mixes logins with GET /v1/tasks/ reads and compares the latency of the
+reads when bcrypt runs on the event loop against when it runs on the hash
+worker pool.
+
+usage:
+    python -m benchmarks.password_hashing --logins 20 --readers 10
+"""
+import asyncio
+import argparse
+import time
+
+from utils.hash import Hash
+from .utils import (
+    app_client,
+    login,
+    summarize
+)
+
+
+USERNAME = 'hash-benchmark@example.com'
+PASSWORD = 'Benchmark-1'
+
+
+async def run_mode(client, headers: dict, args: argparse.Namespace) -> dict:
+    read_latencies = []
+    logins_done = asyncio.Event()
+
+    async def do_logins():
+        await asyncio.gather(*(
+            client.post(
+                '/v1/auth/login',
+                data={'username': USERNAME, 'password': PASSWORD}
+            )
+            for _ in range(args.logins)
+        ))
+        logins_done.set()
+
+    async def read():
+        while not logins_done.is_set():
+            start = time.perf_counter()
+            await client.get('/v1/tasks/', headers=headers)
+            read_latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(do_logins(), *(read() for _ in range(args.readers)))
+    return {
+        "logins_per_second": round(
+            args.logins / (time.perf_counter() - start), 2
+        ),
+        "reads": summarize(read_latencies),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    pooled = Hash.verify_password_async
+
+    async def blocking(plain_password: str, hashed_password: str) -> bool:
+        return Hash.verify_password(plain_password, hashed_password)
+
+    async with app_client(args.url) as client:
+        headers = await login(client, USERNAME, PASSWORD)
+        for i in range(20):
+            await client.post(
+                '/v1/tasks/',
+                json={'title': f'benchmark task {i}'},
+                headers=headers
+            )
+
+        Hash.verify_password_async = staticmethod(blocking)
+        print("on event loop:", await run_mode(client, headers, args))
+        Hash.verify_password_async = staticmethod(pooled)
+        print("on hash pool: ", await run_mode(client, headers, args))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--readers', type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
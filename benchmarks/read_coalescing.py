@@ -0,0 +1,114 @@
+"""
+Compares bursts of identical concurrent reads, as sent by a dashboard
+refresh, with and without the coalescing of settings.storage.COALESCE_READS:
+
+    plain      every call queries the data access layer
+    coalesced  the calls of a burst share the queries in flight
+
+Each burst is --concurrency concurrent get_task and get_tasks_page calls
+of one user, the columns are the time of a burst and the queries it made.
+
+mongodb runs on mongomock-motor, which runs on the event loop, unless
+--url points at a local mongod. sqlite writes to a temporary file.
+
+usage:
+    python -m benchmarks.read_coalescing --concurrency 1 10 50 --bursts 50
+"""
+import os
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+
+from beanie import init_beanie
+
+from database.sqlite import SQLitePool
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import (
+    ITaskDataAccessLayer,
+    TaskDataAccessLayer,
+    SQLiteTaskDataAccessLayer,
+    CoalescedTaskDataAccessLayer
+)
+from utils.cache import SingleFlight
+from .utils import (
+    get_database,
+    measure,
+    summarize
+)
+
+
+USER = 'coalescing-benchmark@example.com'
+TASKS = 200
+
+
+async def run_bursts(
+        dal: ITaskDataAccessLayer,
+        concurrency: int,
+        bursts: int
+) -> dict:
+    async def burst():
+        await asyncio.gather(*(
+            call
+            for _ in range(concurrency)
+            for call in (
+                dal.get_task(USER, 'task 0'),
+                dal.get_tasks_page(USER, 50)
+            )
+        ))
+
+    return summarize(await measure(burst, bursts))
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger('core').setLevel(logging.WARNING)
+    database = get_database(args.url)
+    await database.client.drop_database(database.name)
+    await init_beanie(database=database, document_models=[Task, TaskVersion])
+
+    directory = tempfile.mkdtemp()
+    pool = SQLitePool(os.path.join(directory, 'benchmark.sqlite3'), readers=4)
+    await pool.open()
+
+    backends = {
+        'mongodb': TaskDataAccessLayer(),
+        'sqlite': SQLiteTaskDataAccessLayer(pool),
+    }
+    try:
+        for name, dal in backends.items():
+            await dal.create_tasks(
+                USER,
+                [(f"task {i}", None) for i in range(TASKS)]
+            )
+            print(name)
+            for concurrency in args.concurrency:
+                flight = SingleFlight()
+                coalesced = CoalescedTaskDataAccessLayer(dal, flight)
+                plain = await run_bursts(dal, concurrency, args.bursts)
+                shared = await run_bursts(coalesced, concurrency, args.bursts)
+                print(
+                    f"    concurrency {concurrency:>4}"
+                    f"  plain p50 {plain['p50']:>8.3f}ms"
+                    f" {2 * concurrency:>5} queries"
+                    f"  coalesced p50 {shared['p50']:>8.3f}ms"
+                    f" {flight.calls / args.bursts:>5.1f} queries"
+                )
+    finally:
+        await pool.close()
+        shutil.rmtree(directory)
+        await database.client.drop_database(database.name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--bursts', type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
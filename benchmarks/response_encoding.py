@@ -0,0 +1,76 @@
+"""
+Compares the response encoders of settings.fastapi.RESPONSE_ENCODER on
+the body of GET /v1/tasks/ for large task lists:
+
+    json    fastapi's path: validate against the response model,
+            jsonable_encoder, then JSONResponse (json.dumps)
+    orjson  kernel.routing.AppRoute: validate against the response model,
+            then ORJSONResponse straight from the validated model
+
+Both start from the projected dicts the DAL returns and produce the same
+bytes.
+
+usage:
+    python -m benchmarks.response_encoding --sizes 1000 10000 100000
+"""
+import time
+import asyncio
+import argparse
+
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse
+)
+from fastapi.routing import serialize_response
+
+from kernel.routing import AppRoute
+from tasks.api.v1.schemas import TaskListSchema
+from .task_serialization import make_documents
+
+
+async def endpoint() -> TaskListSchema:
+    pass
+
+
+ROUTE = AppRoute('/', endpoint, response_model=TaskListSchema)
+
+
+async def json_path(content: dict) -> bytes:
+    body = await serialize_response(
+        field=ROUTE.response_field,
+        response_content=content
+    )
+    return JSONResponse(body).body
+
+
+async def orjson_path(content: dict) -> bytes:
+    return ORJSONResponse(ROUTE.validate_response(content)).body
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'tasks':>8} {'encoder':>8} {'time':>10} {'MB/s':>8}")
+    for size in args.sizes:
+        content = {"tasks": [
+            {key: value for key, value in document.items()
+             if key != 'revision_id'}
+            for document in make_documents(size)
+        ]}
+        bodies = []
+        for name, path in (('json', json_path), ('orjson', orjson_path)):
+            start = time.perf_counter()
+            body = await path(content)
+            elapsed = time.perf_counter() - start
+            bodies.append(body)
+            print(
+                f"{size:>8} {name:>8} {elapsed * 1000:>8.1f}ms"
+                f" {len(body) / elapsed / 1e6:>8.1f}"
+            )
+        assert bodies[0] == bodies[1], "the encoders produced different bodies"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args()))
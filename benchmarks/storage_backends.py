@@ -0,0 +1,129 @@
+"""
+Compares the task data access layers of the storage backends of
+settings.storage.BACKEND on the same operations: creating tasks one by
+one and in bulk, reading one task, the whole list and a page, then
+completing and deleting them.
+
+mongodb runs on mongomock-motor, which never uses indexes and runs on the
+event loop, unless --url points at a local mongod. sqlite writes to a
+temporary file.
+
+usage:
+    python -m benchmarks.storage_backends --tasks 1000 --queries 200 \
+        --url mongodb://localhost:27017
+"""
+import os
+import time
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+
+from beanie import init_beanie
+
+from database.sqlite import SQLitePool
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import (
+    ITaskDataAccessLayer,
+    TaskDataAccessLayer,
+    MemoryTaskDataAccessLayer,
+    SQLiteTaskDataAccessLayer
+)
+from .utils import (
+    get_database,
+    measure,
+    summarize
+)
+
+
+USER = 'storage-benchmark@example.com'
+BULK_USER = 'storage-benchmark-bulk@example.com'
+
+
+async def run_operations(
+        dal: ITaskDataAccessLayer,
+        tasks: int,
+        queries: int
+) -> dict:
+    titles = [f"task {i}" for i in range(tasks)]
+    created = iter(titles)
+    completed = iter(titles)
+    deleted = iter(titles)
+    results = {}
+
+    async def create_task():
+        await dal.create_task(next(created), USER)
+
+    async def get_task():
+        await dal.get_task(USER, random.choice(titles))
+
+    async def get_all_tasks():
+        await dal.get_all_tasks(USER)
+
+    async def get_tasks_page():
+        await dal.get_tasks_page(USER, 100)
+
+    async def complete_task():
+        await dal.complete_task(USER, next(completed))
+
+    async def remove_task():
+        await dal.remove_task(USER, next(deleted))
+
+    results["create_task"] = summarize(await measure(create_task, tasks))
+    start = time.perf_counter()
+    await dal.create_tasks(BULK_USER, [(title, None) for title in titles])
+    results["create_tasks (bulk)"] = {
+        "tasks_per_second": round(tasks / (time.perf_counter() - start), 1)
+    }
+    results["get_task"] = summarize(await measure(get_task, queries))
+    results["get_all_tasks"] = summarize(
+        await measure(get_all_tasks, max(1, queries // 10))
+    )
+    results["get_tasks_page"] = summarize(await measure(get_tasks_page, queries))
+    results["complete_task"] = summarize(await measure(complete_task, tasks))
+    results["remove_task"] = summarize(await measure(remove_task, tasks))
+    return results
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger('core').setLevel(logging.WARNING)
+    database = get_database(args.url)
+    await database.client.drop_database(database.name)
+    await init_beanie(database=database, document_models=[Task, TaskVersion])
+
+    directory = tempfile.mkdtemp()
+    pool = SQLitePool(os.path.join(directory, 'benchmark.sqlite3'), readers=4)
+    await pool.open()
+
+    backends = {
+        'mongodb': TaskDataAccessLayer(),
+        'memory': MemoryTaskDataAccessLayer(),
+        'sqlite': SQLiteTaskDataAccessLayer(pool),
+    }
+    try:
+        for name, dal in backends.items():
+            print(f"{name} ({args.tasks} tasks)")
+            for operation, result in (
+                    await run_operations(dal, args.tasks, args.queries)
+            ).items():
+                print(f"    {operation:<20} {result}")
+    finally:
+        await pool.close()
+        shutil.rmtree(directory)
+        await database.client.drop_database(database.name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--url', default=None, help='mongodb url')
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
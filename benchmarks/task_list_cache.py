@@ -0,0 +1,94 @@
+"""
+Compares serving the body of GET /v1/tasks/ through the task list cache
+of settings.tasks.TASK_LIST_CACHE with building it on every request:
+
+    miss    validate the projected dicts against the response model and
+            encode them, then store the bytes
+    local   read the bytes from the in-process LRU backend
+    shared  read the bytes from the shared backend, over an in-memory
+            fake of the redis client, so the network is left out
+
+Database time is left out as well, the documents are built in memory,
+so the miss column is a lower bound of what a hit saves.
+
+usage:
+    python -m benchmarks.task_list_cache --sizes 100 1000 10000
+"""
+import time
+import asyncio
+import argparse
+from typing import Dict, Optional
+
+from kernel.routing import render_body
+from tasks.api.v1.schemas import TaskListSchema
+from utils.cache import (
+    LocalCacheBackend,
+    ReadThroughCache,
+    SharedCacheBackend
+)
+from .task_serialization import make_documents
+
+
+class FakeSharedClient:
+    """
+    The part of redis.asyncio.Redis the shared backend uses, in memory.
+    """
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+async def per_read(cache: ReadThroughCache, loader, reads: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reads):
+        await cache.get_or_load('user', loader)
+    return (time.perf_counter() - start) / reads
+
+
+async def main(args: argparse.Namespace) -> None:
+    caches = {
+        'local': ReadThroughCache(LocalCacheBackend(maxsize=10, ttl=60)),
+        'shared': ReadThroughCache(
+            SharedCacheBackend(FakeSharedClient(), ttl=60)
+        ),
+    }
+    print(f"{'tasks':>8} {'miss':>10} {'local':>10} {'shared':>10}")
+    for size in args.sizes:
+        views = [
+            {key: value for key, value in document.items()
+             if key != 'revision_id'}
+            for document in make_documents(size)
+        ]
+
+        async def load() -> bytes:
+            return render_body(TaskListSchema(tasks=views))
+
+        start = time.perf_counter()
+        body = await load()
+        miss = time.perf_counter() - start
+        timings = []
+        for cache in caches.values():
+            await cache.invalidate('user')
+            assert await cache.get_or_load('user', load) == body
+            timings.append(await per_read(cache, load, args.reads))
+        print(
+            f"{size:>8} {miss * 1000:>8.2f}ms"
+            + ''.join(f" {timing * 1e6:>8.2f}us" for timing in timings)
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[100, 1000, 10000]
+    )
+    parser.add_argument('--reads', type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""
+Compares the cost of turning the documents of a task list into the JSON
+response body of GET /v1/tasks/:
+
+    documents  parse every document into a Task document, build a
+               TaskListSchema from them, then let FastAPI validate and
+               encode the response as it did before
+    views      pass the projected dicts to FastAPI, which validates them
+               once against the response model and encodes them
+
+Database time is left out, the documents are built in memory.
+
+usage:
+    python -m benchmarks.task_serialization --sizes 1000 10000 100000
+"""
+import time
+import json
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from beanie import init_beanie
+from beanie.odm.utils.parsing import parse_obj
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from tasks.models import Task
+from tasks.api.v1.schemas import TaskListSchema
+from .utils import get_database
+
+
+RESPONSE_FIELD = create_response_field(name='response', type_=TaskListSchema)
+
+
+def make_documents(size: int) -> list:
+    created = datetime(2024, 1, 1)
+    return [
+        {
+            '_id': ObjectId(),
+            'revision_id': None,
+            'title': f'task {i}',
+            'description': 'a task of the serialization benchmark',
+            'is_completed': bool(i % 2),
+            'user': 'serialization-benchmark@example.com',
+            'created': created + timedelta(seconds=i),
+            'completed_on': created + timedelta(days=1) if i % 2 else None,
+        }
+        for i in range(size)
+    ]
+
+
+async def encode(content) -> bytes:
+    body = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content=content
+    )
+    return json.dumps(body).encode()
+
+
+async def documents_path(documents: list) -> bytes:
+    tasks = [parse_obj(Task, document) for document in documents]
+    return await encode(TaskListSchema(tasks=tasks))
+
+
+async def views_path(documents: list) -> bytes:
+    return await encode({"tasks": documents})
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Task documents can only be built once beanie is initialized
+    await init_beanie(database=get_database(), document_models=[Task])
+    print(f"{'tasks':>8} {'documents':>12} {'views':>12} {'speedup':>8}")
+    for size in args.sizes:
+        documents = make_documents(size)
+        # the projection only fetches the response fields and _id
+        views = [
+            {key: value for key, value in document.items()
+             if key != 'revision_id'}
+            for document in documents
+        ]
+        timings = []
+        for path, content in ((documents_path, documents), (views_path, views)):
+            start = time.perf_counter()
+            await path(content)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{size:>8} {timings[0] * 1000:>10.1f}ms {timings[1] * 1000:>10.1f}ms"
+            f" {timings[0] / timings[1]:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+import time
+import statistics
+from contextlib import asynccontextmanager
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    AsyncIterator
+)
+
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorDatabase
+)
+
+
+def get_database(url: str = None, name: str = 'todo_bench') -> AsyncIOMotorDatabase:
+    """
+    Returns the benchmark database, on the mongod at `url` or, when no url
+    is given, on an in-process mongomock-motor stand-in.
+
+    Keep in mind mongomock never uses indexes, so its numbers are only
+    useful for smoke runs; use a local mongod for real measurements.
+    """
+    if url:
+        return AsyncIOMotorClient(url)[name]
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit(
+            "mongomock-motor is not installed, "
+            "install it or pass --url of a local mongod"
+        )
+    return AsyncMongoMockClient()[name]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarizes latency samples (in seconds) as milliseconds percentiles.
+    """
+    ordered = sorted(samples)
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))
+        return round(ordered[index] * 1000, 3)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+    }
+
+
+async def measure(
+        func: Callable[[], Awaitable],
+        repeat: int
+) -> List[float]:
+    """
+    Awaits `func` `repeat` times sequentially and returns the latencies.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@asynccontextmanager
+async def app_client(url: str = None) -> AsyncIterator:
+    """
+    Starts kernel.application.app in-process and yields an httpx client
+    bound to it. The app talks to the mongod at `url` or, when no url is
+    given, to mongomock-motor.
+
+    Needs httpx and a settings.toml in the working directory. With --url
+    point it at a throwaway mongod, the app writes to its todo_db.
+    """
+    from httpx import AsyncClient, ASGITransport
+
+    import database.core
+    from kernel.application import app
+
+    database.core.create_client = lambda: get_database(url).client
+    await app.router.startup()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url='http://benchmark'
+        ) as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+async def login(client, username: str, password: str) -> Dict[str, str]:
+    """
+    Registers the user if needed and returns its authorization header.
+    """
+    await client.post('/v1/auth/register', json={
+        'username': username,
+        'password1': password,
+        'password2': password,
+    })
+    response = await client.post(
+        '/v1/auth/login',
+        data={'username': username, 'password': password}
+    )
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,53 @@
+from typing import (
+    Dict,
+    Type,
+    TypeVar
+)
+
+from kernel.settings.database import COALESCE_READS
+
+
+DataAccessLayer = TypeVar('DataAccessLayer')
+
+
+def get_data_access_layer_class(
+        layers: Dict[str, Type[DataAccessLayer]],
+        backend: str
+) -> Type[DataAccessLayer]:
+    """
+    takes the data access layer classes of a model and the name of a
+    storage backend and returns the class of the backend.
+
+    Args:
+        layers (Dict[str, Type[DataAccessLayer]]): data access layer class
+        of each storage backend
+        backend (str): name of the storage backend
+
+    Returns:
+        Type[DataAccessLayer]: the data access layer class
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    try:
+        return layers[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend: {backend}, expected one of "
+            f"{', '.join(layers)}"
+        )
+
+
+def coalesces_reads(backend: str) -> bool:
+    """
+    takes the name of a storage backend and returns whether its concurrent
+    identical reads share one call. Calls to the memory backend never
+    await, no two of them are ever in flight together.
+
+    Args:
+        backend (str): name of the storage backend
+
+    Returns:
+        bool: True if the reads are coalesced
+    """
+    return COALESCE_READS and backend != 'memory'
@@ -1,14 +1,161 @@
-from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+from typing import Dict, List, Type
 
-from kernel.settings import DATABASE_URL
+from beanie import (
+    Document,
+    init_beanie
+)
+from beanie.odm.fields import IndexModelField
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorDatabase
+)
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from kernel.settings.database import (
+    DATABASE_URL,
+    MAX_POOL_SIZE,
+    MIN_POOL_SIZE,
+    MAX_IDLE_TIME_MS,
+    WAIT_QUEUE_TIMEOUT_MS,
+    COMPRESSORS,
+    READ_PREFERENCE
+)
 from auth.models import User
-from tasks.models import Task
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from .monitoring import (
+    pool_monitor,
+    request_timing_listener,
+    command_monitor
+)
+
+
+coreLogger = logging.getLogger('core')
+
+DOCUMENT_MODELS = [User, Task, TaskVersion]
+
+
+def create_client() -> AsyncIOMotorClient:
+    """
+    Creates the Motor client with the pool options of settings.mongodb,
+    options that are not set keep the driver defaults.
+
+    Returns:
+        AsyncIOMotorClient: the client, shared by the whole process
+    """
+    options = {
+        "maxPoolSize": MAX_POOL_SIZE,
+        "minPoolSize": MIN_POOL_SIZE,
+        "maxIdleTimeMS": MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": WAIT_QUEUE_TIMEOUT_MS,
+        "compressors": COMPRESSORS or None,
+        "readPreference": READ_PREFERENCE,
+    }
+    return AsyncIOMotorClient(
+        DATABASE_URL,
+        event_listeners=[
+            pool_monitor,
+            request_timing_listener,
+            command_monitor
+        ],
+        **{key: value for key, value in options.items() if value is not None}
+    )
+
+
+async def init_db() -> AsyncIOMotorClient:
+    """
+    Connects to the database, initializes beanie and verifies the indexes.
+
+    Returns:
+        AsyncIOMotorClient: the client, to be closed by close_db
+    """
+    client = create_client()
+    command_monitor.attach(client)
+    database = client.todo_db
+
+    # Initialize beanie with the document models, this also builds the
+    # indexes declared in their Settings
+    try:
+        await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+    except OperationFailure as e:
+        coreLogger.critical(f"Failed to build database indexes, error: {e}")
+        await verify_indexes(database, DOCUMENT_MODELS)
+        client.close()
+        raise
+    await verify_indexes(database, DOCUMENT_MODELS)
+    return client
+
+
+def close_db(client: AsyncIOMotorClient) -> None:
+    """
+    Closes the connections of the client.
+    """
+    client.close()
+
+
+async def verify_indexes(
+        database: AsyncIOMotorDatabase,
+        document_models: List[Type[Document]]
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compares the indexes declared on the document models with the ones
+    that exist in the database and logs every missing or conflicting index.
+
+    An index is conflicting when an index on the same fields exists but
+    with different options (e.g. it is not unique).
 
+    Args:
+        database (AsyncIOMotorDatabase): the database to be inspected
+        document_models (List[Type[Document]]): beanie document models
 
-async def init_db():
-    # Create Motor client
-    client = AsyncIOMotorClient(DATABASE_URL)
+    Returns:
+        Dict[str, Dict[str, List[str]]]: names of the missing and
+        conflicting indexes per collection.
+    """
+    report = {}
+    for model in document_models:
+        collection_name = model.Settings.name
+        declared = [
+            IndexModelField(index)
+            for index in getattr(model.Settings, 'indexes', [])
+        ]
+        # built by hand since from_motor_index_information skips every
+        # index with an _id key, compound ones included
+        existing = [
+            IndexModelField(IndexModel(
+                details["key"],
+                name=name,
+                **{k: v for k, v in details.items() if k not in ("key", "ns")}
+            ))
+            for name, details in (
+                await database[collection_name].index_information()
+            ).items()
+        ]
+        missing, conflicting = [], []
+        for index in declared:
+            same_fields = [i for i in existing if i.same_fields(index)]
+            if not same_fields:
+                missing.append(index.name)
+            elif index not in same_fields:
+                conflicting.append(index.name)
 
-    # Initialize beanie with the Product document class and a database
-    await init_beanie(database=client.todo_db, document_models=[User, Task])
+        for name in missing:
+            coreLogger.error(
+                f"Index {name} is missing on collection {collection_name}"
+            )
+        for name in conflicting:
+            coreLogger.error(
+                f"Index {name} on collection {collection_name} conflicts "
+                "with an existing index on the same fields"
+            )
+        if not missing and not conflicting:
+            coreLogger.info(f"Indexes of collection {collection_name} verified")
+        report[collection_name] = {
+            "missing": missing,
+            "conflicting": conflicting
+        }
+    return report
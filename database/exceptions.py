@@ -0,0 +1,5 @@
+class DuplicateEntryError(Exception):
+    """
+    Raised by the data access layers when a write violates a unique
+    index, so the services do not depend on the database driver errors.
+    """
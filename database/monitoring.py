@@ -0,0 +1,355 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import (
+    Any,
+    Dict,
+    Optional
+)
+
+from pymongo import monitoring
+
+from kernel.context import current_request
+from kernel.metrics import (
+    Histogram,
+    registry
+)
+from kernel.settings.database import (
+    SLOW_QUERY_MS,
+    EXPLAIN_SAMPLE_RATE
+)
+
+
+dbLogger = logging.getLogger('core.db')
+
+# where the filter of each command is, aggregate uses its first $match
+FILTER_FIELDS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+}
+EXPLAINABLE_COMMANDS = {
+    'find',
+    'aggregate',
+    'count',
+    'distinct',
+    'findAndModify',
+    'update',
+    'delete',
+}
+# fields of a command that explain does not accept
+SESSION_FIELDS = {'lsid', 'txnNumber', 'readConcern', 'writeConcern'}
+
+
+def query_shape(query: Any) -> Any:
+    """
+    Replaces the values of a query with "?" and keeps its fields and
+    operators, so queries that only differ by their values share a shape.
+    """
+    if isinstance(query, dict):
+        return {key: query_shape(value) for key, value in query.items()}
+    if isinstance(query, list) and all(isinstance(v, dict) for v in query):
+        return [query_shape(value) for value in query]
+    return '?'
+
+
+def command_filter(command_name: str, command: dict) -> Optional[dict]:
+    """
+    Returns the filter of a command, None for commands without one.
+    """
+    if command_name in FILTER_FIELDS:
+        return command.get(FILTER_FIELDS[command_name])
+    if command_name in ('update', 'delete'):
+        statements = command.get(f'{command_name}s') or [{}]
+        return statements[0].get('q')
+    if command_name == 'aggregate':
+        pipeline = command.get('pipeline') or [{}]
+        return pipeline[0].get('$match')
+    return None
+
+
+def winning_stages(plan: dict):
+    """
+    Yields the stages of an explained query plan, from the root down.
+    """
+    yield plan.get('stage')
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from winning_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from winning_stages(child)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Tracks the connection pool of the motor client: connections open and
+    in use, and how long checkouts wait for a free connection.
+
+    pymongo runs the checkouts on motor's executor threads, the start of a
+    checkout is kept per thread to measure its wait.
+    """
+    def __init__(self):
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(
+            self._local, 'started', time.perf_counter()
+        )
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+            }
+
+
+class RequestTimingListener(monitoring.CommandListener):
+    """
+    Adds the duration of every database command to the db_time of the
+    request that issued it.
+
+    motor copies the context of the caller to the executor thread that
+    runs the command, so the request context is visible here.
+    """
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._add(event.duration_micros)
+
+    def failed(self, event):
+        self._add(event.duration_micros)
+
+    @staticmethod
+    def _add(duration_micros: int) -> None:
+        context = current_request()
+        if context is not None:
+            context.db_time += duration_micros / 1_000_000
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Aggregates the latency of the database commands per collection and
+    command, logs the commands slower than `slow_query_ms` with the shape
+    of their filter, and explains a sample of the queries to flag the ones
+    that scan the whole collection (COLLSCAN).
+
+    pymongo calls it from motor's executor threads. The latencies are
+    observed and the explains run on the event loop passed to `attach`,
+    each shape is explained once.
+
+    Attributes:
+        latency (Histogram): command latency per collection and command.
+        slow_query_ms (float): threshold of the slow query log, 0 disables.
+        explain_sample_rate (float): share of the queries explained.
+    """
+    def __init__(self, slow_query_ms: float, explain_sample_rate: float):
+        self.latency = registry.register(Histogram(
+            'mongodb_command_duration_seconds',
+            'Latency of the database commands',
+            ('collection', 'command')
+        ))
+        self.slow_query_ms = slow_query_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.slow_queries = 0
+        self.collscans = 0
+        self.explained = 0
+        self._commands: Dict[tuple, tuple] = {}
+        self._explained_shapes = set()
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, client) -> None:
+        """
+        Gives the monitor the client and the running event loop it runs
+        the explains with.
+        """
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._commands[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else '',
+            event.database_name,
+            event.command
+        )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event) -> None:
+        started = self._commands.pop(
+            (event.connection_id, event.request_id), None
+        )
+        if started is None:
+            return
+        collection, database_name, command = started
+        duration = event.duration_micros / 1_000_000
+        self._observe(duration, collection, event.command_name)
+
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        if self.slow_query_ms and duration * 1000 >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            dbLogger.warning(
+                "Slow %s on %s took %.1fms, filter: %s",
+                event.command_name,
+                collection,
+                duration * 1000,
+                query_shape(command_filter(event.command_name, command)),
+                extra={"fields": {
+                    "collection": collection,
+                    "command": event.command_name,
+                    "duration": duration,
+                }}
+            )
+        if (
+            self._loop is not None
+            and self.explain_sample_rate
+            and random.random() < self.explain_sample_rate
+        ):
+            self._loop.call_soon_threadsafe(
+                self._schedule_explain,
+                database_name,
+                collection,
+                event.command_name,
+                command
+            )
+
+    def _observe(self, duration: float, collection: str, command: str) -> None:
+        # the histogram is only changed on the event loop, where /metrics
+        # renders it, a new series added from this thread during a scrape
+        # would break the iteration over the series
+        if self._loop is None:
+            self.latency.observe(duration, collection, command)
+            return
+        try:
+            self._loop.call_soon_threadsafe(
+                self.latency.observe,
+                duration,
+                collection,
+                command
+            )
+        except RuntimeError:
+            # the loop is closed, the process is shutting down
+            pass
+
+    def _schedule_explain(
+            self,
+            database_name: str,
+            collection: str,
+            command_name: str,
+            command: dict
+    ) -> None:
+        shape = repr((
+            collection,
+            command_name,
+            query_shape(command_filter(command_name, command))
+        ))
+        if shape in self._explained_shapes:
+            return
+        self._explained_shapes.add(shape)
+        asyncio.ensure_future(
+            self._explain(database_name, collection, command_name, command)
+        )
+
+    async def _explain(
+            self,
+            database_name: str,
+            collection: str,
+            command_name: str,
+            command: dict
+    ) -> None:
+        explained = {
+            key: value for key, value in command.items()
+            if not key.startswith('$') and key not in SESSION_FIELDS
+        }
+        try:
+            result = await self._client[database_name].command(
+                'explain', explained, verbosity='queryPlanner'
+            )
+        except Exception as e:
+            dbLogger.debug("Could not explain %s: %s", command_name, e)
+            return
+        self.explained += 1
+        plan = result.get('queryPlanner', {}).get('winningPlan', {})
+        if 'COLLSCAN' in winning_stages(plan):
+            self.collscans += 1
+            dbLogger.warning(
+                "%s on %s scans the whole collection (COLLSCAN), filter: %s",
+                command_name,
+                collection,
+                query_shape(command_filter(command_name, command))
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "slow_queries": self.slow_queries,
+            "explained": self.explained,
+            "collscans": self.collscans,
+        }
+
+
+pool_monitor = PoolMonitor()
+request_timing_listener = RequestTimingListener()
+command_monitor = CommandMonitor(SLOW_QUERY_MS, EXPLAIN_SAMPLE_RATE)
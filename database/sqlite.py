@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional
+)
+
+from kernel.settings.database import (
+    SQLITE_PATH,
+    SQLITE_READERS,
+    SQLITE_SYNCHRONOUS
+)
+
+
+coreLogger = logging.getLogger('core')
+
+# statements prepared and kept by every connection, the data access
+# layers use a fixed set of statement texts so they are all reused
+CACHED_STATEMENTS = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS username_unique ON users (username);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    is_completed INTEGER NOT NULL DEFAULT 0,
+    created TEXT NOT NULL,
+    completed_on TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS user_title_unique ON tasks (user, title);
+CREATE INDEX IF NOT EXISTS user_created ON tasks (user, created, id);
+CREATE INDEX IF NOT EXISTS user_status_created
+    ON tasks (user, is_completed, created, id);
+CREATE INDEX IF NOT EXISTS user_completed_on ON tasks (user, completed_on);
+
+CREATE TABLE IF NOT EXISTS task_versions (
+    user TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteConnection:
+    """
+    A sqlite3 connection with a thread of its own, every call runs on that
+    thread so the event loop never waits for the disk.
+
+    A function given to `run` gets the connection and does all of its
+    statements in one hop to the thread, rather than one hop per
+    statement.
+    """
+    def __init__(self, path: str, synchronous: str):
+        self.path = path
+        self.synchronous = synchronous
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='sqlite')
+
+    def _connect(self) -> None:
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            cached_statements=CACHED_STATEMENTS
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        connection.execute("PRAGMA busy_timeout = 5000")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        self._connection = connection
+
+    async def _call(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def open(self) -> None:
+        await self._call(self._connect)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs func(connection, *args) on the thread of the connection.
+        """
+        return await self._call(func, self._connection, *args)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._call(self._connection.close)
+            self._connection = None
+        self._executor.shutdown(wait=False)
+
+
+def _transaction(
+        connection: sqlite3.Connection,
+        func: Callable[..., Any],
+        *args
+) -> Any:
+    # IMMEDIATE takes the write lock up front, so the transaction never
+    # fails half way on a lock upgrade
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        result = func(connection, *args)
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+    return result
+
+
+class SQLitePool:
+    """
+    Connections to a SQLite database in WAL mode: `readers` connections
+    for reads, which WAL lets run next to a write, and a single connection
+    for writes, which SQLite serializes anyway. Writes queue on the thread
+    of the writer instead of retrying on SQLITE_BUSY.
+
+    Attributes:
+        reads (int): reads run since startup.
+        writes (int): write transactions run since startup.
+        waiting (int): reads waiting for a free reader connection.
+    """
+    def __init__(
+            self,
+            path: str,
+            readers: int = 4,
+            synchronous: str = 'NORMAL'
+    ):
+        self.path = path
+        self.readers = readers
+        self.synchronous = synchronous
+        self.reads = 0
+        self.writes = 0
+        self.waiting = 0
+        self._writer: Optional[SQLiteConnection] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._connections: List[SQLiteConnection] = []
+
+    async def open(self) -> None:
+        """
+        Opens the connections and creates the tables and indexes that do
+        not exist yet.
+        """
+        self._writer = SQLiteConnection(self.path, self.synchronous)
+        await self._writer.open()
+        await self._writer.run(lambda connection: connection.executescript(SCHEMA))
+        self._idle = asyncio.Queue()
+        self._connections = [self._writer]
+        for _ in range(self.readers):
+            reader = SQLiteConnection(self.path, self.synchronous)
+            await reader.open()
+            self._connections.append(reader)
+            self._idle.put_nowait(reader)
+        coreLogger.info(
+            "Opened the SQLite database %s with %s readers",
+            self.path,
+            self.readers
+        )
+
+    async def read(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs func(connection, *args) on a free reader connection.
+        """
+        self.waiting += 1
+        try:
+            reader = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        try:
+            self.reads += 1
+            return await reader.run(func, *args)
+        finally:
+            self._idle.put_nowait(reader)
+
+    async def write(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs func(connection, *args) in a transaction on the writer
+        connection, it is rolled back if func raises.
+        """
+        self.writes += 1
+        return await self._writer.run(_transaction, func, *args)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the connection and job counters of the pool.
+        """
+        return {
+            "readers": self.readers,
+            "idle_readers": self._idle.qsize() if self._idle else 0,
+            "waiting": self.waiting,
+            "reads": self.reads,
+            "writes": self.writes,
+        }
+
+    async def close(self) -> None:
+        for connection in self._connections:
+            await connection.close()
+        self._connections = []
+        self._writer = None
+        self._idle = None
+
+
+sqlite_pool = SQLitePool(SQLITE_PATH, SQLITE_READERS, SQLITE_SYNCHRONOUS)
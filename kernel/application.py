@@ -1,25 +1,120 @@
 import logging
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
-from database.core import init_db
+from database.core import (
+    init_db,
+    close_db
+)
+from database.sqlite import sqlite_pool
+from utils.hash import hash_pool
+from database.monitoring import (
+    pool_monitor,
+    command_monitor
+)
+from auth.repository.cache import (
+    user_cache,
+    user_read_flight
+)
+from auth.authorization.token import token_cache
+from tasks.repository.cache import (
+    task_list_cache,
+    task_read_flight
+)
+from kernel.metrics import registry
+from kernel.middleware import (
+    RequestContextMiddleware,
+    CompressionMiddleware
+)
+from kernel.settings.database import STORAGE_BACKEND
+from kernel.settings.base import (
+    COMPRESSION,
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_LEVELS
+)
 from auth.api.v1 import (
     authentication_router,
     registration_router
 )
 from tasks.api.v1 import tasks_router
+from tasks.repository.dal.factory import task_insert_batcher
 
 app = FastAPI()
+# the last middleware added runs first, the request context wraps the
+# compression so it is part of the measured latency
+app.add_middleware(
+    CompressionMiddleware,
+    codings=COMPRESSION,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    levels=COMPRESSION_LEVELS
+)
+app.add_middleware(RequestContextMiddleware)
 coreLogger = logging.getLogger('core')
 
+registry.add_collector('mongo_pool', pool_monitor.stats)
+registry.add_collector('mongo_commands', command_monitor.stats)
+registry.add_collector('hash_pool', hash_pool.stats)
+registry.add_collector('user_cache', user_cache.stats)
+registry.add_collector('token_cache', token_cache.stats)
+registry.add_collector('user_reads', user_read_flight.stats)
+registry.add_collector('task_reads', task_read_flight.stats)
+if task_list_cache is not None:
+    registry.add_collector('task_list_cache', task_list_cache.stats)
+if task_insert_batcher is not None:
+    registry.add_collector('task_insert_batches', task_insert_batcher.stats)
+if STORAGE_BACKEND == 'sqlite':
+    registry.add_collector('sqlite_pool', sqlite_pool.stats)
+
 @app.on_event('startup')
 async def connect_db():
     """
-    Connect the database on startup event
+    Connect the database on startup event, the memory storage backend
+    has none
     """
-    await init_db()
+    app.state.mongo_client = None
+    if STORAGE_BACKEND == 'sqlite':
+        await sqlite_pool.open()
+        return
+    if STORAGE_BACKEND != 'mongodb':
+        coreLogger.info("Using the %s storage backend.", STORAGE_BACKEND)
+        return
+    app.state.mongo_client = await init_db()
     coreLogger.info("Connected to the database successfully.")
 
+@app.on_event('shutdown')
+async def disconnect_db():
+    """
+    Close the database connections on shutdown event, once the batched
+    task inserts still waiting are written
+    """
+    if task_insert_batcher is not None:
+        await task_insert_batcher.close()
+    if STORAGE_BACKEND == 'sqlite':
+        await sqlite_pool.close()
+        coreLogger.info("Closed the SQLite database.")
+    if app.state.mongo_client is None:
+        return
+    close_db(app.state.mongo_client)
+    coreLogger.info("Disconnected from the database.")
+
+@app.on_event('shutdown')
+async def stop_hash_pool():
+    """
+    Stop the password hashing workers on shutdown event
+    """
+    hash_pool.shutdown()
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics():
+    """
+    Metrics of this worker process in the Prometheus text format
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type='text/plain; version=0.0.4'
+    )
+
 app.include_router(
     registration_router,
     tags=["Registration"],
@@ -0,0 +1,57 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestContext:
+    """
+    Fields of the request being handled, shared by everything that runs
+    for it: log records, the database command listener and the timing
+    middleware.
+
+    Attributes:
+        scope (dict): ASGI scope of the request.
+        user (Optional[str]): username of the authenticated user.
+        db_time (float): seconds spent in database commands.
+        started (float): perf_counter at the start of the request.
+        endpoint_done (Optional[float]): perf_counter when the endpoint
+            returned, set by kernel.routing.AppRoute.
+    """
+    __slots__ = ('scope', 'user', 'db_time', 'started', 'endpoint_done')
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.user = None
+        self.db_time = 0.0
+        self.started = time.perf_counter()
+        self.endpoint_done = None
+
+    @property
+    def route(self) -> str:
+        # the matched route is only known once routing is done
+        route = self.scope.get('route')
+        return route.path if route is not None else self.scope.get('path')
+
+    @property
+    def metrics_route(self) -> str:
+        # unmatched paths share one label to keep the number of series bounded
+        route = self.scope.get('route')
+        return route.path if route is not None else 'unmatched'
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    'request_context',
+    default=None
+)
+
+
+def current_request() -> Optional[RequestContext]:
+    """
+    Returns the context of the request being handled, None outside of
+    requests.
+    """
+    return request_context.get()
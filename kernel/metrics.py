@@ -0,0 +1,224 @@
+import time
+import bisect
+import functools
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple
+)
+
+from kernel.context import current_request
+
+
+# upper bounds in seconds, from sub-millisecond cache hits to slow hashes
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(
+        '%s="%s"' % (name, _escape(value))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    """
+    A Prometheus histogram with labels. Observations only add to the
+    counts of one bucket, the cumulative counts are computed when the
+    metrics are rendered.
+
+    It is not thread-safe, it is meant to be observed from the event loop
+    thread only.
+
+    Attributes:
+        name (str): metric name.
+        documentation (str): HELP line of the metric.
+        labelnames (Tuple[str]): names of the labels, in observe order.
+        buckets (Tuple[float]): upper bounds of the buckets.
+    """
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket and +Inf, sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0]
+            self._series[labels] = series
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [*map(str, self.buckets), '+Inf']
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append("%s_bucket%s %d" % (
+                    self.name,
+                    _labels((*self.labelnames, 'le'), (*labels, bound)),
+                    cumulative
+                ))
+            label_text = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    A Prometheus gauge with labels, see Histogram for thread-safety.
+    """
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        for labels, value in self._values.items():
+            lines.append(
+                f"{self.name}{_labels(self.labelnames, labels)} {value}"
+            )
+        return lines
+
+
+class Registry:
+    """
+    Holds the metrics of the process and renders them in the Prometheus
+    text format.
+
+    Besides metrics it takes collectors: functions returning a dict of
+    numbers, like the stats() of the caches and pools, which are read at
+    scrape time and rendered as `<prefix>_<key>` gauges.
+    """
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(
+            self,
+            prefix: str,
+            collect: Callable[[], Dict[str, float]]
+    ) -> None:
+        self._collectors[prefix] = collect
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors.items():
+            for key, value in collect().items():
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+class PhaseTimer:
+    """
+    Times a named phase of the current request, as a context manager:
+
+        with PhaseTimer('dal'):
+            tasks = await dal.get_all_tasks(username)
+
+    Outside of requests nothing is recorded.
+    """
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'PhaseTimer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        context = current_request()
+        if context is not None:
+            phase_latency.observe(
+                time.perf_counter() - self.started,
+                context.metrics_route,
+                self.name
+            )
+
+
+def mark_endpoint_done(endpoint: Callable) -> Callable:
+    """
+    Wraps an async endpoint so the time its result was returned is kept on
+    the request context, the middleware times the "encode" phase from it
+    until the response starts. Used by kernel.routing.AppRoute.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            context = current_request()
+            if context is not None:
+                context.endpoint_done = time.perf_counter()
+    return wrapper
+
+
+registry = Registry()
+request_latency = registry.register(Histogram(
+    'http_request_duration_seconds',
+    'Latency of the http requests',
+    ('method', 'route', 'status')
+))
+requests_in_flight = registry.register(Gauge(
+    'http_requests_in_flight',
+    'Http requests being handled',
+))
+phase_latency = registry.register(Histogram(
+    'http_request_phase_duration_seconds',
+    'Latency of the phases of the http requests',
+    ('route', 'phase')
+))
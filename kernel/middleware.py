@@ -0,0 +1,216 @@
+import time
+import asyncio
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional
+)
+
+from starlette.datastructures import MutableHeaders
+
+from kernel.context import (
+    RequestContext,
+    request_context
+)
+from kernel.metrics import (
+    request_latency,
+    requests_in_flight,
+    phase_latency
+)
+from utils.compression import (
+    available_codings,
+    create_stream,
+    negotiate
+)
+
+
+accessLogger = logging.getLogger('access')
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that opens a RequestContext for every http request.
+    When the request is done it records its latency and phases in
+    kernel.metrics and writes one access record.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        context = RequestContext(scope)
+        token = request_context.set(context)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if context.endpoint_done is not None:
+                    phase_latency.observe(
+                        time.perf_counter() - context.endpoint_done,
+                        context.metrics_route,
+                        'encode'
+                    )
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            elapsed = context.elapsed
+            route = context.metrics_route
+            request_latency.observe(
+                elapsed,
+                scope['method'],
+                route,
+                status_code
+            )
+            phase_latency.observe(context.db_time, route, 'db')
+            if accessLogger.isEnabledFor(logging.INFO):
+                accessLogger.info(
+                    "%s %s %s %.2fms",
+                    scope['method'],
+                    context.route,
+                    status_code,
+                    elapsed * 1000,
+                    extra={"fields": {
+                        "method": scope['method'],
+                        "status": status_code,
+                        "total_time": elapsed,
+                    }}
+                )
+            request_context.reset(token)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses the response bodies with the first of
+    `codings` the client accepts in its Accept-Encoding.
+
+    A body sent in one message is compressed at once if it has at least
+    `minimum_size` bytes, large bodies are compressed in a thread so the
+    event loop keeps serving. A streamed body is compressed chunk by chunk
+    and every chunk is flushed, so the client can decode it on arrival.
+    Responses that already have a Content-Encoding are left alone.
+
+    Every other response gets `Vary: Accept-Encoding`, compressed or not:
+    a shared cache that stored an identity response without it would
+    serve it to every client, and the other way around.
+    """
+    # bodies from this size on are compressed off the event loop
+    THREAD_MIN_SIZE = 1 << 20
+
+    def __init__(
+            self,
+            app,
+            codings: List[str],
+            minimum_size: int = 1024,
+            levels: Dict[str, int] = None
+    ):
+        self.app = app
+        self.codings = available_codings(codings)
+        self.minimum_size = minimum_size
+        self.levels = levels or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.codings:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ''
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+                break
+        coding = negotiate(accept_encoding, self.codings)
+        if coding is None:
+            async def send_identity(message):
+                if message['type'] == 'http.response.start':
+                    message = self._identity_start(message)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        stream = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, stream
+            if message['type'] == 'http.response.start':
+                headers = message.get('headers', [])
+                if any(name == b'content-encoding' for name, _ in headers):
+                    await send(message)
+                else:
+                    # held until the first body message tells the size
+                    start_message = message
+                return
+            if (
+                message['type'] != 'http.response.body'
+                or start_message is None
+            ):
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if stream is None:
+                if not more_body:
+                    start, start_message = start_message, None
+                    if len(body) >= self.minimum_size:
+                        body = await self._compress_body(coding, body)
+                        start = self._compressed_start(
+                            start, coding, len(body)
+                        )
+                    else:
+                        start = self._identity_start(start)
+                    await send(start)
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+                stream = create_stream(coding, self.levels.get(coding))
+                await send(self._compressed_start(start_message, coding))
+            if more_body:
+                body = stream.compress(body)
+            else:
+                body = stream.finish(body)
+            await send({
+                'type': 'http.response.body',
+                'body': body,
+                'more_body': more_body,
+            })
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _compress_body(self, coding: str, body: bytes) -> bytes:
+        stream = create_stream(coding, self.levels.get(coding))
+        if len(body) < self.THREAD_MIN_SIZE:
+            return stream.finish(body)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, stream.finish, body
+        )
+
+    @staticmethod
+    def _identity_start(message: dict) -> dict:
+        headers = MutableHeaders(raw=list(message.get('headers', [])))
+        if 'content-encoding' not in headers:
+            headers.add_vary_header('Accept-Encoding')
+        return {**message, 'headers': headers.raw}
+
+    @staticmethod
+    def _compressed_start(
+            message: dict,
+            coding: str,
+            length: Optional[int] = None
+    ) -> dict:
+        headers = MutableHeaders(raw=list(message.get('headers', [])))
+        del headers['content-length']
+        if length is not None:
+            headers['content-length'] = str(length)
+        headers['content-encoding'] = coding
+        headers.add_vary_header('Accept-Encoding')
+        return {**message, 'headers': headers.raw}
@@ -0,0 +1,97 @@
+import signal
+import logging
+import functools
+import threading
+from socket import socket
+from types import FrameType
+from typing import List, Optional
+
+from uvicorn import (
+    Config,
+    Server
+)
+from uvicorn._subprocess import get_subprocess
+from uvicorn.supervisors import Multiprocess
+
+from kernel.settings import setup_logging
+
+
+coreLogger = logging.getLogger('core')
+
+
+def serve_worker(config: Config, sockets: Optional[List[socket]] = None):
+    """
+    Entry point of a worker process, uvicorn only sets up its own loggers
+    in the workers so the application logging is set up here, with log
+    files of the worker's own: the master keeps logs/core/core.log.
+
+    Args:
+        config (Config): uvicorn config
+        sockets (Optional[List[socket]]): sockets bound by the master
+    """
+    setup_logging(worker=True)
+    Server(config).run(sockets=sockets)
+
+
+class GracefulMultiprocess(Multiprocess):
+    """
+    A pre-fork master, the workers accept connections from the sockets
+    bound by the master.
+
+    On top of uvicorn's Multiprocess it replaces workers that died and
+    reloads gracefully on SIGHUP: a new set of workers is started before
+    the old ones get SIGTERM, which lets them finish in-flight requests.
+    """
+    def __init__(self, config: Config, sockets: List[socket]):
+        super().__init__(
+            config,
+            target=functools.partial(serve_worker, config),
+            sockets=sockets
+        )
+        self.should_reload = threading.Event()
+
+    def reload_handler(self, sig: int, frame: Optional[FrameType]) -> None:
+        self.should_reload.set()
+
+    def run(self) -> None:
+        self.startup()
+        signal.signal(signal.SIGHUP, self.reload_handler)
+        while not self.should_exit.wait(timeout=0.5):
+            if self.should_reload.is_set():
+                self.should_reload.clear()
+                self.reload()
+            else:
+                self.replace_dead_workers()
+        self.shutdown()
+
+    def spawn_worker(self):
+        process = get_subprocess(
+            config=self.config,
+            target=self.target,
+            sockets=self.sockets
+        )
+        process.start()
+        return process
+
+    def reload(self) -> None:
+        coreLogger.info(f"Reloading {len(self.processes)} workers")
+        old_processes = self.processes
+        self.processes = [
+            self.spawn_worker() for _ in range(self.config.workers)
+        ]
+        for process in old_processes:
+            process.terminate()
+        for process in old_processes:
+            process.join()
+        coreLogger.info("Workers reloaded")
+
+    def replace_dead_workers(self) -> None:
+        for index, process in enumerate(self.processes):
+            if self.should_exit.is_set():
+                return
+            if not process.is_alive():
+                coreLogger.error(
+                    f"Worker {process.pid} exited with code "
+                    f"{process.exitcode}, starting a new one"
+                )
+                self.processes[index] = self.spawn_worker()
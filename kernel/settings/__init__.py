@@ -1,6 +1,13 @@
 from .base import (
     HOST as FAST_HOST,
-    PORT as FAST_PORT
+    PORT as FAST_PORT,
+    MODE as FAST_MODE,
+    WORKERS as FAST_WORKERS,
+    BACKLOG as FAST_BACKLOG,
+    TIMEOUT_KEEP_ALIVE as FAST_TIMEOUT_KEEP_ALIVE,
+    LIMIT_CONCURRENCY as FAST_LIMIT_CONCURRENCY,
+    TIMEOUT_GRACEFUL_SHUTDOWN as FAST_TIMEOUT_GRACEFUL_SHUTDOWN,
+    RESPONSE_ENCODER as FAST_RESPONSE_ENCODER
 )
 from .database import DATABASE_URL
 from .logging import setup_logging
@@ -6,3 +6,18 @@ ALGORITHM = config.get_value('settings.auth', 'ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = config.get_value(
     'settings.auth', 'ACCESS_TOKEN_EXPIRE_MINUTES'
 )
+
+# password hashing pool, HASH_EXECUTOR is either "thread" or "process"
+HASH_EXECUTOR = config.get_value('settings.auth', 'HASH_EXECUTOR', 'thread')
+HASH_WORKERS = config.get_value('settings.auth', 'HASH_WORKERS', 4)
+HASH_MAX_CONCURRENCY = config.get_value(
+    'settings.auth', 'HASH_MAX_CONCURRENCY', HASH_WORKERS
+)
+
+# cache of the authenticated users, TTL in seconds
+USER_CACHE_SIZE = config.get_value('settings.auth', 'USER_CACHE_SIZE', 10000)
+USER_CACHE_TTL = config.get_value('settings.auth', 'USER_CACHE_TTL', 60)
+
+# cache of verified access tokens, an entry never outlives its token's exp
+TOKEN_CACHE_SIZE = config.get_value('settings.auth', 'TOKEN_CACHE_SIZE', 10000)
+TOKEN_CACHE_TTL = config.get_value('settings.auth', 'TOKEN_CACHE_TTL', 300)
@@ -8,3 +8,36 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 # FastAPI host and port
 HOST = config.get_value("settings.fastapi", 'HOST')
 PORT = config.get_value("settings.fastapi", "PORT")
+
+# server mode, "production" runs WORKERS processes (0 means one per CPU),
+# "development" is opt-in and runs one process that reloads on code changes
+MODE = config.get_value("settings.fastapi", "MODE", "production")
+WORKERS = config.get_value("settings.fastapi", "WORKERS", 0)
+BACKLOG = config.get_value("settings.fastapi", "BACKLOG", 2048)
+TIMEOUT_KEEP_ALIVE = config.get_value("settings.fastapi", "TIMEOUT_KEEP_ALIVE", 5)
+LIMIT_CONCURRENCY = config.get_value("settings.fastapi", "LIMIT_CONCURRENCY")
+TIMEOUT_GRACEFUL_SHUTDOWN = config.get_value(
+    "settings.fastapi", "TIMEOUT_GRACEFUL_SHUTDOWN", 30
+)
+
+# encoder of the response bodies, "json" keeps fastapi's jsonable_encoder
+# and json.dumps, "orjson" encodes the validated response models with
+# orjson (needs the orjson package)
+RESPONSE_ENCODER = config.get_value("settings.fastapi", "RESPONSE_ENCODER", "json")
+
+# response compression, codings in order of preference, codings whose
+# package is not installed are skipped with a warning ("br" needs brotli,
+# "zstd" needs zstandard, both in the compression extra), [] disables
+# compression
+COMPRESSION = config.get_value(
+    "settings.fastapi", "COMPRESSION", ["gzip"]
+)
+# smaller bodies are sent as they are, streamed bodies are always compressed
+COMPRESSION_MIN_SIZE = config.get_value(
+    "settings.fastapi", "COMPRESSION_MIN_SIZE", 1024
+)
+# level per coding, higher levels trade CPU for bandwidth,
+# e.g. {gzip = 6, br = 4, zstd = 3}
+COMPRESSION_LEVELS = config.get_value(
+    "settings.fastapi", "COMPRESSION_LEVELS", {}
+)
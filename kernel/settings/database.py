@@ -1,4 +1,39 @@
 from .base import config
 
 
+# where tasks and users are stored: "mongodb", "sqlite" for single node
+# installs, or "memory" to keep them in the worker process, for single
+# process deployments and load tests
+STORAGE_BACKEND = config.get_value('settings.storage', 'BACKEND', 'mongodb')
+# share the reads of tasks and users between concurrent identical calls
+COALESCE_READS = config.get_value('settings.storage', 'COALESCE_READS', True)
+
+SQLITE_PATH = config.get_value('settings.sqlite', 'PATH', 'todo.sqlite3')
+# connections for reads of every worker process, writes have one more
+SQLITE_READERS = config.get_value('settings.sqlite', 'READERS', 4)
+# NORMAL is durable across application crashes in WAL mode, FULL also
+# across power losses at the cost of a sync per commit
+SQLITE_SYNCHRONOUS = config.get_value('settings.sqlite', 'SYNCHRONOUS', 'NORMAL')
+
 DATABASE_URL = config.get_value('settings.mongodb', 'DATABASE_URL')
+
+# connection pool of the motor client, every worker process has its own
+MAX_POOL_SIZE = config.get_value('settings.mongodb', 'MAX_POOL_SIZE', 100)
+MIN_POOL_SIZE = config.get_value('settings.mongodb', 'MIN_POOL_SIZE', 0)
+MAX_IDLE_TIME_MS = config.get_value('settings.mongodb', 'MAX_IDLE_TIME_MS')
+WAIT_QUEUE_TIMEOUT_MS = config.get_value(
+    'settings.mongodb', 'WAIT_QUEUE_TIMEOUT_MS'
+)
+COMPRESSORS = config.get_value('settings.mongodb', 'COMPRESSORS', [])
+READ_PREFERENCE = config.get_value(
+    'settings.mongodb', 'READ_PREFERENCE', 'primary'
+)
+
+# commands slower than this are logged with the shape of their filter,
+# 0 disables the slow query log
+SLOW_QUERY_MS = config.get_value('settings.mongodb', 'SLOW_QUERY_MS', 100)
+# share of the queries explained to find the ones scanning the whole
+# collection, every query shape is explained once, 0 disables explains
+EXPLAIN_SAMPLE_RATE = config.get_value(
+    'settings.mongodb', 'EXPLAIN_SAMPLE_RATE', 0.0
+)
@@ -1,22 +1,251 @@
+import os
+import json
+import queue
+import atexit
+import random
 import tomllib
 import logging.config
 import logging
+from logging.handlers import (
+    QueueHandler,
+    QueueListener
+)
+from datetime import datetime
+from typing import Dict, Iterable, List
 
 from .base import (
     BASE_DIR,
     config
 )
+from kernel.context import current_request
 from utils.funcs import create_directories
 
-def setup_logging():
+
+# records wait in a bounded queue and are written by a background thread,
+# 0 writes them synchronously from the calling thread
+QUEUE_SIZE = config.get_value("settings.log", "QUEUE_SIZE", 10000)
+# "drop" drops records while the queue is full, "block" waits for room
+QUEUE_POLICY = config.get_value("settings.log", "QUEUE_POLICY", "drop")
+# "text" keeps the formatters of logging.toml, "json" writes one JSON object
+# per record
+FORMAT = config.get_value("settings.log", "FORMAT", "text")
+# share of the INFO and DEBUG records kept per logger,
+# e.g. {"core.tasks" = {INFO = 0.1, DEBUG = 0.01}}
+SAMPLING = config.get_value("settings.log", "SAMPLING", {})
+
+_listeners: List[QueueListener] = []
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    A QueueHandler over a bounded queue, what happens when the queue is
+    full depends on the policy: "drop" drops the record and counts it,
+    "block" makes the caller wait for room (backpressure).
+
+    Records are queued as they are, formatting is left to the handlers of
+    the listener thread.
+    """
+    def __init__(self, queue: queue.Queue, policy: str = 'drop'):
+        if policy not in ('drop', 'block'):
+            raise ValueError(
+                f"Unknown log queue policy: {policy}, "
+                "expected 'drop' or 'block'"
+            )
+        super().__init__(queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Copies the fields of the current request onto the record. It has to
+    run in the thread that logs, the request context is not visible from
+    the queue listener thread.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = current_request()
+        if context is not None:
+            record.route = context.route
+            record.user = context.user
+            record.db_time = context.db_time
+            record.elapsed = context.elapsed
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a random share of the INFO and DEBUG records of a logger, the
+    records of the other levels are always kept.
+
+    Args:
+        rates (Dict[str, float]): share of records to keep per level name
+    """
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {
+            logging.getLevelName(level.upper()): rate
+            for level, rate in rates.items()
+            if level.upper() in ('INFO', 'DEBUG')
+        }
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one line of JSON. The message is only built
+    here, so records dropped earlier never pay for it.
+
+    Request fields copied by RequestContextFilter and the `fields` dict
+    passed as extra are added to the object.
+    """
+    CONTEXT_FIELDS = ('route', 'user', 'db_time', 'elapsed')
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        for field in self.CONTEXT_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(',', ':'))
+
+
+def load_logging_config() -> dict:
+    """
+    Read logging config from logging.toml
+    """
+    with open(f'{BASE_DIR}/configs/logging/logging.toml', mode='rb') \
+        as config_file:
+        return tomllib.load(config_file)
+
+
+def per_process_filenames(log_conf_dict: dict, pid: int) -> None:
+    """
+    Adds the pid to the file name of each file handler, e.g.
+    logs/core/core.log becomes logs/core/core.1234.log.
+
+    Each process rotates the files it has opened on its own, so processes
+    that share a file lose or overwrite each other's records at rollover.
+
+    Args:
+        log_conf_dict (dict): logging config, changed in place
+        pid (int): id of the process
+    """
+    for handler in log_conf_dict.get('handlers', {}).values():
+        if 'filename' in handler:
+            root, extension = os.path.splitext(handler['filename'])
+            handler['filename'] = f"{root}.{pid}{extension}"
+
+
+def enqueue_handlers(
+        logger_names: Iterable[str],
+        size: int,
+        policy: str
+) -> List[QueueListener]:
+    """
+    Moves the handlers of each logger behind a BoundedQueueHandler and
+    starts a QueueListener thread that feeds them.
+
+    The queue handler takes the lowest level of the handlers it replaces,
+    so records no handler wants are dropped before being queued.
+
+    Args:
+        logger_names (Iterable[str]): names of the loggers
+        size (int): size of the queue of each logger
+        policy (str): "drop" or "block"
+
+    Returns:
+        List[QueueListener]: the started listeners
+    """
+    listeners = []
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        handlers = logger.handlers[:]
+        if not handlers:
+            continue
+        queue_handler = BoundedQueueHandler(queue.Queue(size), policy)
+        queue_handler.setLevel(min(handler.level for handler in handlers))
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+        listener = QueueListener(
+            queue_handler.queue,
+            *handlers,
+            respect_handler_level=True
+        )
+        listener.start()
+        listeners.append(listener)
+    return listeners
+
+
+def stop_listeners() -> None:
+    """
+    Writes the records left in the queues and stops the listener threads.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def setup_logging(worker: bool = False):
     """
     Create directories related to logging
     Read logging config from loggin.toml
+    Give each worker process log files of its own
+    Put the handlers of the configured loggers behind bounded queues
+    Add the request fields and sampling filters
+
+    Args:
+        worker (bool): the process is a server worker, not the master
     """
     DIRECTORIES = config.get_value("settings.log", 'LOG_DIRS')
     create_directories(BASE_DIR, DIRECTORIES)
 
-    with open(f'{BASE_DIR}/configs/logging/logging.toml', mode='rb') \
-        as config_file:
-        log_conf_dict = tomllib.load(config_file)
-        logging.config.dictConfig(log_conf_dict)
+    stop_listeners()
+    log_conf_dict = load_logging_config()
+    if worker:
+        per_process_filenames(log_conf_dict, os.getpid())
+    if FORMAT == 'json':
+        for handler in log_conf_dict.get('handlers', {}).values():
+            handler['formatter'] = 'jsonFormatter'
+    logging.config.dictConfig(log_conf_dict)
+
+    loggers = log_conf_dict.get('loggers', {})
+    if QUEUE_SIZE:
+        _listeners.extend(enqueue_handlers(loggers, QUEUE_SIZE, QUEUE_POLICY))
+    context_filter = RequestContextFilter()
+    for name in loggers:
+        for handler in logging.getLogger(name).handlers:
+            handler.addFilter(context_filter)
+
+    for name, rates in SAMPLING.items():
+        logger = logging.getLogger(name)
+        for sampling_filter in logger.filters[:]:
+            if isinstance(sampling_filter, SamplingFilter):
+                logger.removeFilter(sampling_filter)
+        logger.addFilter(SamplingFilter(rates))
+
+
+atexit.register(stop_listeners)
@@ -0,0 +1,25 @@
+from .base import config
+
+
+# cache of the encoded task lists: "local" keeps them in every worker
+# process, "shared" in a redis server shared by all of them (needs the
+# redis package), "none" disables the cache
+TASK_LIST_CACHE = config.get_value('settings.tasks', 'TASK_LIST_CACHE', 'local')
+TASK_LIST_CACHE_SIZE = config.get_value(
+    'settings.tasks', 'TASK_LIST_CACHE_SIZE', 1000
+)
+# in seconds, with the local cache other workers see changes after at most this
+TASK_LIST_CACHE_TTL = config.get_value(
+    'settings.tasks', 'TASK_LIST_CACHE_TTL', 60
+)
+TASK_LIST_CACHE_URL = config.get_value(
+    'settings.tasks', 'TASK_LIST_CACHE_URL', 'redis://localhost:6379/0'
+)
+
+# concurrent task creates are merged into one insert_many, flushed this
+# many ms after the first one or once CREATE_BATCH_SIZE are waiting, 0
+# disables it, mongodb storage backend only
+CREATE_BATCH_WINDOW_MS = config.get_value(
+    'settings.tasks', 'CREATE_BATCH_WINDOW_MS', 0
+)
+CREATE_BATCH_SIZE = config.get_value('settings.tasks', 'CREATE_BATCH_SIZE', 100)
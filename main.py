@@ -1,57 +1,106 @@
+import os
 import logging
+import argparse
+import functools
 
 import uvicorn
-import uvloop
-from uvicorn import Server
-import asyncio
-from asyncio import AbstractEventLoop
+from uvicorn.supervisors import ChangeReload
 
-from kernel.application import app
+from kernel.server import (
+    GracefulMultiprocess,
+    serve_worker
+)
 from kernel.settings import (
     FAST_HOST,
     FAST_PORT,
+    FAST_MODE,
+    FAST_WORKERS,
+    FAST_BACKLOG,
+    FAST_TIMEOUT_KEEP_ALIVE,
+    FAST_LIMIT_CONCURRENCY,
+    FAST_TIMEOUT_GRACEFUL_SHUTDOWN,
     setup_logging
 )
+from kernel.settings.database import STORAGE_BACKEND
 
 
 coreLogger = logging.getLogger('core')
+APP = "kernel.application:app"
+MODES = ('development', 'production')
 
-def get_server(loop: AbstractEventLoop) -> Server:
+def get_config(mode: str) -> uvicorn.Config:
     """
-    takes a event loop and after configuration of the server, returns it.
+    takes the server mode and returns the uvicorn configuration of it.
 
     Args:
-        loop (AbstractEventLoop): asyncio event loop
+        mode (str): "production" runs many workers, "development" reloads
+        on code changes
 
     Returns:
-        Server: uvicorn server
+        uvicorn.Config: uvicorn configuration
     """
-    config = uvicorn.Config(
-        app=app,
+    if mode == 'development':
+        return uvicorn.Config(
+            app=APP,
+            host=FAST_HOST,
+            port=FAST_PORT,
+            loop='uvloop',
+            reload=True
+        )
+    return uvicorn.Config(
+        app=APP,
         host=FAST_HOST,
         port=FAST_PORT,
-        loop=loop,
-        reload=True
+        loop='uvloop',
+        workers=FAST_WORKERS or os.cpu_count(),
+        backlog=FAST_BACKLOG,
+        timeout_keep_alive=FAST_TIMEOUT_KEEP_ALIVE,
+        limit_concurrency=FAST_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=FAST_TIMEOUT_GRACEFUL_SHUTDOWN
     )
-    return Server(config)
+
+
+def run(mode: str) -> None:
+    """
+    binds the socket and runs the workers of the mode under a supervisor.
+
+    Args:
+        mode (str): "development" or "production"
+    """
+    config = get_config(mode)
+    if STORAGE_BACKEND == 'memory' and config.workers > 1:
+        coreLogger.warning(
+            "The memory storage backend runs with %s workers, each of them "
+            "has its own tasks and users",
+            config.workers
+        )
+    sockets = [config.bind_socket()]
+    if mode == 'development':
+        supervisor = ChangeReload(
+            config,
+            target=functools.partial(serve_worker, config),
+            sockets=sockets
+        )
+    else:
+        supervisor = GracefulMultiprocess(config, sockets=sockets)
+    supervisor.run()
 
 
 if __name__ == '__main__':
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=MODES, default=FAST_MODE)
+    args = parser.parse_args()
+    # a default taken from settings.toml is not checked by choices
+    if args.mode not in MODES:
+        parser.error(f"MODE must be one of {', '.join(MODES)}, not {args.mode}")
     setup_logging()
 
     try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError as e:
-        coreLogger.error(e)
-        loop = asyncio.new_event_loop()
-
-    server = get_server(loop=loop)
-    try:
-        coreLogger.info('Application started, server is running')
-        loop.run_until_complete(server.serve())
+        coreLogger.info(
+            f'Application started in {args.mode} mode, server is running'
+        )
+        run(args.mode)
     except Exception as e:
         coreLogger.critical(e)
     finally:
-        loop.close()
         coreLogger.info('Application stopped.')
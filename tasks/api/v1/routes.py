@@ -1,50 +1,189 @@
+from datetime import datetime
+from typing import (
+    Dict,
+    List,
+    Optional,
+    AsyncIterator
+)
+
 from fastapi import (
     APIRouter,
+    HTTPException,
     status,
-    Depends
+    Depends,
+    Header,
+    Query,
+    Response
 )
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 
+from kernel.routing import (
+    AppRoute,
+    render_body
+)
 from auth.authorization import get_current_user
 from .schemas import (
     TaskSchemaIn,
     TaskSchemaOut,
     TaskListSchema,
-    DeleteTaskSchema
+    DeleteTaskSchema,
+    BulkTaskSchemaIn,
+    BulkTitlesSchemaIn,
+    BulkResultSchema
 )
 from auth.models import User
 
 from tasks.repository.dal import(
     ITaskDataAccessLayer,
-    TaskDataAccessLayer
+    BulkStatus,
+    TaskView,
+    TaskOrder,
+    TaskQuery,
+    get_task_data_access_layer
 )
 from tasks.repository.bll import TaskService
+from utils.etag import etag_matches
 
 
-tasks_router = APIRouter()
+tasks_router = APIRouter(route_class=AppRoute)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+MAX_PAGE_SIZE = 1000
+
+def get_task_query(
+    is_completed: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    completed_from: Optional[datetime] = None,
+    completed_to: Optional[datetime] = None,
+    title_prefix: Optional[str] = Query(default=None, min_length=1, max_length=150),
+    sort: TaskOrder = TaskOrder.CREATED
+) -> TaskQuery:
+    """
+    Dependency that builds the filters and order of a task list from the
+    query parameters. Ranges include their lower bound and exclude their
+    upper one.
+
+    Args:
+        is_completed (Optional[bool]): only completed or only pending tasks.
+        created_from (Optional[datetime]): tasks created at or after it.
+        created_to (Optional[datetime]): tasks created before it.
+        completed_from (Optional[datetime]): tasks completed at or after it.
+        completed_to (Optional[datetime]): tasks completed before it.
+        title_prefix (Optional[str]): tasks whose title starts with it.
+        sort (TaskOrder): created, -created, title or -title.
+
+    Returns:
+        TaskQuery: the filters and order.
+    """
+    return TaskQuery(
+        is_completed=is_completed,
+        created_from=created_from,
+        created_to=created_to,
+        completed_from=completed_from,
+        completed_to=completed_to,
+        title_prefix=title_prefix,
+        order=sort
+    )
+
 @tasks_router.get(
         "/",
         status_code=status.HTTP_200_OK,
         response_model=TaskListSchema
 )
 async def get_tasks(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(default=None),
+    query: TaskQuery = Depends(get_task_query),
     user: User = Depends(get_current_user),
-    dal : ITaskDataAccessLayer = Depends(TaskDataAccessLayer)
+    dal : ITaskDataAccessLayer = Depends(get_task_data_access_layer)
 ) -> TaskListSchema:
     """
     Retrieves the tasks associated with the authenticated user.
 
+    Without `limit` all the tasks are returned at once, with it the tasks
+    are paginated and `next_cursor` of the response is passed as `after`
+    to get the next page, `after` without `limit` is a 400. With `stream`
+    the tasks are sent as newline-delimited JSON while they are read from
+    the database, a stream cannot start at a cursor.
+
+    The tasks can be filtered and sorted with the parameters of
+    get_task_query, the database does it so only the matching tasks are
+    read and sent.
+
+    The response has an ETag, when `If-None-Match` matches it the tasks
+    did not change and 304 is returned without reading them.
+
     Args:
         dal: (ITaskDataAccessLayer): data acess layer of task model
         user (User): The authenticated user.
+        limit (Optional[int]): page size.
+        after (Optional[str]): cursor of the page to be retrieved.
+        stream (bool): whether to stream the tasks as NDJSON.
+        if_none_match (Optional[str]): ETag of the tasks the client has.
+        query (TaskQuery): filters and order of the tasks.
 
     Returns:
         TaskListSchema: A list of tasks associated with the authenticated user.
+
+    Raises:
+        HTTPException: If `after` is sent without `limit` or with `stream`.
+    """
+    if after is not None and (limit is None or stream):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='after needs limit and cannot be used with stream'
+        )
+    etag = await TaskService.get_tasks_etag(dal, user)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag}
+        )
+    if stream:
+        return StreamingResponse(
+            _ndjson_tasks(TaskService.stream_tasks(dal, user, query)),
+            media_type="application/x-ndjson",
+            headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
+    if limit is not None:
+        tasks, next_cursor = await TaskService.get_tasks_page(
+            dal,
+            user,
+            limit,
+            after,
+            query
+        )
+        # the tasks are plain dicts, validated once by the response model
+        return {"tasks": tasks, "next_cursor": next_cursor}
+    body = await TaskService.get_tasks(dal, user, _encode_task_list, query)
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
+
+def _encode_task_list(tasks: List[TaskView]) -> bytes:
+    """
+    Encodes the tasks as the body of the task list response, it is what
+    the task list cache stores.
     """
-    tasks = await TaskService.get_tasks(dal, user)
-    return TaskListSchema(tasks=tasks)
+    return render_body(TaskListSchema(tasks=tasks))
+
+async def _ndjson_tasks(
+        tasks: AsyncIterator[TaskView]
+) -> AsyncIterator[bytes]:
+    """
+    Encodes each task as one line of JSON, with the configured response
+    encoder like the other task responses.
+    """
+    async for task in tasks:
+        yield render_body(TaskSchemaOut.parse_obj(task)) + b"\n"
 
 @tasks_router.post(
         "/",
@@ -54,7 +193,7 @@ async def get_tasks(
 async def create_task(
     task: TaskSchemaIn,
     user: User = Depends(get_current_user),
-    dal: ITaskDataAccessLayer = Depends(TaskDataAccessLayer)
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
 ) -> TaskSchemaOut:
     """
     Creates a new task associated with the authenticated user.
@@ -75,6 +214,91 @@ async def create_task(
     )
     return task
 
+@tasks_router.post(
+        "/bulk",
+        status_code=status.HTTP_200_OK,
+        response_model=BulkResultSchema
+)
+async def create_tasks(
+    bulk: BulkTaskSchemaIn,
+    user: User = Depends(get_current_user),
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
+) -> BulkResultSchema:
+    """
+    Creates many tasks associated with the authenticated user at once.
+
+    Args:
+        dal: (ITaskDataAccessLayer): data acess layer of task model
+        bulk (BulkTaskSchemaIn): The tasks to be created.
+        user (User): The authenticated user.
+
+    Returns:
+        BulkResultSchema: The outcome of each title, either created,
+        conflict, invalid or failed.
+    """
+    results = await TaskService.create_tasks(
+        dal,
+        user,
+        [(task.title, task.description) for task in bulk.tasks]
+    )
+    return _bulk_result(results)
+
+@tasks_router.post(
+        "/bulk/complete",
+        status_code=status.HTTP_200_OK,
+        response_model=BulkResultSchema
+)
+async def complete_tasks(
+    bulk: BulkTitlesSchemaIn,
+    user: User = Depends(get_current_user),
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
+) -> BulkResultSchema:
+    """
+    Marks many tasks associated with the authenticated user as complete.
+
+    Args:
+        dal: (ITaskDataAccessLayer): data acess layer of task model
+        bulk (BulkTitlesSchemaIn): The titles of the tasks.
+        user (User): The authenticated user.
+
+    Returns:
+        BulkResultSchema: The outcome of each title, either completed,
+        already_completed or not_found.
+    """
+    results = await TaskService.complete_tasks(dal, user, bulk.titles)
+    return _bulk_result(results)
+
+@tasks_router.post(
+        "/bulk/delete",
+        status_code=status.HTTP_200_OK,
+        response_model=BulkResultSchema
+)
+async def delete_tasks(
+    bulk: BulkTitlesSchemaIn,
+    user: User = Depends(get_current_user),
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
+) -> BulkResultSchema:
+    """
+    Deletes many tasks associated with the authenticated user.
+
+    Args:
+        dal: (ITaskDataAccessLayer): data acess layer of task model
+        bulk (BulkTitlesSchemaIn): The titles of the tasks.
+        user (User): The authenticated user.
+
+    Returns:
+        BulkResultSchema: The outcome of each title, either deleted or
+        not_found.
+    """
+    results = await TaskService.delete_tasks(dal, user, bulk.titles)
+    return _bulk_result(results)
+
+def _bulk_result(results: Dict[str, BulkStatus]) -> BulkResultSchema:
+    return BulkResultSchema(results=[
+        {"title": title, "status": result}
+        for title, result in results.items()
+    ])
+
 @tasks_router.get(
         "/{title}",
         status_code=status.HTTP_200_OK,
@@ -82,23 +306,36 @@ async def create_task(
 )
 async def get_one_task(
     title: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
     user: User= Depends(get_current_user),
-    dal: ITaskDataAccessLayer = Depends(TaskDataAccessLayer)
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
 ) -> TaskSchemaOut:
     """
     Retrieves the task with the provided title associated with the
     authenticated user.
 
+    The response has the ETag of all the tasks of the user, when
+    `If-None-Match` matches it 304 is returned without reading the task.
+
     Args:
         dal: (ITaskDataAccessLayer): data acess layer of task model
         title (str): The title of the task to be retrieved.
         user (User): The authenticated user.
+        if_none_match (Optional[str]): ETag of the task the client has.
 
     Returns:
         TaskSchemaOut: The task with the provided title associated with
         the authenticated user.
     """
+    etag = await TaskService.get_tasks_etag(dal, user)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag}
+        )
     task = await TaskService.get_task(dal, user, title)
+    response.headers["ETag"] = etag
     return task
 
 @tasks_router.patch(
@@ -109,7 +346,7 @@ async def get_one_task(
 async def mark_task_as_complete(
     title: str,
     user: User = Depends(get_current_user),
-    dal: ITaskDataAccessLayer = Depends(TaskDataAccessLayer)
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
 ) -> TaskSchemaOut:
     """
     Marks the task with the provided title associated with the
@@ -134,7 +371,7 @@ async def mark_task_as_complete(
 async def delete_task(
     title: str,
     user: User = Depends(get_current_user),
-    dal: ITaskDataAccessLayer = Depends(TaskDataAccessLayer)
+    dal: ITaskDataAccessLayer = Depends(get_task_data_access_layer)
 ) -> DeleteTaskSchema:
     """
     Deletes the task with the provided title associated with
@@ -1,7 +1,15 @@
 from typing import Optional, List
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    conlist
+)
+
+from tasks.repository.dal import BulkStatus
+
+
+MAX_BULK_SIZE = 1000
 
 class TaskSchemaOut(BaseModel):
     """
@@ -23,6 +31,10 @@ class TaskSchemaOut(BaseModel):
     created: datetime
     completed_on: Optional[datetime]
 
+    class Config:
+        # the memory and sqlite backends list TaskRecords, read by attribute
+        orm_mode = True
+
 class TaskSchemaIn(BaseModel):
     """
     A Pydantic model representing a task object in the request body.
@@ -49,8 +61,11 @@ class TaskListSchema(BaseModel):
 
     Attributes:
         tasks (List[TaskSchemaOut]): A list of tasks.
+        next_cursor (Optional[str]): cursor of the next page, only set when
+        the list is paginated and more tasks are left.
     """
     tasks: List[TaskSchemaOut]
+    next_cursor: Optional[str] = None
 
 class DeleteTaskSchema(BaseModel):
     """
@@ -60,3 +75,43 @@ class DeleteTaskSchema(BaseModel):
         result (str): A message indicating whether the task was successfully deleted.
     """
     result: str
+
+class BulkTaskSchemaIn(BaseModel):
+    """
+    A Pydantic model representing the request body of bulk task creation.
+
+    Attributes:
+        tasks (List[TaskSchemaIn]): The tasks to be created.
+    """
+    tasks: conlist(TaskSchemaIn, min_items=1, max_items=MAX_BULK_SIZE)
+
+class BulkTitlesSchemaIn(BaseModel):
+    """
+    A Pydantic model representing the request body of bulk operations on
+    existing tasks.
+
+    Attributes:
+        titles (List[str]): The titles of the tasks.
+    """
+    titles: conlist(str, min_items=1, max_items=MAX_BULK_SIZE)
+
+class BulkItemSchema(BaseModel):
+    """
+    A Pydantic model representing the outcome of one title of a bulk
+    operation.
+
+    Attributes:
+        title (str): The title of the task.
+        status (BulkStatus): What happened to the task.
+    """
+    title: str
+    status: BulkStatus
+
+class BulkResultSchema(BaseModel):
+    """
+    A Pydantic model representing the response body of bulk operations.
+
+    Attributes:
+        results (List[BulkItemSchema]): The outcome of each title.
+    """
+    results: List[BulkItemSchema]
@@ -1 +1,2 @@
 from .task import Task
+from .task_version import TaskVersion
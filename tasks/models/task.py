@@ -10,6 +10,10 @@ from beanie import (
     before_event,
     Insert
 )
+from pymongo import (
+    IndexModel,
+    ASCENDING
+)
 
 
 class Task(Document):
@@ -24,6 +28,15 @@ class Task(Document):
         created (datetime): The date and time when the task was created.
         completed_on (Optional[datetime]): The date and time when the task
         was completed, if it is completed.
+
+    Settings:
+        name (str): The name of the database collection for Task documents.
+        indexes (list): a unique compound index on (user, title), which
+        serves single task lookups, title prefixes and the title order,
+        an index on (user, created, _id) for paginating a user's tasks
+        and filtering them by creation time, (user, is_completed,
+        created, _id) for the same with a status filter, and
+        (user, completed_on) for completion time ranges.
     """
     title: str = Field(
         min_length=4,
@@ -49,6 +62,30 @@ class Task(Document):
     class Settings:
         name = "tasks"
         validate_on_save = True
+        indexes = [
+            IndexModel(
+                [("user", ASCENDING), ("title", ASCENDING)],
+                name="user_title_unique",
+                unique=True
+            ),
+            IndexModel(
+                [("user", ASCENDING), ("created", ASCENDING), ("_id", ASCENDING)],
+                name="user_created"
+            ),
+            IndexModel(
+                [
+                    ("user", ASCENDING),
+                    ("is_completed", ASCENDING),
+                    ("created", ASCENDING),
+                    ("_id", ASCENDING)
+                ],
+                name="user_status_created"
+            ),
+            IndexModel(
+                [("user", ASCENDING), ("completed_on", ASCENDING)],
+                name="user_completed_on"
+            ),
+        ]
 
     @before_event(Insert)
     def completed_on(self):
@@ -0,0 +1,25 @@
+from beanie import Document
+from pydantic import Field
+
+
+class TaskVersion(Document):
+    """
+    A Pydantic model representing the version of a user's tasks in the
+    database, bumped by the data access layer on every change of them.
+
+    Attributes:
+        id (str): The email of the user, the id of the document.
+        version (int): The number of changes made to the user's tasks.
+
+    Settings:
+        name (str): The name of the database collection for TaskVersion
+        documents.
+    """
+    id: str
+    version: int = Field(
+        default=0,
+        description="Number of changes made to the tasks of the user"
+    )
+
+    class Settings:
+        name = "task_versions"
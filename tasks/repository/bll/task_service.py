@@ -1,18 +1,38 @@
 import logging
 from datetime import datetime
-from typing import List
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    AsyncIterator
+)
 
 from fastapi import (
     HTTPException,
     status
 )
 
-from tasks.repository.dal import ITaskDataAccessLayer
+from tasks.repository.dal import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskQuery,
+    DEFAULT_TASK_QUERY
+)
 from auth.models import User
+from database.exceptions import DuplicateEntryError
 from tasks.models import Task
+from kernel.metrics import PhaseTimer
+from utils.etag import make_etag
+from utils.cursor import (
+    encode_cursor,
+    decode_cursor
+)
 
 
-coreLogger = logging.getLogger('core')
+coreLogger = logging.getLogger('core.tasks')
 
 class TaskService:
     """
@@ -23,32 +43,169 @@ class TaskService:
     async def get_tasks(
         cls,
         dal: ITaskDataAccessLayer,
-        user: User
-    ) -> List[Task]:
+        user: User,
+        encode: Callable[[List[TaskView]], bytes],
+        query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> bytes:
         """
-        Retrieves all tasks associated with the specified user.
+        Retrieves the tasks associated with the specified user that match
+        the query, encoded by `encode`. The encoded list may come from the
+        task list cache.
 
         Args:
             dal (ITaskDataAccessLayer): data access layer of task model
             user (User): The user whose tasks are to be retrieved.
+            encode (Callable[[List[TaskView]], bytes]): encodes the tasks
+            as the response body.
+            query (TaskQuery): filters and order of the tasks.
 
         Returns:
-            List[Task]: A list of tasks associated with the specified user.
+            bytes: The encoded tasks associated with the specified user.
 
         Raises:
             HTTPException: If no tasks are found for the specified user.
         """
-        tasks = await dal.get_all_tasks(user.username)
-        if not tasks:
+        with PhaseTimer('dal'):
+            body = await dal.get_all_tasks_encoded(
+                user.username,
+                encode,
+                query
+            )
+        if body is None:
+            coreLogger.debug("User %s failed to retrieve tasks", user.username)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='No Tasks found'
+            )
+        coreLogger.info(
+            "get all tasks was performed by user: %s",
+            user.username
+        )
+        return body
+
+    @classmethod
+    async def get_tasks_etag(
+        cls,
+        dal: ITaskDataAccessLayer,
+        user: User
+    ) -> str:
+        """
+        Returns the ETag of the tasks of the specified user, it changes
+        whenever any of them is created, updated or deleted.
+
+        It has to be read before the tasks: a change in between makes the
+        tag older than the tasks, so the next request refetches them.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user whose tasks are to be retrieved.
+
+        Returns:
+            str: a weak ETag.
+        """
+        with PhaseTimer('dal'):
+            version = await dal.get_tasks_version(user.username)
+        return make_etag(user.username, version)
+
+    @classmethod
+    async def get_tasks_page(
+        cls,
+        dal: ITaskDataAccessLayer,
+        user: User,
+        limit: int,
+        after: Optional[str] = None,
+        query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> Tuple[List[TaskView], Optional[str]]:
+        """
+        Retrieves one page of the tasks associated with the specified user
+        that match the query.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[str]): cursor returned with the previous page,
+            only valid with the same query.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            Tuple[List[TaskView], Optional[str]]: The tasks of the page and the
+            cursor of the next page, None if this is the last page.
+
+        Raises:
+            HTTPException: If the cursor is invalid or if no tasks are found
+            for the specified user.
+        """
+        try:
+            field = query.order.field
+            position = None
+            if after:
+                position = decode_cursor(
+                    after,
+                    str if field == 'title' else datetime.fromisoformat
+                )
+            # one extra task tells whether there is a next page
+            with PhaseTimer('dal'):
+                tasks = await dal.get_tasks_page(
+                    user.username,
+                    limit + 1,
+                    position,
+                    query
+                )
+        except ValueError:
             coreLogger.debug(
-                f"User {user.username} failed to retrieve tasks"
+                "User %s sent an invalid cursor: %s",
+                user.username,
+                after
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Invalid cursor'
             )
+        if not tasks and not after:
+            coreLogger.debug("User %s failed to retrieve tasks", user.username)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='No Tasks found'
             )
-        coreLogger.info(f"get all tasks was performed by user: {user.username}")
-        return tasks
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(
+                tasks[-1][field],
+                str(tasks[-1]['_id'])
+            )
+        coreLogger.info(
+            "get tasks page was performed by user: %s",
+            user.username
+        )
+        return tasks, next_cursor
+
+    @classmethod
+    async def stream_tasks(
+        cls,
+        dal: ITaskDataAccessLayer,
+        user: User,
+        query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Yields the tasks associated with the specified user that match the
+        query as the data access layer returns them.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Yields:
+            TaskView: the tasks of the user.
+        """
+        coreLogger.info(
+            "stream tasks was performed by user: %s",
+            user.username
+        )
+        async for task in dal.iter_tasks(user.username, query):
+            yield task
 
     @classmethod
     async def create_task(
@@ -73,18 +230,23 @@ class TaskService:
         Raises:
             HTTPException: If a task with the same title already exists.
         """
-        task = await dal.get_task(user.username, title)
-        if task:
+        # the unique (user, title) index rejects existing titles
+        try:
+            with PhaseTimer('dal'):
+                task = await dal.create_task(title, user.username, description)
+        except DuplicateEntryError:
             coreLogger.debug(
-                f"User {user.username} attempted to add an existing task"
+                "User %s attempted to add an existing task",
+                user.username
             )
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail='Task with the same title already exists'
             )
-        task = await dal.create_task(title, user.username, description)
         coreLogger.info(
-            f'User {user.username} successfully created task {title}'
+            "User %s successfully created task %s",
+            user.username,
+            title
         )
         return task
 
@@ -109,18 +271,23 @@ class TaskService:
         Raises:
             HTTPException: If the task does not exist.
         """
-        task = await dal.get_task(user.username, title)
+        with PhaseTimer('dal'):
+            task = await dal.get_task(user.username, title)
         if not task:
             coreLogger.debug(
-                f"User {user.username} failed to retrieve task {title}"
+                "User %s failed to retrieve task %s",
+                user.username,
+                title
             )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail='Task does not exist'
             )
         coreLogger.info(
-                f"User {user.username} succesfully to retrieved task {title}"
-            )
+            "User %s succesfully to retrieved task %s",
+            user.username,
+            title
+        )
         return task
 
     @classmethod
@@ -144,11 +311,23 @@ class TaskService:
         Raises:
             HTTPException: If the task does not exist.
         """
-        task = await cls.get_task(dal, user, title)
-        await dal.delete_task(task)
-        coreLogger.info(
-                f"User {user.username} succesfully to deleted task {title}"
+        with PhaseTimer('dal'):
+            task = await dal.remove_task(user.username, title)
+        if task is None:
+            coreLogger.debug(
+                "User %s failed to delete task %s",
+                user.username,
+                title
             )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Task does not exist'
+            )
+        coreLogger.info(
+            "User %s succesfully to deleted task %s",
+            user.username,
+            title
+        )
         return task
 
     @classmethod
@@ -173,17 +352,102 @@ class TaskService:
         Raises:
             HTTPException: If the task does not exist.
         """
-        task = await cls.get_task(dal, user, title)
-        if task.is_completed:
+        with PhaseTimer('dal'):
+            completed_task = await dal.complete_task(user.username, title)
+        if completed_task is None:
+            # nothing pending matched, the extra lookup only runs on this
+            # error path to tell a missing task from a completed one
+            await cls.get_task(dal, user, title)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail='Task is already completed.'
             )
-        completed_task = await dal.update_task(
-             task,
-            {"is_completed": True, "completed_on": datetime.now()}
-        )
         coreLogger.info(
-                f"User {user.username} succesfully to completed task {title}"
-            )
+            "User %s succesfully to completed task %s",
+            user.username,
+            title
+        )
         return completed_task
+
+    @classmethod
+    async def create_tasks(
+            cls,
+            dal: ITaskDataAccessLayer,
+            user: User,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks associated with the specified user at once.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title, titles that
+            already exist are reported as conflicts.
+        """
+        with PhaseTimer('dal'):
+            results = await dal.create_tasks(user.username, tasks)
+        coreLogger.info(
+            "User %s bulk created %s tasks",
+            user.username,
+            len(results)
+        )
+        return results
+
+    @classmethod
+    async def complete_tasks(
+            cls,
+            dal: ITaskDataAccessLayer,
+            user: User,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks associated with the specified user as complete.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user whose tasks are to be completed.
+            titles (List[str]): The titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        with PhaseTimer('dal'):
+            results = await dal.complete_tasks(user.username, titles)
+        coreLogger.info(
+            "User %s bulk completed %s tasks",
+            user.username,
+            len(results)
+        )
+        return results
+
+    @classmethod
+    async def delete_tasks(
+            cls,
+            dal: ITaskDataAccessLayer,
+            user: User,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks associated with the specified user.
+
+        Args:
+            dal (ITaskDataAccessLayer): data access layer of task model
+            user (User): The user whose tasks are to be deleted.
+            titles (List[str]): The titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        with PhaseTimer('dal'):
+            results = await dal.delete_tasks(user.username, titles)
+        coreLogger.info(
+            "User %s bulk deleted %s tasks",
+            user.username,
+            len(results)
+        )
+        return results
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from kernel.settings.tasks import (
+    TASK_LIST_CACHE,
+    TASK_LIST_CACHE_SIZE,
+    TASK_LIST_CACHE_TTL,
+    TASK_LIST_CACHE_URL
+)
+from utils.cache import (
+    LocalCacheBackend,
+    ReadThroughCache,
+    SharedCacheBackend,
+    SingleFlight
+)
+
+
+def create_task_list_cache(kind: str) -> Optional[ReadThroughCache]:
+    """
+    takes the kind of the task list cache and returns it.
+
+    Args:
+        kind (str): "local", "shared" or "none"
+
+    Returns:
+        Optional[ReadThroughCache]: the cache, None if it is disabled
+
+    Raises:
+        ValueError: If the kind is unknown
+        RuntimeError: If the kind is shared and redis is not installed
+    """
+    if kind == 'none':
+        return None
+    if kind == 'local':
+        backend = LocalCacheBackend(TASK_LIST_CACHE_SIZE, TASK_LIST_CACHE_TTL)
+    elif kind == 'shared':
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "TASK_LIST_CACHE is shared but redis is not installed"
+            )
+        backend = SharedCacheBackend(
+            redis.from_url(TASK_LIST_CACHE_URL),
+            TASK_LIST_CACHE_TTL,
+            prefix='tasks:'
+        )
+    else:
+        raise ValueError(
+            f"Unknown task list cache: {kind}, "
+            "expected 'local', 'shared' or 'none'"
+        )
+    return ReadThroughCache(backend)
+
+
+# encoded task list responses, keyed by username
+task_list_cache = create_task_list_cache(TASK_LIST_CACHE)
+
+# task reads in flight, shared by the concurrent requests that make them
+task_read_flight = SingleFlight()
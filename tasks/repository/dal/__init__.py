@@ -1,2 +1,15 @@
-from .interface import ITaskDataAccessLayer
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskOrder,
+    TaskQuery,
+    DEFAULT_TASK_QUERY,
+    TASK_VIEW_FIELDS
+)
 from .task_queryset import TaskDataAccessLayer
+from .memory_task_queryset import MemoryTaskDataAccessLayer
+from .sqlite_task_queryset import SQLiteTaskDataAccessLayer
+from .cached_task_queryset import CachedTaskDataAccessLayer
+from .coalesced_task_queryset import CoalescedTaskDataAccessLayer
+from .factory import get_task_data_access_layer
@@ -0,0 +1,309 @@
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskQuery,
+    DEFAULT_TASK_QUERY
+)
+from tasks.models import Task
+from utils.cache import ReadThroughCache
+
+
+VERSION_SIZE = 8
+
+
+class CachedTaskDataAccessLayer(ITaskDataAccessLayer):
+    """
+    A data access layer that wraps another one and caches the encoded
+    task list of each user. Every write through it drops the list of the
+    user from the cache, the other calls, and the lists with filters or
+    another order, go straight to the wrapped layer.
+
+    A cached list starts with the tasks version it was read at. A list
+    cached by a worker that did not see a later write is detected by its
+    version and read again, so it can never be served with a newer ETag.
+    The version read for the ETag of the request is reused, an instance
+    lives for one request.
+
+    Args:
+        dal (ITaskDataAccessLayer): the wrapped data access layer
+        cache (ReadThroughCache): encoded task lists keyed by username
+    """
+    def __init__(self, dal: ITaskDataAccessLayer, cache: ReadThroughCache):
+        self.dal = dal
+        self.cache = cache
+        self._versions: Dict[str, int] = {}
+
+    async def get_all_tasks_encoded(
+            self,
+            user: str,
+            encode: Callable[[List[TaskView]], bytes],
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> Optional[bytes]:
+        """
+        Returns the encoded task list of the user from the cache, loaded
+        through the wrapped layer when it is missing or older than the tasks
+        version. Lists with filters or another order are not cached.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            encode (Callable[[List[TaskView]], bytes]): encodes the tasks.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            Optional[bytes]: The encoded tasks, None if there are none.
+        """
+        if not query.is_default:
+            return await self.dal.get_all_tasks_encoded(user, encode, query)
+        version = self._versions.get(user)
+        if version is None:
+            version = await self.get_tasks_version(user)
+        prefix = version.to_bytes(VERSION_SIZE, 'big')
+
+        async def load() -> Optional[bytes]:
+            body = await self.dal.get_all_tasks_encoded(user, encode)
+            return None if body is None else prefix + body
+
+        entry = await self.cache.get_or_load(user, load)
+        if entry is not None and not entry.startswith(prefix):
+            await self.cache.invalidate(user)
+            entry = await self.cache.get_or_load(user, load)
+        return None if entry is None else entry[VERSION_SIZE:]
+
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves the tasks of the specified user that match the query from
+        the wrapped layer.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: A list of tasks associated with the specified user.
+        """
+        return await self.dal.get_all_tasks(user, query)
+
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves one page of the tasks of the specified user from the
+        wrapped layer, pages are not cached.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[Tuple[Any, str]]): (sort field, id) of the
+            last task of the previous page.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: The tasks of the page.
+        """
+        return await self.dal.get_tasks_page(user, limit, after, query)
+
+    def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Returns the stream of the tasks of the specified user of the wrapped
+        layer.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            AsyncIterator[TaskView]: tasks ordered by (sort field, id).
+        """
+        return self.dal.iter_tasks(user, query)
+
+    async def get_tasks_version(self, user: str) -> int:
+        """
+        Retrieves the version of the tasks of the specified user and keeps
+        it for the cached list read later in the request.
+
+        Args:
+            user (str): The user whose tasks version is to be retrieved.
+
+        Returns:
+            int: The version, 0 if the tasks of the user never changed.
+        """
+        version = await self.dal.get_tasks_version(user)
+        self._versions[user] = version
+        return version
+
+    async def get_task(self, user: str, title: str) -> Task:
+        """
+        Retrieves the task with the specified title from the wrapped layer.
+
+        Args:
+            user (str): The user for whom the task is to be retrieved.
+            title (str): The title of the task to be retrieved.
+
+        Returns:
+            Task: The task with the specified title associated with the specified user.
+        """
+        return await self.dal.get_task(user, title)
+
+    async def create_task(self, title: str, user: str, description=None) -> Task:
+        """
+        Creates a new task and drops the cached list of its user.
+
+        Args:
+            title (str): The title of the task to be created.
+            user (str): The user for whom the task is to be created.
+            description (Optional[str]): The description of the task to be created.
+
+        Returns:
+            Task: The newly created task.
+        """
+        task = await self.dal.create_task(title, user, description)
+        await self.cache.invalidate(user)
+        return task
+
+    async def delete_task(self, task: Task) -> bool:
+        """
+        Deletes the specified task and drops the cached list of its user.
+
+        Args:
+            task (Task): The task to be deleted.
+
+        Returns:
+            bool: True if the task was successfully deleted, False otherwise.
+        """
+        deleted = await self.dal.delete_task(task)
+        await self.cache.invalidate(task.user)
+        return deleted
+
+    async def update_task(self, task: Task, fields: dict) -> Task:
+        """
+        Updates the specified task and drops the cached list of its user.
+
+        Args:
+            task (Task): The task to be updated.
+            fields (dict): A dictionary of fields to be updated and their new values.
+
+        Returns:
+            Task: The updated task.
+        """
+        task = await self.dal.update_task(task, fields)
+        await self.cache.invalidate(task.user)
+        return task
+
+    async def complete_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Marks the task as complete, the cached list of the user is dropped
+        only if the task changed.
+
+        Args:
+            user (str): The user whose task is to be completed.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The updated task, None if no pending task with
+            the title exists.
+        """
+        task = await self.dal.complete_task(user, title)
+        if task is not None:
+            await self.cache.invalidate(user)
+        return task
+
+    async def remove_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Deletes the task with the specified title, the cached list of the
+        user is dropped only if a task was deleted.
+
+        Args:
+            user (str): The user whose task is to be deleted.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The deleted task, None if it does not exist.
+        """
+        task = await self.dal.remove_task(user, title)
+        if task is not None:
+            await self.cache.invalidate(user)
+        return task
+
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks for the specified user and drops their cached
+        list.
+
+        Args:
+            user (str): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.create_tasks(user, tasks)
+        await self.cache.invalidate(user)
+        return results
+
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks of the specified user as complete and drops their
+        cached list.
+
+        Args:
+            user (str): The user whose tasks are to be completed.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.complete_tasks(user, titles)
+        await self.cache.invalidate(user)
+        return results
+
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks of the specified user and drops their cached
+        list.
+
+        Args:
+            user (str): The user whose tasks are to be deleted.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.delete_tasks(user, titles)
+        await self.cache.invalidate(user)
+        return results
@@ -0,0 +1,306 @@
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskQuery,
+    DEFAULT_TASK_QUERY
+)
+from tasks.models import Task
+from utils.cache import SingleFlight
+
+
+class CoalescedTaskDataAccessLayer(ITaskDataAccessLayer):
+    """
+    A data access layer that wraps another one and shares its reads
+    between concurrent identical calls, e.g. the requests of a dashboard
+    refresh: N identical reads in flight cost one query and return the
+    same result to all of them.
+
+    A write through it forgets the reads of the user in flight, so a read
+    that starts after the write never joins one that may have missed it.
+    The shared results must not be changed by the callers.
+
+    Args:
+        dal (ITaskDataAccessLayer): the wrapped data access layer
+        flight (SingleFlight): the reads in flight, keyed by
+        (method, user, arguments), shared by every instance
+    """
+    def __init__(self, dal: ITaskDataAccessLayer, flight: SingleFlight):
+        self.dal = dal
+        self.flight = flight
+
+    def _forget(self, user: str) -> None:
+        self.flight.forget_if(lambda key: key[1] == user)
+
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves the tasks of the specified user that match the query,
+        joining an identical call in flight if there is one.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: A list of tasks associated with the specified user.
+        """
+        return await self.flight.do(
+            ('get_all_tasks', user, query),
+            lambda: self.dal.get_all_tasks(user, query)
+        )
+
+    async def get_all_tasks_encoded(
+            self,
+            user: str,
+            encode: Callable[[List[TaskView]], bytes],
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> Optional[bytes]:
+        """
+        Returns the encoded tasks of the user matching the query, concurrent
+        calls with the same encoder share the reading and the encoding.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            encode (Callable[[List[TaskView]], bytes]): encodes the tasks.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            Optional[bytes]: The encoded tasks, None if there are none.
+        """
+        return await self.flight.do(
+            ('get_all_tasks_encoded', user, encode, query),
+            lambda: self.dal.get_all_tasks_encoded(user, encode, query)
+        )
+
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves one page of the tasks of the specified user, shared by the
+        calls for the same page.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[Tuple[Any, str]]): (sort field, id) of the
+            last task of the previous page.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: The tasks of the page.
+        """
+        return await self.flight.do(
+            ('get_tasks_page', user, limit, after, query),
+            lambda: self.dal.get_tasks_page(user, limit, after, query)
+        )
+
+    def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Returns the stream of the tasks of the specified user of the wrapped
+        layer, a stream is never shared.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            AsyncIterator[TaskView]: tasks ordered by (sort field, id).
+        """
+        # a stream is consumed at the pace of its own client
+        return self.dal.iter_tasks(user, query)
+
+    async def get_tasks_version(self, user: str) -> int:
+        """
+        Retrieves the version of the tasks of the specified user, one read
+        answers every request of the user in flight.
+
+        Args:
+            user (str): The user whose tasks version is to be retrieved.
+
+        Returns:
+            int: The version, 0 if the tasks of the user never changed.
+        """
+        return await self.flight.do(
+            ('get_tasks_version', user),
+            lambda: self.dal.get_tasks_version(user)
+        )
+
+    async def get_task(self, user: str, title: str) -> Task:
+        """
+        Retrieves the task with the specified title, shared by the calls for
+        the same title.
+
+        Args:
+            user (str): The user for whom the task is to be retrieved.
+            title (str): The title of the task to be retrieved.
+
+        Returns:
+            Task: The task with the specified title associated with the specified user.
+        """
+        return await self.flight.do(
+            ('get_task', user, title),
+            lambda: self.dal.get_task(user, title)
+        )
+
+    async def create_task(self, title: str, user: str, description=None) -> Task:
+        """
+        Creates a new task, then forgets the reads of its user in flight.
+
+        Args:
+            title (str): The title of the task to be created.
+            user (str): The user for whom the task is to be created.
+            description (Optional[str]): The description of the task to be created.
+
+        Returns:
+            Task: The newly created task.
+        """
+        task = await self.dal.create_task(title, user, description)
+        self._forget(user)
+        return task
+
+    async def delete_task(self, task: Task) -> bool:
+        """
+        Deletes the specified task, then forgets the reads of its user in
+        flight.
+
+        Args:
+            task (Task): The task to be deleted.
+
+        Returns:
+            bool: True if the task was successfully deleted, False otherwise.
+        """
+        deleted = await self.dal.delete_task(task)
+        self._forget(task.user)
+        return deleted
+
+    async def update_task(self, task: Task, fields: dict) -> Task:
+        """
+        Updates the specified task, then forgets the reads of its user in
+        flight.
+
+        Args:
+            task (Task): The task to be updated.
+            fields (dict): A dictionary of fields to be updated and their new values.
+
+        Returns:
+            Task: The updated task.
+        """
+        task = await self.dal.update_task(task, fields)
+        self._forget(task.user)
+        return task
+
+    async def complete_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Marks the task as complete, then forgets the reads of the user in
+        flight.
+
+        Args:
+            user (str): The user whose task is to be completed.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The updated task, None if no pending task with
+            the title exists.
+        """
+        task = await self.dal.complete_task(user, title)
+        self._forget(user)
+        return task
+
+    async def remove_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Deletes the task with the specified title, then forgets the reads of
+        the user in flight.
+
+        Args:
+            user (str): The user whose task is to be deleted.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The deleted task, None if it does not exist.
+        """
+        task = await self.dal.remove_task(user, title)
+        self._forget(user)
+        return task
+
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks for the specified user, then forgets their reads
+        in flight.
+
+        Args:
+            user (str): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.create_tasks(user, tasks)
+        self._forget(user)
+        return results
+
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks of the specified user as complete, then forgets
+        their reads in flight.
+
+        Args:
+            user (str): The user whose tasks are to be completed.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.complete_tasks(user, titles)
+        self._forget(user)
+        return results
+
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks of the specified user, then forgets their reads in
+        flight.
+
+        Args:
+            user (str): The user whose tasks are to be deleted.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = await self.dal.delete_tasks(user, titles)
+        self._forget(user)
+        return results
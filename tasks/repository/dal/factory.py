@@ -0,0 +1,87 @@
+from typing import Optional
+
+from .interface import ITaskDataAccessLayer
+from .task_queryset import (
+    TaskDataAccessLayer,
+    insert_tasks
+)
+from .memory_task_queryset import MemoryTaskDataAccessLayer
+from .sqlite_task_queryset import SQLiteTaskDataAccessLayer
+from .cached_task_queryset import CachedTaskDataAccessLayer
+from .coalesced_task_queryset import CoalescedTaskDataAccessLayer
+from tasks.repository.cache import (
+    task_list_cache,
+    task_read_flight
+)
+from database.backends import (
+    coalesces_reads,
+    get_data_access_layer_class
+)
+from kernel.settings.database import STORAGE_BACKEND
+from kernel.settings.tasks import (
+    CREATE_BATCH_WINDOW_MS,
+    CREATE_BATCH_SIZE
+)
+from utils.batch import WriteBatcher
+
+
+DATA_ACCESS_LAYERS = {
+    'mongodb': TaskDataAccessLayer,
+    'memory': MemoryTaskDataAccessLayer,
+    'sqlite': SQLiteTaskDataAccessLayer,
+}
+
+
+data_access_layer_class = get_data_access_layer_class(
+    DATA_ACCESS_LAYERS,
+    STORAGE_BACKEND
+)
+coalesce_reads = coalesces_reads(STORAGE_BACKEND)
+
+
+def create_task_insert_batcher(
+        backend: str,
+        window_ms: float,
+        max_size: int
+) -> Optional[WriteBatcher]:
+    """
+    takes the storage backend and the batch settings and returns the
+    batcher of the task inserts.
+
+    Args:
+        backend (str): one of DATA_ACCESS_LAYERS
+        window_ms (float): longest wait of an insert for its batch, in ms
+        max_size (int): maximum number of inserts of a batch
+
+    Returns:
+        Optional[WriteBatcher]: the batcher, None if it is disabled or
+        the backend is not mongodb
+    """
+    if window_ms <= 0 or max_size <= 1 or backend != 'mongodb':
+        return None
+    return WriteBatcher(insert_tasks, max_size, window_ms / 1000)
+
+
+# concurrent create_task calls of this process merged into one insert_many
+task_insert_batcher = create_task_insert_batcher(
+    STORAGE_BACKEND,
+    CREATE_BATCH_WINDOW_MS,
+    CREATE_BATCH_SIZE
+)
+
+
+def get_task_data_access_layer() -> ITaskDataAccessLayer:
+    """
+    Dependency that returns the task data access layer of the configured
+    storage backend, its inserts batched, its reads coalesced and wrapped
+    by the task list cache when they are enabled.
+    """
+    if task_insert_batcher is not None:
+        dal = TaskDataAccessLayer(task_insert_batcher)
+    else:
+        dal = data_access_layer_class()
+    if coalesce_reads:
+        dal = CoalescedTaskDataAccessLayer(dal, task_read_flight)
+    if task_list_cache is not None:
+        return CachedTaskDataAccessLayer(dal, task_list_cache)
+    return dal
@@ -1,13 +1,149 @@
 from abc import ABC, abstractmethod
-from typing import List
+from enum import Enum
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    AsyncIterator
+)
+
+from pydantic import BaseModel
 
 from tasks.models import Task
 
 
+# a task read for output: a dict of its response fields and its _id, built
+# without validating a Task document
+TaskView = Dict[str, Any]
+TASK_VIEW_FIELDS = (
+    'title',
+    'description',
+    'is_completed',
+    'user',
+    'created',
+    'completed_on',
+)
+
+class TaskOrder(str, Enum):
+    """
+    Order of a task list, a leading "-" sorts descending. Ties are broken
+    by _id in the same direction.
+    """
+    CREATED = "created"
+    CREATED_DESC = "-created"
+    TITLE = "title"
+    TITLE_DESC = "-title"
+
+    @property
+    def field(self) -> str:
+        return self.value.lstrip('-')
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith('-')
+
+
+class TaskQuery(BaseModel):
+    """
+    Filters and order of a task list. Ranges are half-open, the lower
+    bound is included and the upper one is not.
+
+    Attributes:
+        is_completed (Optional[bool]): only completed or only pending tasks.
+        created_from (Optional[datetime]): lower bound of `created`.
+        created_to (Optional[datetime]): upper bound of `created`.
+        completed_from (Optional[datetime]): lower bound of `completed_on`.
+        completed_to (Optional[datetime]): upper bound of `completed_on`.
+        title_prefix (Optional[str]): start of the title, titles are
+        stored lowercase so it is matched lowercase.
+        order (TaskOrder): order of the tasks.
+    """
+    is_completed: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    completed_from: Optional[datetime] = None
+    completed_to: Optional[datetime] = None
+    title_prefix: Optional[str] = None
+    order: TaskOrder = TaskOrder.CREATED
+
+    class Config:
+        # immutable and hashable, so it can be part of a cache key
+        frozen = True
+
+    @property
+    def is_default(self) -> bool:
+        """
+        Whether the query is the plain list of all the tasks.
+        """
+        return not self.dict(exclude_defaults=True)
+
+
+DEFAULT_TASK_QUERY = TaskQuery()
+
+
+class BulkStatus(str, Enum):
+    """
+    Outcome of one title of a bulk operation.
+    """
+    CREATED = "created"
+    COMPLETED = "completed"
+    DELETED = "deleted"
+    CONFLICT = "conflict"
+    INVALID = "invalid"
+    ALREADY_COMPLETED = "already_completed"
+    NOT_FOUND = "not_found"
+    # rejected by the database for another reason than a conflict
+    FAILED = "failed"
+
+
 class ITaskDataAccessLayer(ABC):
 
     @abstractmethod
-    async def get_all_tasks(self, user: str) -> List[Task]:
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        raise NotImplementedError
+
+    async def get_all_tasks_encoded(
+            self,
+            user: str,
+            encode: Callable[[List[TaskView]], bytes],
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> Optional[bytes]:
+        """
+        Returns the tasks of the user matching the query encoded by
+        `encode`, None when there are none. Caching layers serve it
+        without reading or encoding the tasks.
+        """
+        tasks = await self.get_all_tasks(user, query)
+        return encode(tasks) if tasks else None
+
+    @abstractmethod
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_tasks_version(self, user: str) -> int:
         raise NotImplementedError
 
     @abstractmethod
@@ -25,3 +161,35 @@ class ITaskDataAccessLayer(ABC):
     @abstractmethod
     async def update_task(self, task: Task, fields: dict) -> Task:
         raise NotImplementedError
+
+    @abstractmethod
+    async def complete_task(self, user: str, title: str) -> Optional[Task]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def remove_task(self, user: str, title: str) -> Optional[Task]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        raise NotImplementedError
@@ -0,0 +1,458 @@
+from bisect import (
+    bisect_left,
+    bisect_right,
+    insort
+)
+from collections import defaultdict
+from operator import attrgetter
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskQuery,
+    DEFAULT_TASK_QUERY
+)
+from .records import (
+    TaskRecord,
+    now,
+    validate_title
+)
+from database.exceptions import DuplicateEntryError
+
+
+class UserTasks:
+    """
+    The tasks of one user: by title, which is unique per user, and sorted
+    by (created, id), the default order of the lists and of their pages.
+
+    Attributes:
+        by_title (Dict[str, TaskRecord]): tasks keyed by title.
+        by_created (List[TaskRecord]): tasks sorted by (created, id).
+        version (int): changes on every create, update and delete.
+    """
+    __slots__ = ('by_title', 'by_created', 'version')
+
+    def __init__(self):
+        self.by_title: Dict[str, TaskRecord] = {}
+        self.by_created: List[TaskRecord] = []
+        self.version = 0
+
+    def add(self, task: TaskRecord) -> None:
+        self.by_title[task.title] = task
+        # tasks are created in time order, so this is mostly an append
+        insort(self.by_created, task, key=_position)
+
+    def discard(self, task: TaskRecord) -> None:
+        del self.by_title[task.title]
+        index = bisect_left(self.by_created, _position(task), key=_position)
+        del self.by_created[index]
+
+
+_position = attrgetter('created', 'id')
+_title_position = attrgetter('title', 'id')
+
+# tasks of every user of this process, users are never removed so their
+# version keeps growing even when all their tasks are deleted
+task_store: Dict[str, UserTasks] = defaultdict(UserTasks)
+
+
+def record_filter(query: TaskQuery) -> Callable[[TaskRecord], bool]:
+    """
+    Returns the predicate of the filters of a task query, except the
+    created range which is applied on the sorted tasks.
+    """
+    checks = []
+    if query.is_completed is not None:
+        checks.append(lambda task: task.is_completed == query.is_completed)
+    if query.completed_from is not None:
+        checks.append(lambda task: task.completed_on is not None
+                      and task.completed_on >= query.completed_from)
+    if query.completed_to is not None:
+        checks.append(lambda task: task.completed_on is not None
+                      and task.completed_on < query.completed_to)
+    if query.title_prefix:
+        prefix = query.title_prefix.lower()
+        checks.append(lambda task: task.title.startswith(prefix))
+    return lambda task: all(check(task) for check in checks)
+
+
+def select(
+        tasks: UserTasks,
+        query: TaskQuery,
+        after: Optional[Tuple[Any, str]] = None
+) -> List[TaskRecord]:
+    """
+    Returns the tasks matching the query in its order, only the ones past
+    `after` when it is given. The created range and the position of
+    `after` in the created order are found by bisection.
+
+    Raises:
+        ValueError: If the id in `after` is not a valid ObjectId.
+    """
+    if after is not None:
+        key, id = after
+        if not ObjectId.is_valid(id):
+            raise ValueError(f"Invalid task id: {id}")
+        after = (key, ObjectId(id))
+    entries = tasks.by_created
+    start, end = 0, len(entries)
+    if query.created_from is not None:
+        start = bisect_left(entries, query.created_from, key=attrgetter('created'))
+    if query.created_to is not None:
+        end = bisect_left(entries, query.created_to, key=attrgetter('created'))
+    order = query.order
+    if order.field == 'created' and after is not None:
+        if order.descending:
+            end = min(end, bisect_left(entries, after, key=_position))
+        else:
+            start = max(start, bisect_right(entries, after, key=_position))
+    selected = list(filter(record_filter(query), entries[start:end]))
+    if order.field == 'title':
+        selected.sort(key=_title_position)
+        if after is not None:
+            if order.descending:
+                selected = selected[:bisect_left(selected, after, key=_title_position)]
+            else:
+                selected = selected[bisect_right(selected, after, key=_title_position):]
+    if order.descending:
+        selected.reverse()
+    return selected
+
+
+class MemoryTaskDataAccessLayer(ITaskDataAccessLayer):
+    """
+    A data access layer that keeps the tasks in the memory of the process,
+    for single process deployments, edge caches and load tests that do
+    not need MongoDB. Tasks do not survive restarts and worker processes
+    do not share them.
+
+    Every method runs without awaiting, so each one is atomic on the event
+    loop. The returned tasks are the stored records, they must only be
+    changed through the data access layer.
+    """
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves the tasks of the specified user that match the query.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: A list of tasks associated with the specified user.
+        """
+        tasks = task_store.get(user)
+        if tasks is None:
+            return []
+        return [task.view() for task in select(tasks, query)]
+
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves one page of the tasks of the specified user that match
+        the query, ordered by (sort field, id). The start of the page is
+        found by bisection when the tasks are ordered by creation.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[Tuple[Any, str]]): (sort field, id) of the
+            last task of the previous page.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: The tasks of the page.
+
+        Raises:
+            ValueError: If the id in `after` is not a valid ObjectId.
+        """
+        tasks = task_store.get(user)
+        if tasks is None:
+            return []
+        return [task.view() for task in select(tasks, query, after)[:limit]]
+
+    async def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Yields the tasks of the specified user that match the query, as
+        they were when the iteration started.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Yields:
+            TaskView: tasks ordered by (sort field, id).
+        """
+        tasks = task_store.get(user)
+        if tasks is None:
+            return
+        # selected up front, the tasks may change while the caller awaits
+        for task in select(tasks, query):
+            yield task.view()
+
+    async def get_tasks_version(self, user: str) -> int:
+        """
+        Retrieves the version of the tasks of the specified user.
+
+        Args:
+            user (str): The user whose tasks version is to be retrieved.
+
+        Returns:
+            int: The version, 0 if the tasks of the user never changed.
+        """
+        tasks = task_store.get(user)
+        return 0 if tasks is None else tasks.version
+
+    async def get_task(self, user: str, title: str) -> Optional[TaskRecord]:
+        """
+        Retrieves the task with the specified title associated with the specified user.
+
+        Args:
+            user (str): The user for whom the task is to be retrieved.
+            title (str): The title of the task to be retrieved.
+
+        Returns:
+            Optional[TaskRecord]: The stored task, None if it does not exist.
+        """
+        tasks = task_store.get(user)
+        return None if tasks is None else tasks.by_title.get(title)
+
+    async def create_task(
+            self,
+            title: str,
+            user: str,
+            description=None
+    ) -> TaskRecord:
+        """
+        Creates a new task associated with the specified user.
+
+        Args:
+            title (str): The title of the task to be created.
+            user (str): The user for whom the task is to be created.
+            description (Optional[str]): The description of the task to be created.
+
+        Returns:
+            TaskRecord: The newly created task.
+
+        Raises:
+            DuplicateEntryError: If the user already has a task with the title.
+            ValidationError: If the title is too short or too long.
+        """
+        title = validate_title(title)
+        tasks = task_store[user]
+        if title in tasks.by_title:
+            raise DuplicateEntryError(title)
+        task = TaskRecord.new(title, user, description)
+        tasks.add(task)
+        tasks.version += 1
+        return task
+
+    async def delete_task(self, task: TaskRecord) -> bool:
+        """
+        Deletes the specified task.
+
+        Args:
+            task (TaskRecord): The task to be deleted.
+
+        Returns:
+            bool: True if the task was deleted, False if it was no longer
+            stored.
+        """
+        tasks = task_store.get(task.user)
+        if tasks is None or tasks.by_title.get(task.title) is not task:
+            return False
+        tasks.discard(task)
+        tasks.version += 1
+        return True
+
+    async def update_task(self, task: TaskRecord, fields: dict) -> TaskRecord:
+        """
+        Updates the specified task with the specified fields.
+
+        Args:
+            task (TaskRecord): The task to be updated.
+            fields (dict): A dictionary of fields to be updated and their new values.
+
+        Returns:
+            TaskRecord: The updated task.
+        """
+        tasks = task_store[task.user]
+        # re-added so the title and created indexes follow the new values
+        tasks.discard(task)
+        for field, value in fields.items():
+            setattr(task, field, value)
+        tasks.add(task)
+        tasks.version += 1
+        return task
+
+    async def complete_task(
+            self,
+            user: str,
+            title: str
+    ) -> Optional[TaskRecord]:
+        """
+        Marks the task as complete if it is not completed yet.
+
+        Args:
+            user (str): The user whose task is to be completed.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[TaskRecord]: The updated task, None if no pending task
+            with the title exists.
+        """
+        task = await self.get_task(user, title)
+        if task is None or task.is_completed:
+            return None
+        task.is_completed = True
+        task.completed_on = now()
+        task_store[user].version += 1
+        return task
+
+    async def remove_task(
+            self,
+            user: str,
+            title: str
+    ) -> Optional[TaskRecord]:
+        """
+        Deletes the task with the specified title.
+
+        Args:
+            user (str): The user whose task is to be deleted.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[TaskRecord]: The deleted task, None if it does not exist.
+        """
+        task = await self.get_task(user, title)
+        if task is None:
+            return None
+        tasks = task_store[user]
+        tasks.discard(task)
+        tasks.version += 1
+        return task
+
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks for the specified user, a title is created once
+        even if it is given several times.
+
+        Args:
+            user (str): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = {}
+        stored = task_store[user]
+        for title, description in tasks:
+            if title in results:
+                continue
+            try:
+                lowered = validate_title(title)
+            except ValidationError:
+                results[title] = BulkStatus.INVALID
+                continue
+            if lowered in stored.by_title:
+                results[title] = BulkStatus.CONFLICT
+                continue
+            stored.add(TaskRecord.new(lowered, user, description))
+            results[title] = BulkStatus.CREATED
+        if BulkStatus.CREATED in results.values():
+            stored.version += 1
+        return results
+
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks of the specified user as complete, all of them
+        with the same completion time.
+
+        Args:
+            user (str): The user whose tasks are to be completed.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = dict.fromkeys(titles, BulkStatus.NOT_FOUND)
+        tasks = task_store.get(user)
+        if tasks is None:
+            return results
+        completed_on = now()
+        for title in results:
+            task = tasks.by_title.get(title)
+            if task is None:
+                continue
+            if task.is_completed:
+                results[title] = BulkStatus.ALREADY_COMPLETED
+                continue
+            task.is_completed = True
+            task.completed_on = completed_on
+            results[title] = BulkStatus.COMPLETED
+        if BulkStatus.COMPLETED in results.values():
+            tasks.version += 1
+        return results
+
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks of the specified user.
+
+        Args:
+            user (str): The user whose tasks are to be deleted.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = dict.fromkeys(titles, BulkStatus.NOT_FOUND)
+        tasks = task_store.get(user)
+        if tasks is None:
+            return results
+        for title in results:
+            task = tasks.by_title.get(title)
+            if task is not None:
+                tasks.discard(task)
+                results[title] = BulkStatus.DELETED
+        if BulkStatus.DELETED in results.values():
+            tasks.version += 1
+        return results
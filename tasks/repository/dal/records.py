@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import (
+    Any,
+    Optional
+)
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from .interface import TaskView
+from tasks.models import Task
+
+
+def now() -> datetime:
+    """
+    The current time at the millisecond precision of BSON dates, so tasks
+    read the same from every storage backend.
+    """
+    moment = datetime.now()
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+
+def validate_title(title: str) -> str:
+    """
+    Checks the title against the constraints of Task.title and returns it
+    lowercase, as Task stores it.
+
+    Raises:
+        ValidationError: If the title is too short or too long.
+    """
+    title, error = Task.__fields__['title'].validate(title, {}, loc='title')
+    if error:
+        raise ValidationError([error], Task)
+    return title.lower()
+
+
+class TaskRecord:
+    """
+    A task of the storage backends other than MongoDB, it has the
+    attributes of a Task document the services and response models read.
+    """
+    __slots__ = (
+        'id',
+        'title',
+        'description',
+        'is_completed',
+        'user',
+        'created',
+        'completed_on'
+    )
+
+    def __init__(
+            self,
+            id: Any,
+            title: str,
+            description: Optional[str],
+            is_completed: bool,
+            user: str,
+            created: datetime,
+            completed_on: Optional[datetime]
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.is_completed = is_completed
+        self.user = user
+        self.created = created
+        self.completed_on = completed_on
+
+    @classmethod
+    def new(
+            cls,
+            title: str,
+            user: str,
+            description: Optional[str] = None
+    ) -> 'TaskRecord':
+        """
+        A pending task created now, `title` has to be validated already.
+        """
+        return cls(ObjectId(), title, description, False, user, now(), None)
+
+    def view(self) -> TaskView:
+        return {
+            '_id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'is_completed': self.is_completed,
+            'user': self.user,
+            'created': self.created,
+            'completed_on': self.completed_on,
+        }
+
+    def __repr__(self):
+        return f"<task: {self.title} - user: {self.user}>"
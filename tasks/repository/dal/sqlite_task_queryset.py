@@ -0,0 +1,584 @@
+import json
+import sqlite3
+from datetime import (
+    datetime,
+    timezone
+)
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskQuery,
+    DEFAULT_TASK_QUERY
+)
+from .records import (
+    TaskRecord,
+    now,
+    validate_title
+)
+from database.sqlite import (
+    SQLitePool,
+    sqlite_pool
+)
+from database.exceptions import DuplicateEntryError
+
+
+COLUMNS = "id, title, description, is_completed, user, created, completed_on"
+UPDATABLE_COLUMNS = ('title', 'description', 'is_completed', 'completed_on')
+# tasks read per query while streaming, no connection is held in between
+STREAM_BATCH_SIZE = 1000
+
+INSERT_TASK = f"INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+BUMP_VERSION = (
+    "INSERT INTO task_versions (user, version) VALUES (?, 1) "
+    "ON CONFLICT (user) DO UPDATE SET version = version + 1"
+)
+# a list of titles is bound as one JSON parameter, so the statement text
+# and its prepared statement are the same for any number of titles
+IN_TITLES = "user = ? AND title IN (SELECT value FROM json_each(?))"
+
+
+def to_text(moment: datetime) -> str:
+    """
+    Stores datetimes as fixed width ISO 8601 text, which sorts in time
+    order. Aware datetimes are converted to naive UTC like BSON does.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat(timespec='microseconds')
+
+
+def from_text(text: Optional[str]) -> Optional[datetime]:
+    return None if text is None else datetime.fromisoformat(text)
+
+
+def to_view(row: tuple) -> TaskView:
+    id, title, description, is_completed, user, created, completed_on = row
+    return {
+        '_id': id,
+        'title': title,
+        'description': description,
+        'is_completed': bool(is_completed),
+        'user': user,
+        'created': datetime.fromisoformat(created),
+        'completed_on': from_text(completed_on),
+    }
+
+
+def to_record(row: Optional[tuple]) -> Optional[TaskRecord]:
+    if row is None:
+        return None
+    id, title, description, is_completed, user, created, completed_on = row
+    return TaskRecord(
+        id,
+        title,
+        description,
+        bool(is_completed),
+        user,
+        datetime.fromisoformat(created),
+        from_text(completed_on)
+    )
+
+
+def to_param(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return to_text(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def record_params(task: TaskRecord) -> tuple:
+    return (
+        task.id,
+        task.title,
+        task.description,
+        int(task.is_completed),
+        task.user,
+        to_text(task.created),
+        None if task.completed_on is None else to_text(task.completed_on)
+    )
+
+
+def select_views(
+        user: str,
+        query: TaskQuery,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, str]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Translates a task query into a SELECT of the task columns. The
+    conditions follow the indexes of the tasks table like view_filter
+    does for MongoDB, and (sort field, id) row values locate keyset pages.
+
+    Raises:
+        ValueError: If the id in `after` is not a valid ObjectId.
+    """
+    clauses, params = ["user = ?"], [user]
+    if query.is_completed is not None:
+        clauses.append("is_completed = ?")
+        params.append(int(query.is_completed))
+    for column, start, end in (
+            ("created", query.created_from, query.created_to),
+            ("completed_on", query.completed_from, query.completed_to)
+    ):
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(to_text(start))
+        if end is not None:
+            clauses.append(f"{column} < ?")
+            params.append(to_text(end))
+    if query.title_prefix:
+        # a range rather than LIKE, so the (user, title) index bounds it;
+        # U+10FFFF is the largest code point
+        prefix = query.title_prefix.lower()
+        clauses.append("title >= ? AND title < ?")
+        params.extend((prefix, prefix + '\U0010ffff'))
+    order = query.order
+    direction = "DESC" if order.descending else "ASC"
+    if after is not None:
+        key, id = after
+        if not ObjectId.is_valid(id):
+            raise ValueError(f"Invalid task id: {id}")
+        clauses.append(
+            f"({order.field}, id) {'<' if order.descending else '>'} (?, ?)"
+        )
+        params.extend((to_param(key), id))
+    sql = (
+        f"SELECT {COLUMNS} FROM tasks WHERE {' AND '.join(clauses)} "
+        f"ORDER BY {order.field} {direction}, id {direction}"
+    )
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def _fetch_views(
+        connection: sqlite3.Connection,
+        sql: str,
+        params: List[Any]
+) -> List[TaskView]:
+    return [to_view(row) for row in connection.execute(sql, params)]
+
+
+def _fetch_one(
+        connection: sqlite3.Connection,
+        sql: str,
+        params: List[Any]
+) -> Optional[tuple]:
+    return connection.execute(sql, params).fetchone()
+
+
+class SQLiteTaskDataAccessLayer(ITaskDataAccessLayer):
+    """
+    A data access layer that stores the tasks in SQLite, for single node
+    installs that do not run MongoDB.
+
+    Every call does all of its statements in one hop to a connection of
+    the pool, writes in one transaction that also bumps the tasks version
+    of the user. Bulk operations bind their titles as one JSON array, so
+    each is a single statement whatever the number of titles.
+
+    Args:
+        pool (SQLitePool): the connections, the pool of the process when
+        not given
+    """
+    def __init__(self, pool: SQLitePool = None):
+        self.pool = pool or sqlite_pool
+
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves the tasks of the specified user that match the query, in
+        one SELECT of the response columns only.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: A list of tasks associated with the specified user.
+        """
+        return await self.pool.read(_fetch_views, *select_views(user, query))
+
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves one page of the tasks of the specified user that match
+        the query, ordered by (sort field, id). Pages are located by
+        keyset, the same as the MongoDB data access layer.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[Tuple[Any, str]]): (sort field, id) of the
+            last task of the previous page.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: The tasks of the page.
+
+        Raises:
+            ValueError: If the id in `after` is not a valid ObjectId.
+        """
+        return await self.pool.read(
+            _fetch_views,
+            *select_views(user, query, limit, after)
+        )
+
+    async def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Yields the tasks of the specified user that match the query, read
+        STREAM_BATCH_SIZE at a time.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Yields:
+            TaskView: tasks ordered by (sort field, id).
+        """
+        # read as keyset pages, so a slow client never holds a connection
+        after = None
+        while True:
+            tasks = await self.get_tasks_page(
+                user,
+                STREAM_BATCH_SIZE,
+                after,
+                query
+            )
+            for task in tasks:
+                yield task
+            if len(tasks) < STREAM_BATCH_SIZE:
+                return
+            after = (tasks[-1][query.order.field], tasks[-1]['_id'])
+
+    async def get_tasks_version(self, user: str) -> int:
+        """
+        Retrieves the version of the tasks of the specified user, from the
+        task_versions table.
+
+        Args:
+            user (str): The user whose tasks version is to be retrieved.
+
+        Returns:
+            int: The version, 0 if the tasks of the user never changed.
+        """
+        row = await self.pool.read(
+            _fetch_one,
+            "SELECT version FROM task_versions WHERE user = ?",
+            [user]
+        )
+        return 0 if row is None else row[0]
+
+    async def get_task(self, user: str, title: str) -> Optional[TaskRecord]:
+        """
+        Retrieves the task with the specified title associated with the specified user.
+
+        Args:
+            user (str): The user for whom the task is to be retrieved.
+            title (str): The title of the task to be retrieved.
+
+        Returns:
+            Optional[TaskRecord]: The task, None if it does not exist.
+        """
+        row = await self.pool.read(
+            _fetch_one,
+            f"SELECT {COLUMNS} FROM tasks WHERE user = ? AND title = ?",
+            [user, title]
+        )
+        return to_record(row)
+
+    async def create_task(
+            self,
+            title: str,
+            user: str,
+            description=None
+    ) -> TaskRecord:
+        """
+        Creates a new task associated with the specified user.
+
+        Args:
+            title (str): The title of the task to be created.
+            user (str): The user for whom the task is to be created.
+            description (Optional[str]): The description of the task to be created.
+
+        Returns:
+            TaskRecord: The newly created task.
+
+        Raises:
+            DuplicateEntryError: If the user already has a task with the title.
+            ValidationError: If the title is too short or too long.
+        """
+        task = TaskRecord.new(validate_title(title), user, description)
+        task.id = str(task.id)
+
+        def insert(connection: sqlite3.Connection) -> None:
+            try:
+                connection.execute(INSERT_TASK, record_params(task))
+            except sqlite3.IntegrityError as e:
+                raise DuplicateEntryError(task.title) from e
+            connection.execute(BUMP_VERSION, (user,))
+
+        await self.pool.write(insert)
+        return task
+
+    async def delete_task(self, task: TaskRecord) -> bool:
+        """
+        Deletes the specified task.
+
+        Args:
+            task (TaskRecord): The task to be deleted.
+
+        Returns:
+            bool: True if the task was deleted, False if no row had its id.
+        """
+        def delete(connection: sqlite3.Connection) -> bool:
+            cursor = connection.execute(
+                "DELETE FROM tasks WHERE id = ?",
+                (task.id,)
+            )
+            if cursor.rowcount:
+                connection.execute(BUMP_VERSION, (task.user,))
+            return cursor.rowcount > 0
+
+        return await self.pool.write(delete)
+
+    async def update_task(self, task: TaskRecord, fields: dict) -> TaskRecord:
+        """
+        Updates the specified task with the specified fields.
+
+        Args:
+            task (TaskRecord): The task to be updated.
+            fields (dict): A dictionary of fields to be updated and their new values.
+
+        Returns:
+            TaskRecord: The updated task.
+
+        Raises:
+            ValueError: If a field is not an updatable column.
+        """
+        unknown = set(fields) - set(UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown task fields: {', '.join(unknown)}")
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ?",
+                [to_param(value) for value in fields.values()] + [task.id]
+            )
+            connection.execute(BUMP_VERSION, (task.user,))
+
+        await self.pool.write(update)
+        for field, value in fields.items():
+            setattr(task, field, value)
+        return task
+
+    async def complete_task(
+            self,
+            user: str,
+            title: str
+    ) -> Optional[TaskRecord]:
+        """
+        Marks the task as complete if it is not completed yet, with an
+        UPDATE that only matches a pending task.
+
+        Args:
+            user (str): The user whose task is to be completed.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[TaskRecord]: The updated task, None if no pending task
+            with the title exists.
+        """
+        def complete(connection: sqlite3.Connection) -> Optional[tuple]:
+            row = connection.execute(
+                "UPDATE tasks SET is_completed = 1, completed_on = ? "
+                "WHERE user = ? AND title = ? AND is_completed = 0 "
+                f"RETURNING {COLUMNS}",
+                (to_text(now()), user, title)
+            ).fetchone()
+            if row is not None:
+                connection.execute(BUMP_VERSION, (user,))
+            return row
+
+        return to_record(await self.pool.write(complete))
+
+    async def remove_task(
+            self,
+            user: str,
+            title: str
+    ) -> Optional[TaskRecord]:
+        """
+        Deletes the task with the specified title.
+
+        Args:
+            user (str): The user whose task is to be deleted.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[TaskRecord]: The deleted task, None if it does not exist.
+        """
+        def remove(connection: sqlite3.Connection) -> Optional[tuple]:
+            row = connection.execute(
+                "DELETE FROM tasks WHERE user = ? AND title = ? "
+                f"RETURNING {COLUMNS}",
+                (user, title)
+            ).fetchone()
+            if row is not None:
+                connection.execute(BUMP_VERSION, (user,))
+            return row
+
+        return to_record(await self.pool.write(remove))
+
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks for the specified user, titles that already
+        exist are looked up in the same transaction and reported as
+        conflicts.
+
+        Args:
+            user (str): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = {}
+        records = {}
+        for title, description in tasks:
+            if title in results:
+                continue
+            try:
+                lowered = validate_title(title)
+            except ValidationError:
+                results[title] = BulkStatus.INVALID
+                continue
+            if lowered in records:
+                # differs from an earlier title of the call only by case
+                results[title] = BulkStatus.CONFLICT
+                continue
+            task = TaskRecord.new(lowered, user, description)
+            task.id = str(task.id)
+            records[lowered] = (title, task)
+            results[title] = BulkStatus.CREATED
+        if not records:
+            return results
+
+        def insert(connection: sqlite3.Connection) -> None:
+            for (existing,) in connection.execute(
+                    f"SELECT title FROM tasks WHERE {IN_TITLES}",
+                    (user, json.dumps(list(records)))
+            ):
+                title, _ = records.pop(existing)
+                results[title] = BulkStatus.CONFLICT
+            connection.executemany(
+                INSERT_TASK,
+                [record_params(task) for _, task in records.values()]
+            )
+            if records:
+                connection.execute(BUMP_VERSION, (user,))
+
+        await self.pool.write(insert)
+        return results
+
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks of the specified user as complete, the status of
+        each title is read in the transaction of the update.
+
+        Args:
+            user (str): The user whose tasks are to be completed.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = dict.fromkeys(titles, BulkStatus.NOT_FOUND)
+        params = (user, json.dumps(list(results)))
+
+        def complete(connection: sqlite3.Connection) -> None:
+            for title, is_completed in connection.execute(
+                    f"SELECT title, is_completed FROM tasks WHERE {IN_TITLES}",
+                    params
+            ):
+                results[title] = (
+                    BulkStatus.ALREADY_COMPLETED if is_completed
+                    else BulkStatus.COMPLETED
+                )
+            if BulkStatus.COMPLETED in results.values():
+                connection.execute(
+                    "UPDATE tasks SET is_completed = 1, completed_on = ? "
+                    f"WHERE {IN_TITLES} AND is_completed = 0",
+                    (to_text(now()),) + params
+                )
+                connection.execute(BUMP_VERSION, (user,))
+
+        await self.pool.write(complete)
+        return results
+
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks of the specified user with one DELETE.
+
+        Args:
+            user (str): The user whose tasks are to be deleted.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = dict.fromkeys(titles, BulkStatus.NOT_FOUND)
+        params = (user, json.dumps(list(results)))
+
+        def delete(connection: sqlite3.Connection) -> None:
+            for (title,) in connection.execute(
+                    f"DELETE FROM tasks WHERE {IN_TITLES} RETURNING title",
+                    params
+            ):
+                results[title] = BulkStatus.DELETED
+            if BulkStatus.DELETED in results.values():
+                connection.execute(BUMP_VERSION, (user,))
+
+        await self.pool.write(delete)
+        return results
+
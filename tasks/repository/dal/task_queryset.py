@@ -1,25 +1,327 @@
-from typing import List
+import re
+import asyncio
+import inspect
+import logging
+import functools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    AsyncIterator
+)
 from datetime import datetime
 
-from .interface import ITaskDataAccessLayer
-from tasks.models import Task
+from beanie import PydanticObjectId
+from beanie.odm.operators.update.general import Set
+from beanie.odm.queries.update import UpdateResponse
+from beanie.odm.utils.parsing import parse_obj
+from pydantic import ValidationError
+from pymongo.errors import (
+    BulkWriteError,
+    DuplicateKeyError,
+    OperationFailure,
+    WriteError
+)
+
+from pymongo import (
+    ASCENDING,
+    DESCENDING,
+    ReturnDocument
+)
+
+from .interface import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskView,
+    TaskOrder,
+    TaskQuery,
+    DEFAULT_TASK_QUERY,
+    TASK_VIEW_FIELDS
+)
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from database.exceptions import DuplicateEntryError
+from utils.batch import WriteBatcher
+
+
+dbLogger = logging.getLogger('core.db')
+
+VIEW_PROJECTION = {field: 1 for field in TASK_VIEW_FIELDS}
+# errors of writes that were refused, they changed nothing
+NOT_WRITTEN = (OperationFailure, DuplicateEntryError, ValidationError)
+
+
+def view_sort(order: TaskOrder) -> List[Tuple[str, int]]:
+    """
+    Returns the sort of a task list, _id breaks ties in the same direction
+    so the order is total and keyset pages follow it.
+    """
+    direction = DESCENDING if order.descending else ASCENDING
+    return [(order.field, direction), ("_id", direction)]
+
+
+def view_filter(user: str, query: TaskQuery) -> Dict[str, Any]:
+    """
+    Translates a task query into a Mongo filter. The conditions follow the
+    prefixes of the indexes of Task: user first, then is_completed, then
+    the created or completed_on range or the title prefix.
+
+    Args:
+        user (str): The user whose tasks are filtered.
+        query (TaskQuery): filters of the task list.
+
+    Returns:
+        Dict[str, Any]: the filter.
+    """
+    conditions: Dict[str, Any] = {"user": user}
+    if query.is_completed is not None:
+        conditions["is_completed"] = query.is_completed
+    for field, start, end in (
+            ("created", query.created_from, query.created_to),
+            ("completed_on", query.completed_from, query.completed_to)
+    ):
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = start
+        if end is not None:
+            bounds["$lt"] = end
+        if bounds:
+            conditions[field] = bounds
+    if query.title_prefix:
+        # an anchored, case-sensitive regex is bounded by the title index
+        conditions["title"] = {
+            "$regex": "^" + re.escape(query.title_prefix.lower())
+        }
+    return conditions
+
+
+async def bump_versions(users: Iterable[str]) -> None:
+    """
+    Increments the version of the tasks of each user, the upsert makes it
+    a single atomic round trip even for the first change. The upserts of
+    the users are sent concurrently.
+    """
+    collection = TaskVersion.get_motor_collection()
+    await asyncio.gather(*(
+        collection.update_one(
+            {"_id": user},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+        for user in set(users)
+    ))
+
+
+def versioned_write(user_of: Callable[[Dict[str, Any]], str]):
+    """
+    Decorates the write methods of TaskDataAccessLayer, which bump the
+    version of the tasks of the user after their write. The ETags of the
+    task reads are made of the version, so a change it misses gets
+    clients 304 for tasks that changed.
+
+    Mongo has no multi-document transaction outside a replica set, so the
+    write and the bump are two round trips. To keep them together the
+    method runs in a task shielded from its caller: a request cancelled
+    between the two, e.g. the client went away, still bumps the version.
+    A write that failed in a way that may have reached the database, like
+    a lost connection, bumps it too, a needless bump only costs clients
+    one full read.
+
+    Left open: a process that dies between the write and the bump, or a
+    bump that cannot reach the database either, leaves the version behind
+    the tasks until the next write of the user.
+
+    Args:
+        user_of (Callable[[Dict[str, Any]], str]): takes the arguments of
+        the method by name and returns the user whose tasks it writes.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            async def write():
+                try:
+                    return await method(self, *args, **kwargs)
+                except NOT_WRITTEN:
+                    raise
+                except Exception:
+                    arguments = signature.bind(self, *args, **kwargs).arguments
+                    await bump_versions([user_of(arguments)])
+                    raise
+            return await asyncio.shield(write())
+        return wrapper
+    return decorator
+
+
+async def insert_tasks(tasks: List[Task]) -> List[Optional[Exception]]:
+    """
+    Inserts the tasks of any users with a single unordered insert_many and
+    bumps the version of every user that got one, it flushes the batches
+    of the task insert batcher.
+
+    Args:
+        tasks (List[Task]): the tasks, with their id already set.
+
+    Returns:
+        List[Optional[Exception]]: the outcome of each task, None if it
+        was inserted, else its error: a DuplicateEntryError if the user
+        already has a task with the title.
+    """
+    errors: List[Optional[Exception]] = [None] * len(tasks)
+    try:
+        await Task.insert_many(tasks, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details["writeErrors"]:
+            task = tasks[error["index"]]
+            if error["code"] == 11000:
+                errors[error["index"]] = DuplicateEntryError(task.title)
+            else:
+                errors[error["index"]] = WriteError(
+                    error["errmsg"],
+                    error["code"],
+                    error
+                )
+    except Exception:
+        # some of the tasks may have been inserted, see versioned_write
+        await bump_versions(task.user for task in tasks)
+        raise
+    await bump_versions(
+        task.user for task, error in zip(tasks, errors) if error is None
+    )
+    return errors
 
 
 class TaskDataAccessLayer(ITaskDataAccessLayer):
     """
     A data access layer class that provides methods to interact with the task database.
+
+    Args:
+        batcher (Optional[WriteBatcher]): merges the inserts of concurrent
+        create_task calls, flushed by insert_tasks. Every call inserts
+        its own task when it is None.
     """
-    async def get_all_tasks(self, user: str) -> List[Task]:
+    def __init__(self, batcher: Optional[WriteBatcher] = None):
+        self.batcher = batcher
+
+    async def get_all_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
+        """
+        Retrieves the tasks of the specified user that match the query.
+        Only the response fields are fetched and they are returned as plain
+        dicts, the response model validates them once.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: A list of tasks associated with the specified user.
+        """
+        cursor = Task.get_motor_collection().find(
+            view_filter(user, query),
+            VIEW_PROJECTION
+        )
+        return await cursor.sort(view_sort(query.order)).to_list(length=None)
+
+    async def get_tasks_page(
+            self,
+            user: str,
+            limit: int,
+            after: Optional[Tuple[Any, str]] = None,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> List[TaskView]:
         """
-        Retrieves all tasks associated with the specified user.
+        Retrieves one page of the tasks of the specified user that match
+        the query, ordered by (sort field, _id). Pages are located by
+        keyset rather than skip, so every page costs the same no matter how
+        deep it is.
 
         Args:
             user (str): The user whose tasks are to be retrieved.
+            limit (int): Maximum number of tasks in the page.
+            after (Optional[Tuple[Any, str]]): (sort field, id) of the
+            last task of the previous page.
+            query (TaskQuery): filters and order of the tasks.
+
+        Returns:
+            List[TaskView]: The tasks of the page.
+
+        Raises:
+            ValueError: If the id in `after` is not a valid ObjectId.
+        """
+        conditions = view_filter(user, query)
+        if after is not None:
+            key, id = after
+            if not PydanticObjectId.is_valid(id):
+                raise ValueError(f"Invalid task id: {id}")
+            field = query.order.field
+            beyond = "$lt" if query.order.descending else "$gt"
+            conditions["$or"] = [
+                {field: {beyond: key}},
+                {field: key, "_id": {beyond: PydanticObjectId(id)}},
+            ]
+        cursor = Task.get_motor_collection().find(conditions, VIEW_PROJECTION)
+        return await cursor.sort(
+            view_sort(query.order)
+        ).limit(limit).to_list(length=None)
+
+    async def iter_tasks(
+            self,
+            user: str,
+            query: TaskQuery = DEFAULT_TASK_QUERY
+    ) -> AsyncIterator[TaskView]:
+        """
+        Yields the tasks of the specified user that match the query one by
+        one as the database cursor returns them, so memory stays bounded
+        for any number of tasks.
+
+        Args:
+            user (str): The user whose tasks are to be retrieved.
+            query (TaskQuery): filters and order of the tasks.
+
+        Yields:
+            TaskView: tasks ordered by (sort field, _id).
+        """
+        cursor = Task.get_motor_collection().find(
+            view_filter(user, query),
+            VIEW_PROJECTION
+        )
+        async for task in cursor.sort(view_sort(query.order)):
+            yield task
+
+    async def get_tasks_version(self, user: str) -> int:
+        """
+        Retrieves the version of the tasks of the specified user, which
+        changes on every create, update and delete of them.
+
+        Args:
+            user (str): The user whose tasks version is to be retrieved.
 
         Returns:
-            List[Task]: A list of tasks associated with the specified user.
+            int: The version, 0 if the tasks of the user never changed.
+        """
+        document = await TaskVersion.get_motor_collection().find_one(
+            {"_id": user},
+            {"version": True}
+        )
+        return document["version"] if document else 0
+
+    async def _bump_version(self, user: str) -> None:
+        """
+        Increments the version of the tasks of the user, the write methods
+        call it through versioned_write.
         """
-        return await Task.find(Task.user == user).to_list()
+        await bump_versions([user])
 
     async def get_task(self, user: str, title: str) -> Task:
         """
@@ -52,17 +354,57 @@ class TaskDataAccessLayer(ITaskDataAccessLayer):
 
         Returns:
             Task: The newly created task.
+
+        Raises:
+            DuplicateEntryError: If the user already has a task with the title.
         """
-        task = Task(
+        if self.batcher is not None:
+            # insert_many skips the Insert event hooks of Task and leaves
+            # the documents without their id, so both are done here
+            task = Task(
+                id=PydanticObjectId(),
+                title=title.lower(),
+                description=description,
+                is_completed=False,
+                user=user,
+                created=datetime.now(),
+                completed_on=None
+            )
+            await self.batcher.submit(task)
+            return task
+        return await self._insert_task(Task(
             title=title,
             description=description,
             is_completed=False,
             user=user,
             created=datetime.now(),
             completed_on=None
-        )
-        return await task.insert()
+        ))
+
+    @versioned_write(lambda arguments: arguments["task"].user)
+    async def _insert_task(self, task: Task) -> Task:
+        """
+        Inserts a task on its own, without the batcher. A caller cancelled
+        while it waits for a batch leaves it, so create_task only makes
+        this part a versioned write.
+
+        Args:
+            task (Task): The task to be inserted.
+
+        Returns:
+            Task: The inserted task.
+
+        Raises:
+            DuplicateEntryError: If the user already has a task with the title.
+        """
+        try:
+            task = await task.insert()
+        except DuplicateKeyError as e:
+            raise DuplicateEntryError(task.title) from e
+        await self._bump_version(task.user)
+        return task
 
+    @versioned_write(lambda arguments: arguments["task"].user)
     async def delete_task(self, task: Task) -> bool:
         """
         Deletes the specified task.
@@ -73,8 +415,14 @@ class TaskDataAccessLayer(ITaskDataAccessLayer):
         Returns:
             bool: True if the task was successfully deleted, False otherwise.
         """
-        return await task.delete()
+        # a task that was already gone leaves the version as it is
+        result = await task.delete()
+        if result is None or not result.deleted_count:
+            return False
+        await self._bump_version(task.user)
+        return True
 
+    @versioned_write(lambda arguments: arguments["task"].user)
     async def update_task(self, task: Task, fields: dict) -> Task:
         """
         Updates the specified task with the specified fields.
@@ -86,4 +434,207 @@ class TaskDataAccessLayer(ITaskDataAccessLayer):
         Returns:
             Task: The updated task.
         """
-        return await task.update({"$set": fields})
+        task = await task.update({"$set": fields})
+        await self._bump_version(task.user)
+        return task
+
+    @versioned_write(lambda arguments: arguments["user"])
+    async def complete_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Atomically marks the task as complete if it is not completed yet,
+        in a single find_one_and_update round trip.
+
+        Args:
+            user (str): The user whose task is to be completed.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The updated task, None if no pending task with
+            the title exists.
+        """
+        task = await Task.find_one(
+            Task.user == user,
+            Task.title == title,
+            Task.is_completed == False
+        ).update(
+            Set({Task.is_completed: True, Task.completed_on: datetime.now()}),
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        if task is not None:
+            await self._bump_version(user)
+        return task
+
+    @versioned_write(lambda arguments: arguments["user"])
+    async def remove_task(self, user: str, title: str) -> Optional[Task]:
+        """
+        Atomically deletes the task in a single find_one_and_delete round
+        trip.
+
+        Args:
+            user (str): The user whose task is to be deleted.
+            title (str): The title of the task.
+
+        Returns:
+            Optional[Task]: The deleted task, None if it does not exist.
+        """
+        document = await Task.get_motor_collection().find_one_and_delete(
+            {"user": user, "title": title}
+        )
+        if document is None:
+            return None
+        await self._bump_version(user)
+        return parse_obj(Task, document)
+
+    @versioned_write(lambda arguments: arguments["user"])
+    async def create_tasks(
+            self,
+            user: str,
+            tasks: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Creates many tasks for the specified user with a single unordered
+        insert_many, titles that already exist are reported as conflicts
+        by the unique (user, title) index.
+
+        Args:
+            user (str): The user for whom the tasks are to be created.
+            tasks (List[Tuple[str, Optional[str]]]): (title, description)
+            of the tasks to be created.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        results = {}
+        documents = []
+        for title, description in tasks:
+            if title in results:
+                # repeated titles in the same call are created once
+                continue
+            # insert_many skips the Insert event hooks of Task, so their
+            # work is done here
+            try:
+                document = Task(
+                    title=title.lower(),
+                    description=description,
+                    is_completed=False,
+                    user=user,
+                    created=datetime.now(),
+                    completed_on=None
+                )
+            except ValidationError:
+                results[title] = BulkStatus.INVALID
+                continue
+            results[title] = BulkStatus.CREATED
+            documents.append((title, document))
+        if not documents:
+            return results
+
+        try:
+            await Task.insert_many(
+                [document for _, document in documents],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # the other documents are inserted all the same, so every
+            # error is reported on its own title
+            for error in e.details["writeErrors"]:
+                title, _ = documents[error["index"]]
+                if error["code"] == 11000:
+                    results[title] = BulkStatus.CONFLICT
+                    continue
+                dbLogger.warning(
+                    "Bulk insert of task %s failed: %s",
+                    title,
+                    error["errmsg"]
+                )
+                results[title] = BulkStatus.FAILED
+        # a CREATED title left means nInserted > 0
+        if BulkStatus.CREATED in results.values():
+            await self._bump_version(user)
+        return results
+
+    @versioned_write(lambda arguments: arguments["user"])
+    async def complete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Marks many tasks of the specified user as complete, with one
+        find_one_and_update per title sent concurrently. The status of
+        each title is read from its own write, so of concurrent calls on
+        the same title only one reports it COMPLETED.
+
+        Args:
+            user (str): The user whose tasks are to be completed.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        collection = Task.get_motor_collection()
+        now = datetime.now()
+        unique_titles = list(dict.fromkeys(titles))
+        # the pipeline keeps completed_on of completed tasks, and the
+        # document before the update tells them from pending ones
+        documents = await asyncio.gather(*(
+            collection.find_one_and_update(
+                {"user": user, "title": title},
+                [{"$set": {
+                    "completed_on": {
+                        "$cond": ["$is_completed", "$completed_on", now]
+                    },
+                    "is_completed": True,
+                }}],
+                projection={"is_completed": True, "_id": False},
+                return_document=ReturnDocument.BEFORE
+            )
+            for title in unique_titles
+        ))
+        results = {}
+        for title, document in zip(unique_titles, documents):
+            if document is None:
+                results[title] = BulkStatus.NOT_FOUND
+            elif document["is_completed"]:
+                results[title] = BulkStatus.ALREADY_COMPLETED
+            else:
+                results[title] = BulkStatus.COMPLETED
+        if BulkStatus.COMPLETED in results.values():
+            await self._bump_version(user)
+        return results
+
+    @versioned_write(lambda arguments: arguments["user"])
+    async def delete_tasks(
+            self,
+            user: str,
+            titles: List[str]
+    ) -> Dict[str, BulkStatus]:
+        """
+        Deletes many tasks of the specified user, with one
+        find_one_and_delete per title sent concurrently. Only the call
+        that deleted a task reports it DELETED.
+
+        Args:
+            user (str): The user whose tasks are to be deleted.
+            titles (List[str]): titles of the tasks.
+
+        Returns:
+            Dict[str, BulkStatus]: outcome of each title.
+        """
+        collection = Task.get_motor_collection()
+        unique_titles = list(dict.fromkeys(titles))
+        documents = await asyncio.gather(*(
+            collection.find_one_and_delete(
+                {"user": user, "title": title},
+                projection={"_id": True}
+            )
+            for title in unique_titles
+        ))
+        results = {
+            title: BulkStatus.NOT_FOUND if document is None
+            else BulkStatus.DELETED
+            for title, document in zip(unique_titles, documents)
+        }
+        if BulkStatus.DELETED in results.values():
+            await self._bump_version(user)
+        return results
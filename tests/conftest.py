@@ -0,0 +1,76 @@
+import os
+import uuid
+from typing import (
+    AsyncIterator,
+    Dict
+)
+
+import pytest
+
+# the settings are read when kernel.settings is first imported
+os.environ.setdefault(
+    'SETTINGS_FILE',
+    os.path.join(os.path.dirname(__file__), 'settings.toml')
+)
+
+from httpx import (  # noqa: E402
+    AsyncClient,
+    ASGITransport
+)
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import database.core  # noqa: E402
+from kernel.application import app  # noqa: E402
+
+
+PASSWORD = 'Test-pass-1'
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[AsyncClient]:
+    """
+    An httpx client bound to kernel.application.app, which runs on a new
+    mongomock-motor database.
+    """
+    mongo_client = AsyncMongoMockClient()
+    database.core.create_client = lambda: mongo_client
+    await app.router.startup()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url='http://test'
+        ) as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+@pytest.fixture
+def username() -> str:
+    """
+    A username of its own for every test, the caches outlive the tests.
+    """
+    return f"user-{uuid.uuid4().hex[:12]}@example.com"
+
+
+async def register(client: AsyncClient, username: str):
+    return await client.post('/v1/auth/register', json={
+        'username': username,
+        'password1': PASSWORD,
+        'password2': PASSWORD,
+    })
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient, username: str) -> Dict[str, str]:
+    await register(client, username)
+    response = await client.post(
+        '/v1/auth/login',
+        data={'username': username, 'password': PASSWORD}
+    )
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,163 @@
+"""
+CompressionMiddleware over a bare ASGI app: which responses are
+compressed, and that every one of them varies on Accept-Encoding.
+"""
+import zlib
+import gzip
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from httpx import (
+    AsyncClient,
+    ASGITransport
+)
+from starlette.applications import Starlette
+from starlette.responses import (
+    Response,
+    StreamingResponse
+)
+from starlette.routing import Route
+
+from kernel.middleware import CompressionMiddleware
+
+
+pytestmark = pytest.mark.anyio
+
+MINIMUM_SIZE = 100
+LARGE_BODY = b'{"title": "some task"}' * 50
+SMALL_BODY = b'{"title": "some task"}'
+CHUNKS = [b'{"title": "task %d"}\n' % i for i in range(20)]
+
+
+async def large(request):
+    return Response(LARGE_BODY, media_type='application/json')
+
+
+async def small(request):
+    return Response(SMALL_BODY, media_type='application/json')
+
+
+async def streamed(request):
+    async def chunks() -> AsyncIterator[bytes]:
+        for chunk in CHUNKS:
+            yield chunk
+
+    return StreamingResponse(chunks(), media_type='application/x-ndjson')
+
+
+async def encoded(request):
+    return Response(
+        gzip.compress(LARGE_BODY),
+        headers={'Content-Encoding': 'gzip'},
+        media_type='application/json'
+    )
+
+
+app = Starlette(routes=[
+    Route('/large', large),
+    Route('/small', small),
+    Route('/streamed', streamed),
+    Route('/encoded', encoded),
+])
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[AsyncClient]:
+    middleware = CompressionMiddleware(
+        app,
+        codings=['gzip'],
+        minimum_size=MINIMUM_SIZE
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=middleware),
+        base_url='http://test'
+    ) as client:
+        yield client
+
+
+async def get(client, url, accept_encoding):
+    return await client.get(url, headers={'Accept-Encoding': accept_encoding})
+
+
+async def test_a_large_body_is_compressed(client):
+    response = await get(client, '/large', 'gzip, deflate')
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < len(LARGE_BODY)
+    # httpx decodes the body
+    assert response.content == LARGE_BODY
+
+
+async def test_a_body_under_the_minimum_size_is_sent_as_it_is(client):
+    response = await get(client, '/small', 'gzip')
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['content-length'] == str(len(SMALL_BODY))
+    assert response.content == SMALL_BODY
+
+
+@pytest.mark.parametrize('accept_encoding', ['gzip;q=0', 'identity', ''])
+async def test_a_coding_the_client_refuses_is_not_used(
+        client,
+        accept_encoding
+):
+    response = await get(client, '/large', accept_encoding)
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.content == LARGE_BODY
+
+
+async def test_a_streamed_body_is_compressed_chunk_by_chunk():
+    # httpx buffers the body of an ASGI app, the messages are read here
+    middleware = CompressionMiddleware(
+        app,
+        codings=['gzip'],
+        minimum_size=MINIMUM_SIZE
+    )
+    messages = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # the client stays connected
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/streamed',
+        'raw_path': b'/streamed',
+        'query_string': b'',
+        'root_path': '',
+        'scheme': 'http',
+        'server': ('test', 80),
+        'headers': [(b'accept-encoding', b'gzip')],
+    }, receive, send)
+
+    start, *bodies = messages
+    headers = dict(start['headers'])
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'vary'] == b'Accept-Encoding'
+    assert b'content-length' not in headers
+    # every chunk decodes as soon as it arrives
+    decoder = zlib.decompressobj(31)
+    decoded = [decoder.decompress(body['body']) for body in bodies]
+    assert decoded[:len(CHUNKS)] == CHUNKS
+    assert b''.join(decoded) == b''.join(CHUNKS)
+    assert decoder.eof
+
+
+async def test_an_encoded_body_is_left_alone(client):
+    response = await get(client, '/encoded', 'gzip')
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'vary' not in response.headers
+    assert response.content == LARGE_BODY
@@ -0,0 +1,524 @@
+"""
+The contract of ITaskDataAccessLayer and IAuthDataAccessLayer, run on
+every storage backend: mongodb (on mongomock-motor), memory and sqlite.
+"""
+import asyncio
+from datetime import datetime
+from typing import (
+    AsyncIterator,
+    List
+)
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import (
+    AsyncCursor,
+    AsyncMongoMockClient,
+    AsyncMongoMockCollection
+)
+from pydantic import ValidationError
+
+from auth.models import User
+from auth.repository.dal import (
+    IAuthDataAccessLayer,
+    AuthDataAccessLayer,
+    MemoryAuthDataAccessLayer,
+    SQLiteAuthDataAccessLayer
+)
+from auth.repository.dal.memory_auth_queryset import user_store
+from database.exceptions import DuplicateEntryError
+from database.sqlite import SQLitePool
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import (
+    ITaskDataAccessLayer,
+    BulkStatus,
+    TaskOrder,
+    TaskQuery,
+    TaskDataAccessLayer,
+    MemoryTaskDataAccessLayer,
+    SQLiteTaskDataAccessLayer
+)
+from tasks.repository.dal.memory_task_queryset import task_store
+
+
+pytestmark = pytest.mark.anyio
+
+BACKENDS = ('mongodb', 'memory', 'sqlite')
+OTHER_USER = 'other@example.com'
+ROUND_TRIPS = {
+    AsyncMongoMockCollection: (
+        'find_one', 'find_one_and_update', 'find_one_and_delete',
+        'insert_one', 'insert_many', 'update_one', 'update_many',
+        'delete_one', 'delete_many'
+    ),
+    AsyncCursor: ('next', '__anext__', 'to_list'),
+}
+
+
+def add_round_trips(monkeypatch) -> None:
+    """
+    mongomock-motor answers without giving the event loop a turn, so
+    concurrent calls never interleave the way they do over a network.
+    Each call yields once before it runs.
+    """
+    for cls, names in ROUND_TRIPS.items():
+        for name in names:
+            async def round_trip(
+                    self,
+                    *args,
+                    _method=getattr(cls, name),
+                    **kwargs
+            ):
+                await asyncio.sleep(0)
+                return await _method(self, *args, **kwargs)
+            monkeypatch.setattr(cls, name, round_trip)
+
+
+@pytest.fixture(params=BACKENDS)
+async def backend(request, tmp_path, monkeypatch) -> AsyncIterator[dict]:
+    """
+    The task and user data access layers of one backend, on empty storage.
+    """
+    if request.param == 'mongodb':
+        add_round_trips(monkeypatch)
+        database = AsyncMongoMockClient()['contract']
+        await init_beanie(
+            database=database,
+            document_models=[User, Task, TaskVersion]
+        )
+        yield {'tasks': TaskDataAccessLayer(), 'users': AuthDataAccessLayer()}
+    elif request.param == 'memory':
+        task_store.clear()
+        user_store.clear()
+        yield {
+            'tasks': MemoryTaskDataAccessLayer(),
+            'users': MemoryAuthDataAccessLayer(),
+        }
+    else:
+        pool = SQLitePool(str(tmp_path / 'contract.sqlite3'), readers=2)
+        await pool.open()
+        try:
+            yield {
+                'tasks': SQLiteTaskDataAccessLayer(pool),
+                'users': SQLiteAuthDataAccessLayer(pool),
+            }
+        finally:
+            await pool.close()
+
+
+@pytest.fixture
+def dal(backend) -> ITaskDataAccessLayer:
+    return backend['tasks']
+
+
+@pytest.fixture
+def users(backend) -> IAuthDataAccessLayer:
+    return backend['users']
+
+
+async def create_all(dal: ITaskDataAccessLayer, user: str, titles: List[str]):
+    for title in titles:
+        await dal.create_task(title, user)
+
+
+def titles_of(views) -> List[str]:
+    return [view['title'] for view in views]
+
+
+# tasks
+
+
+async def test_create_and_get_task(dal, username):
+    task = await dal.create_task('Write Tests', username, 'a description')
+
+    assert task.title == 'write tests'
+    assert task.description == 'a description'
+    assert task.user == username
+    assert task.is_completed is False
+    assert task.completed_on is None
+    assert isinstance(task.created, datetime)
+    found = await dal.get_task(username, 'write tests')
+    assert found.title == 'write tests'
+    assert str(found.id) == str(task.id)
+
+
+async def test_get_missing_task(dal, username):
+    await dal.create_task('some task', username)
+
+    assert await dal.get_task(username, 'missing task') is None
+    assert await dal.get_task(OTHER_USER, 'some task') is None
+
+
+async def test_duplicate_title_raises(dal, username):
+    await dal.create_task('same title', username)
+
+    with pytest.raises(DuplicateEntryError):
+        await dal.create_task('same title', username)
+    with pytest.raises(DuplicateEntryError):
+        await dal.create_task('Same Title', username)
+    # titles are unique per user only
+    await dal.create_task('same title', OTHER_USER)
+
+
+async def test_parallel_duplicate_creates(dal, username):
+    results = await asyncio.gather(
+        *(dal.create_task('same title', username) for _ in range(5)),
+        return_exceptions=True
+    )
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    assert sum(
+        isinstance(result, DuplicateEntryError) for result in results
+    ) == 4
+
+
+async def test_invalid_title_raises(dal, username):
+    with pytest.raises(ValidationError):
+        await dal.create_task('abc', username)
+    with pytest.raises(ValidationError):
+        await dal.create_task('x' * 151, username)
+
+
+async def test_complete_task(dal, username):
+    await dal.create_task('some task', username)
+
+    task = await dal.complete_task(username, 'some task')
+
+    assert task.is_completed is True
+    assert isinstance(task.completed_on, datetime)
+    assert (await dal.get_task(username, 'some task')).is_completed is True
+    assert await dal.complete_task(username, 'some task') is None
+    assert await dal.complete_task(username, 'missing task') is None
+
+
+async def test_remove_task(dal, username):
+    await dal.create_task('some task', username)
+
+    task = await dal.remove_task(username, 'some task')
+
+    assert task.title == 'some task'
+    assert await dal.get_task(username, 'some task') is None
+    assert await dal.remove_task(username, 'some task') is None
+
+
+async def test_update_task(dal, username):
+    task = await dal.create_task('some task', username)
+
+    await dal.update_task(task, {'description': 'changed'})
+
+    found = await dal.get_task(username, 'some task')
+    assert found.description == 'changed'
+
+
+async def test_delete_task(dal, username):
+    task = await dal.create_task('some task', username)
+
+    assert await dal.delete_task(task) is True
+    assert await dal.get_task(username, 'some task') is None
+
+
+# lists
+
+
+async def test_get_all_tasks_in_created_order(dal, username):
+    await create_all(dal, username, ['task bbb', 'task aaa', 'task ccc'])
+    await dal.create_task('not mine', OTHER_USER)
+
+    tasks = await dal.get_all_tasks(username)
+
+    assert titles_of(tasks) == ['task bbb', 'task aaa', 'task ccc']
+    assert set(tasks[0]) >= {
+        '_id', 'title', 'description', 'is_completed', 'user', 'created',
+        'completed_on'
+    }
+    assert await dal.get_all_tasks('nobody@example.com') == []
+
+
+async def test_get_all_tasks_encoded(dal, username):
+    def encode(tasks):
+        return ','.join(titles_of(tasks)).encode()
+
+    assert await dal.get_all_tasks_encoded(username, encode) is None
+    await create_all(dal, username, ['task one', 'task two'])
+    assert await dal.get_all_tasks_encoded(username, encode) == (
+        b'task one,task two'
+    )
+
+
+async def test_iter_tasks(dal, username):
+    await create_all(dal, username, ['task one', 'task two', 'task six'])
+    query = TaskQuery(order=TaskOrder.TITLE)
+
+    streamed = [task async for task in dal.iter_tasks(username, query)]
+
+    assert titles_of(streamed) == titles_of(
+        await dal.get_all_tasks(username, query)
+    )
+    assert titles_of(streamed) == ['task one', 'task six', 'task two']
+
+
+async def test_filters(dal, username):
+    await create_all(
+        dal,
+        username,
+        ['alpha one', 'alpha two', 'beta one', 'gamma|x']
+    )
+    await dal.complete_task(username, 'alpha two')
+    await dal.complete_task(username, 'beta one')
+
+    async def titles(**query) -> List[str]:
+        return titles_of(await dal.get_all_tasks(username, TaskQuery(**query)))
+
+    assert await titles(is_completed=True) == ['alpha two', 'beta one']
+    assert await titles(is_completed=False) == ['alpha one', 'gamma|x']
+    assert await titles(title_prefix='ALP') == ['alpha one', 'alpha two']
+    assert await titles(title_prefix='gamma|') == ['gamma|x']
+    assert await titles(title_prefix='.*') == []
+    assert await titles(is_completed=False, title_prefix='alpha') == [
+        'alpha one'
+    ]
+    assert await titles(order=TaskOrder.TITLE_DESC) == [
+        'gamma|x', 'beta one', 'alpha two', 'alpha one'
+    ]
+    assert await titles(order=TaskOrder.CREATED_DESC) == [
+        'gamma|x', 'beta one', 'alpha two', 'alpha one'
+    ]
+
+
+async def test_time_range_filters(dal, username):
+    await create_all(dal, username, ['task one', 'task two', 'task six'])
+    await dal.complete_task(username, 'task two')
+    tasks = await dal.get_all_tasks(username)
+    middle = tasks[1]
+
+    def expected(keep) -> List[str]:
+        return [task['title'] for task in tasks if keep(task)]
+
+    async def titles(**query) -> List[str]:
+        return titles_of(await dal.get_all_tasks(username, TaskQuery(**query)))
+
+    assert await titles(created_from=middle['created']) == expected(
+        lambda task: task['created'] >= middle['created']
+    )
+    assert await titles(created_to=middle['created']) == expected(
+        lambda task: task['created'] < middle['created']
+    )
+    completed_on = (await dal.get_task(username, 'task two')).completed_on
+    assert await titles(completed_from=completed_on) == ['task two']
+    assert await titles(completed_to=completed_on) == []
+    assert await titles(created_from=datetime(2100, 1, 1)) == []
+
+
+@pytest.mark.parametrize('order', list(TaskOrder))
+async def test_keyset_pages(dal, username, order):
+    await create_all(dal, username, [f"task {i}" for i in range(7)])
+    query = TaskQuery(order=order)
+    expected = titles_of(await dal.get_all_tasks(username, query))
+
+    pages, after = [], None
+    while True:
+        page = await dal.get_tasks_page(username, 3, after, query)
+        if not page:
+            break
+        pages.append(titles_of(page))
+        last = page[-1]
+        after = (last[order.field], str(last['_id']))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == expected
+
+
+async def test_keyset_page_with_invalid_id(dal, username):
+    await dal.create_task('some task', username)
+
+    with pytest.raises(ValueError):
+        await dal.get_tasks_page(username, 3, (datetime.now(), 'not-an-id'))
+
+
+# versions
+
+
+async def test_versions_change_on_every_write(dal, username):
+    versions = [await dal.get_tasks_version(username)]
+
+    async def changed() -> bool:
+        versions.append(await dal.get_tasks_version(username))
+        return versions[-1] != versions[-2]
+
+    assert versions == [0]
+    task = await dal.create_task('task one', username)
+    assert await changed()
+    await dal.get_all_tasks(username)
+    assert not await changed()
+    with pytest.raises(DuplicateEntryError):
+        await dal.create_task('task one', username)
+    assert not await changed()
+    await dal.complete_task(username, 'task one')
+    assert await changed()
+    await dal.update_task(task, {'description': 'changed'})
+    assert await changed()
+    await dal.create_tasks(username, [('task two', None)])
+    assert await changed()
+    await dal.complete_tasks(username, ['task two'])
+    assert await changed()
+    await dal.remove_task(username, 'task one')
+    assert await changed()
+    await dal.delete_tasks(username, ['task two'])
+    assert await changed()
+    assert await dal.get_tasks_version(OTHER_USER) == 0
+
+
+# bulk operations
+
+
+async def test_create_tasks(dal, username):
+    await dal.create_task('task one', username)
+
+    results = await dal.create_tasks(username, [
+        ('Bulk One', 'a description'),
+        ('bulk two', None),
+        ('ab', None),
+        ('task one', None),
+        ('bulk one', None),
+        ('Bulk One', None),
+    ])
+
+    assert results == {
+        'Bulk One': BulkStatus.CREATED,
+        'bulk two': BulkStatus.CREATED,
+        'ab': BulkStatus.INVALID,
+        'task one': BulkStatus.CONFLICT,
+        'bulk one': BulkStatus.CONFLICT,
+    }
+    assert titles_of(await dal.get_all_tasks(username)) == [
+        'task one', 'bulk one', 'bulk two'
+    ]
+    assert (await dal.get_task(username, 'bulk one')).description == (
+        'a description'
+    )
+
+
+async def test_complete_tasks(dal, username):
+    await create_all(dal, username, ['task one', 'task two'])
+    await dal.complete_task(username, 'task two')
+
+    results = await dal.complete_tasks(
+        username,
+        ['task one', 'task two', 'missing task']
+    )
+
+    assert results == {
+        'task one': BulkStatus.COMPLETED,
+        'task two': BulkStatus.ALREADY_COMPLETED,
+        'missing task': BulkStatus.NOT_FOUND,
+    }
+    assert (await dal.get_task(username, 'task one')).is_completed is True
+
+
+async def test_delete_tasks(dal, username):
+    await create_all(dal, username, ['task one', 'task two'])
+
+    results = await dal.delete_tasks(username, ['task one', 'missing task'])
+
+    assert results == {
+        'task one': BulkStatus.DELETED,
+        'missing task': BulkStatus.NOT_FOUND,
+    }
+    assert titles_of(await dal.get_all_tasks(username)) == ['task two']
+
+
+async def test_parallel_bulk_completes_and_deletes(dal, username):
+    titles = ['task one', 'task two', 'task six']
+    await create_all(dal, username, titles)
+
+    completes = await asyncio.gather(
+        *(dal.complete_tasks(username, titles) for _ in range(3))
+    )
+    # every title is completed by exactly one of the calls
+    for title in titles:
+        assert sorted(results[title] for results in completes) == [
+            BulkStatus.ALREADY_COMPLETED,
+            BulkStatus.ALREADY_COMPLETED,
+            BulkStatus.COMPLETED,
+        ]
+
+    deletes = await asyncio.gather(
+        *(dal.delete_tasks(username, titles) for _ in range(3))
+    )
+    for title in titles:
+        assert sorted(results[title] for results in deletes) == [
+            BulkStatus.DELETED,
+            BulkStatus.NOT_FOUND,
+            BulkStatus.NOT_FOUND,
+        ]
+    assert await dal.get_all_tasks(username) == []
+
+
+async def test_repeated_titles_in_a_bulk_call(dal, username):
+    await dal.create_task('task one', username)
+
+    assert await dal.complete_tasks(username, ['task one', 'task one']) == {
+        'task one': BulkStatus.COMPLETED
+    }
+    assert await dal.delete_tasks(username, ['task one', 'task one']) == {
+        'task one': BulkStatus.DELETED
+    }
+
+
+async def test_bulk_operations_of_unknown_user(dal):
+    user = 'nobody@example.com'
+
+    assert await dal.complete_tasks(user, ['task one']) == {
+        'task one': BulkStatus.NOT_FOUND
+    }
+    assert await dal.delete_tasks(user, ['task one']) == {
+        'task one': BulkStatus.NOT_FOUND
+    }
+
+
+# users
+
+
+async def test_create_and_get_user(users, username):
+    user = await users.create_user(username, 'hashed password')
+
+    assert user.username == username
+    found = await users.get_user(username)
+    assert found.username == username
+    assert found.password == 'hashed password'
+    assert str(found.id) == str(user.id)
+    assert await users.get_user('nobody@example.com') is None
+
+
+async def test_duplicate_username_raises(users, username):
+    await users.create_user(username, 'hashed password')
+
+    with pytest.raises(DuplicateEntryError):
+        await users.create_user(username, 'another password')
+
+
+async def test_get_all_users(users, username):
+    await users.create_user(username, 'hashed password')
+    await users.create_user(OTHER_USER, 'hashed password')
+
+    usernames = {user.username for user in await users.get_all_users()}
+
+    assert usernames == {username, OTHER_USER}
+
+
+async def test_update_user(users, username):
+    user = await users.create_user(username, 'hashed password')
+
+    await users.update_user(user, {'password': 'new password'})
+
+    assert (await users.get_user(username)).password == 'new password'
+
+
+async def test_delete_user(users, username):
+    user = await users.create_user(username, 'hashed password')
+
+    assert await users.delete_user(user) is True
+    assert await users.get_user(username) is None
@@ -0,0 +1,64 @@
+"""
+Concurrent creates of the same task or user: the unique indexes let
+exactly one of them through, the others get a 409.
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from .conftest import register
+
+
+CONCURRENCY = 10
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_parallel_duplicate_task_creates(client, auth_headers):
+    responses = await asyncio.gather(*(
+        client.post(
+            '/v1/tasks/',
+            json={'title': 'same title'},
+            headers=auth_headers
+        )
+        for _ in range(CONCURRENCY)
+    ))
+
+    assert Counter(r.status_code for r in responses) == {
+        201: 1,
+        409: CONCURRENCY - 1,
+    }
+    response = await client.get('/v1/tasks/', headers=auth_headers)
+    assert [task['title'] for task in response.json()['tasks']] == [
+        'same title'
+    ]
+
+
+async def test_parallel_duplicate_task_creates_differing_in_case(
+        client,
+        auth_headers
+):
+    # titles are stored lowercase, so these are the same task
+    responses = await asyncio.gather(*(
+        client.post('/v1/tasks/', json={'title': title}, headers=auth_headers)
+        for title in ('Mixed Case', 'mixed case', 'MIXED CASE')
+    ))
+
+    assert sorted(r.status_code for r in responses) == [201, 409, 409]
+
+
+async def test_parallel_duplicate_registrations(client, username):
+    responses = await asyncio.gather(*(
+        register(client, username) for _ in range(CONCURRENCY)
+    ))
+
+    assert Counter(r.status_code for r in responses) == {
+        201: 1,
+        409: CONCURRENCY - 1,
+    }
+    assert all(
+        r.json() == {'detail': 'username already in use'}
+        for r in responses
+        if r.status_code == 409
+    )
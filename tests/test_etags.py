@@ -0,0 +1,179 @@
+"""
+Conditional task reads: the ETag is made of the version of the tasks of
+the user, If-None-Match gets 304 until a write bumps the version.
+"""
+import asyncio
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import AutoReconnect
+
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import TaskDataAccessLayer
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_etag(client, auth_headers, url='/v1/tasks/') -> str:
+    response = await client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+async def is_fresh(client, auth_headers, etag, url='/v1/tasks/') -> bool:
+    response = await client.get(
+        url,
+        headers={**auth_headers, 'If-None-Match': etag}
+    )
+    assert response.status_code in (200, 304)
+    return response.status_code == 304
+
+
+async def test_matching_etag_gets_304(client, auth_headers):
+    await client.post(
+        '/v1/tasks/',
+        json={'title': 'first task'},
+        headers=auth_headers
+    )
+    etag = await get_etag(client, auth_headers)
+
+    response = await client.get(
+        '/v1/tasks/',
+        headers={**auth_headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.content == b''
+    assert await is_fresh(client, auth_headers, etag, '/v1/tasks/first task')
+    assert not await is_fresh(client, auth_headers, 'W/"other-1"')
+
+
+async def test_every_write_changes_the_etag(client, auth_headers):
+    # an empty task list is a 404
+    await client.post(
+        '/v1/tasks/',
+        json={'title': 'kept task'},
+        headers=auth_headers
+    )
+    etags = [await get_etag(client, auth_headers)]
+
+    async def changed() -> bool:
+        assert not await is_fresh(client, auth_headers, etags[-1])
+        etags.append(await get_etag(client, auth_headers))
+        return etags[-1] != etags[-2]
+
+    await client.post(
+        '/v1/tasks/',
+        json={'title': 'first task'},
+        headers=auth_headers
+    )
+    assert await changed()
+    await client.patch('/v1/tasks/first task', headers=auth_headers)
+    assert await changed()
+    await client.delete('/v1/tasks/first task', headers=auth_headers)
+    assert await changed()
+    await client.post(
+        '/v1/tasks/bulk',
+        json={'tasks': [{'title': 'bulk task'}]},
+        headers=auth_headers
+    )
+    assert await changed()
+    await client.post(
+        '/v1/tasks/bulk/complete',
+        json={'titles': ['bulk task']},
+        headers=auth_headers
+    )
+    assert await changed()
+    await client.post(
+        '/v1/tasks/bulk/delete',
+        json={'titles': ['bulk task']},
+        headers=auth_headers
+    )
+    assert await changed()
+    assert len(set(etags)) == len(etags)
+
+
+async def test_failed_write_keeps_the_etag(client, auth_headers):
+    await client.post(
+        '/v1/tasks/',
+        json={'title': 'first task'},
+        headers=auth_headers
+    )
+    etag = await get_etag(client, auth_headers)
+
+    response = await client.post(
+        '/v1/tasks/',
+        json={'title': 'first task'},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 409
+    assert await is_fresh(client, auth_headers, etag)
+
+
+# the write and the version bump are two round trips on mongodb
+
+
+@pytest.fixture
+async def dal() -> TaskDataAccessLayer:
+    await init_beanie(
+        database=AsyncMongoMockClient()['etags'],
+        document_models=[Task, TaskVersion]
+    )
+    return TaskDataAccessLayer()
+
+
+async def test_a_write_cancelled_before_its_bump_still_bumps(
+        dal,
+        username,
+        monkeypatch
+):
+    bumping, release = asyncio.Event(), asyncio.Event()
+    bump_version = TaskDataAccessLayer._bump_version
+
+    async def slow_bump_version(self, user):
+        bumping.set()
+        await release.wait()
+        await bump_version(self, user)
+
+    monkeypatch.setattr(
+        TaskDataAccessLayer,
+        '_bump_version',
+        slow_bump_version
+    )
+    create = asyncio.ensure_future(dal.create_task('first task', username))
+    await bumping.wait()
+
+    # the task is written, the request goes away before the bump
+    create.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await create
+    assert await dal.get_task(username, 'first task') is not None
+    release.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert await dal.get_tasks_version(username) == 1
+
+
+async def test_a_write_of_unknown_outcome_bumps(dal, username, monkeypatch):
+    await dal.create_task('first task', username)
+    update = Task.update
+
+    async def update_and_lose_the_connection(self, *args, **kwargs):
+        await update(self, *args, **kwargs)
+        raise AutoReconnect('connection lost')
+
+    monkeypatch.setattr(Task, 'update', update_and_lose_the_connection)
+    task = await dal.get_task(username, 'first task')
+
+    with pytest.raises(AutoReconnect):
+        await dal.update_task(task, {'description': 'changed'})
+
+    assert await dal.get_tasks_version(username) == 2
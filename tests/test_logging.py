@@ -0,0 +1,24 @@
+"""
+Log files of the server processes: each worker rotates its own files,
+the master keeps the names of logging.toml.
+"""
+from kernel.settings.logging import (
+    load_logging_config,
+    per_process_filenames
+)
+
+
+def test_worker_log_files_have_the_pid():
+    log_conf_dict = load_logging_config()
+
+    per_process_filenames(log_conf_dict, 1234)
+
+    handlers = log_conf_dict['handlers']
+    assert handlers['coreHandler']['filename'] == 'logs/core/core.1234.log'
+    assert 'filename' not in handlers['consoleHandler']
+
+
+def test_master_log_files_are_unchanged():
+    assert load_logging_config()['handlers']['coreHandler']['filename'] == (
+        'logs/core/core.log'
+    )
@@ -0,0 +1,121 @@
+"""
+SingleFlight: concurrent callers of a key share one call, its result and
+its error. A cancelled caller leaves the call to the others.
+"""
+import asyncio
+
+import pytest
+
+from utils.cache import SingleFlight
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Call:
+    """
+    A call that runs until it is released, and counts its starts.
+    """
+    def __init__(self, result='result'):
+        self.result = result
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def flight() -> SingleFlight:
+    return SingleFlight()
+
+
+async def test_concurrent_callers_share_one_call(flight):
+    call = Call()
+    callers = [asyncio.ensure_future(flight.do('key', call)) for _ in range(3)]
+    await settle()
+
+    call.release.set()
+
+    assert await asyncio.gather(*callers) == ['result'] * 3
+    assert call.started == 1
+    assert flight.stats() == {"calls": 1, "shared": 2, "in_flight": 0}
+
+
+async def test_a_cancelled_caller_leaves_the_others_the_result(flight):
+    call = Call()
+    first = asyncio.ensure_future(flight.do('key', call))
+    second = asyncio.ensure_future(flight.do('key', call))
+    await settle()
+
+    first.cancel()
+    await settle()
+    call.release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == 'result'
+    assert not call.cancelled
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_the_last_caller_cancelled_cancels_the_call(flight):
+    call = Call()
+    callers = [asyncio.ensure_future(flight.do('key', call)) for _ in range(2)]
+    await settle()
+
+    for caller in callers:
+        caller.cancel()
+        await settle()
+
+    assert call.cancelled
+    assert all(caller.cancelled() for caller in callers)
+    assert flight.stats()["in_flight"] == 0
+    # the next caller starts a call of its own
+    call.release.set()
+    assert await flight.do('key', call) == 'result'
+    assert call.started == 2
+
+
+async def test_an_error_reaches_every_caller_and_is_not_kept(flight):
+    call = Call(ValueError('failed'))
+    callers = [asyncio.ensure_future(flight.do('key', call)) for _ in range(3)]
+    await settle()
+
+    call.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert flight.stats()["in_flight"] == 0
+    call.result = 'result'
+    assert await flight.do('key', call) == 'result'
+    assert call.started == 2
+
+
+async def test_forgotten_keys_start_a_new_call(flight):
+    call = Call()
+    first = asyncio.ensure_future(flight.do(('get_task', 'user'), call))
+    await settle()
+
+    flight.forget_if(lambda key: key[1] == 'user')
+    second = asyncio.ensure_future(flight.do(('get_task', 'user'), call))
+    await settle()
+    call.release.set()
+
+    assert await asyncio.gather(first, second) == ['result', 'result']
+    assert call.started == 2
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,136 @@
+"""
+The task list cache over SharedCacheBackend, with an in-memory fake of
+the redis client shared by two "workers": each has its own
+ReadThroughCache and its own CachedTaskDataAccessLayer per request.
+"""
+from typing import (
+    Dict,
+    List,
+    Optional
+)
+
+import pytest
+
+from tasks.repository.dal import (
+    CachedTaskDataAccessLayer,
+    MemoryTaskDataAccessLayer,
+    TaskView
+)
+from utils.cache import (
+    ReadThroughCache,
+    SharedCacheBackend
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSharedClient:
+    """
+    The part of redis.asyncio.Redis the shared backend uses, in memory.
+    """
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+def encode(tasks: List[TaskView]) -> bytes:
+    return ','.join(task['title'] for task in tasks).encode()
+
+
+class Worker:
+    """
+    A worker process: its own cache over the shared client, and a new
+    cached data access layer for every request, as the factory makes.
+    """
+    def __init__(self, client: FakeSharedClient, dal: MemoryTaskDataAccessLayer):
+        self.cache = ReadThroughCache(
+            SharedCacheBackend(client, ttl=60, prefix='tasks:')
+        )
+        self.dal = dal
+
+    def request(self) -> CachedTaskDataAccessLayer:
+        return CachedTaskDataAccessLayer(self.dal, self.cache)
+
+    async def read(self, user: str) -> Optional[bytes]:
+        dal = self.request()
+        # the routes read the version for the ETag first
+        await dal.get_tasks_version(user)
+        return await dal.get_all_tasks_encoded(user, encode)
+
+
+@pytest.fixture
+def shared_client() -> FakeSharedClient:
+    return FakeSharedClient()
+
+
+@pytest.fixture
+def dal() -> MemoryTaskDataAccessLayer:
+    return MemoryTaskDataAccessLayer()
+
+
+async def test_a_list_cached_by_one_worker_is_served_to_the_other(
+        shared_client,
+        dal,
+        username
+):
+    first, second = Worker(shared_client, dal), Worker(shared_client, dal)
+    await dal.create_task('first task', username)
+
+    assert await first.read(username) == b'first task'
+    assert await second.read(username) == b'first task'
+    assert first.cache.stats()["misses"] == 1
+    assert second.cache.stats()["hits"] == 1
+
+
+async def test_a_write_on_one_worker_invalidates_the_other(
+        shared_client,
+        dal,
+        username
+):
+    first, second = Worker(shared_client, dal), Worker(shared_client, dal)
+    await dal.create_task('first task', username)
+    assert await first.read(username) == b'first task'
+
+    await second.request().create_task('second task', username)
+
+    assert f'tasks:{username}' not in shared_client.data
+    assert await first.read(username) == b'first task,second task'
+    assert first.cache.stats()["misses"] == 2
+
+
+async def test_an_entry_of_an_older_version_is_read_again(
+        shared_client,
+        dal,
+        username
+):
+    worker = Worker(shared_client, dal)
+    await dal.create_task('first task', username)
+    assert await worker.read(username) == b'first task'
+
+    # a write whose invalidation never reached the shared cache
+    await dal.complete_task(username, 'first task')
+    await dal.create_task('second task', username)
+    assert f'tasks:{username}' in shared_client.data
+
+    assert await worker.read(username) == b'first task,second task'
+    version = await dal.get_tasks_version(username)
+    assert shared_client.data[f'tasks:{username}'] == (
+        version.to_bytes(8, 'big') + b'first task,second task'
+    )
+    assert worker.cache.stats()["invalidations"] == 1
+
+
+async def test_no_tasks_are_not_cached(shared_client, dal, username):
+    worker = Worker(shared_client, dal)
+
+    assert await worker.read(username) is None
+    assert shared_client.data == {}
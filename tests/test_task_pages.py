@@ -0,0 +1,92 @@
+"""
+Pages and streams of GET /v1/tasks/: a cursor only makes sense with a
+page size, and every line of a stream is encoded like the other task
+responses.
+"""
+import json
+
+import pytest
+from fastapi.responses import ORJSONResponse
+
+from kernel.routing import AppRoute
+
+
+pytestmark = pytest.mark.anyio
+
+TITLES = [f"task {i}" for i in range(5)]
+
+
+@pytest.fixture
+async def tasks(client, auth_headers):
+    for title in TITLES:
+        await client.post(
+            '/v1/tasks/',
+            json={'title': title},
+            headers=auth_headers
+        )
+
+
+async def test_pages_follow_the_cursor(client, auth_headers, tasks):
+    titles, params = [], {'limit': 2}
+    while True:
+        response = await client.get(
+            '/v1/tasks/',
+            params=params,
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        page = response.json()
+        titles += [task['title'] for task in page['tasks']]
+        if page['next_cursor'] is None:
+            break
+        params['after'] = page['next_cursor']
+
+    assert titles == TITLES
+
+
+@pytest.mark.parametrize('params', [
+    {'after': 'cursor'},
+    {'after': 'cursor', 'limit': 2, 'stream': True},
+])
+async def test_a_cursor_needs_a_page(client, auth_headers, tasks, params):
+    response = await client.get(
+        '/v1/tasks/',
+        params=params,
+        headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {
+        'detail': 'after needs limit and cannot be used with stream'
+    }
+
+
+async def test_a_stream_has_one_task_per_line(client, auth_headers, tasks):
+    response = await client.get(
+        '/v1/tasks/',
+        params={'stream': True},
+        headers=auth_headers
+    )
+    listed = await client.get('/v1/tasks/', headers=auth_headers)
+
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = response.content.splitlines()
+    assert [json.loads(line) for line in lines] == listed.json()['tasks']
+
+
+async def test_a_stream_uses_the_response_encoder(
+        client,
+        auth_headers,
+        tasks,
+        monkeypatch
+):
+    monkeypatch.setattr(AppRoute, 'encoder_class', ORJSONResponse)
+
+    response = await client.get(
+        '/v1/tasks/',
+        params={'stream': True},
+        headers=auth_headers
+    )
+
+    for line in response.content.splitlines():
+        assert line == ORJSONResponse(json.loads(line)).body
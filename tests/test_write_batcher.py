@@ -0,0 +1,159 @@
+"""
+WriteBatcher: writes submitted within a window are flushed together, each
+caller gets the outcome of its own item.
+"""
+import asyncio
+from typing import List
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from database.exceptions import DuplicateEntryError
+from tasks.models import (
+    Task,
+    TaskVersion
+)
+from tasks.repository.dal import TaskDataAccessLayer
+from tasks.repository.dal.task_queryset import insert_tasks
+from utils.batch import WriteBatcher
+
+
+pytestmark = pytest.mark.anyio
+
+LONG_WINDOW = 60
+
+
+class Flush:
+    """
+    A flush that records its batches and answers each item with its
+    outcome in `outcomes`, the item itself by default.
+    """
+    def __init__(self, outcomes: dict = None, error: Exception = None):
+        self.outcomes = outcomes or {}
+        self.error = error
+        self.batches: List[list] = []
+
+    async def __call__(self, items: list) -> list:
+        self.batches.append(items)
+        if self.error is not None:
+            raise self.error
+        return [self.outcomes.get(item, item) for item in items]
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_a_full_batch_is_flushed_at_once():
+    flush = Flush()
+    batcher = WriteBatcher(flush, max_size=3, window=LONG_WINDOW)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(item) for item in 'abc')),
+        timeout=1
+    )
+
+    assert results == ['a', 'b', 'c']
+    assert flush.batches == [['a', 'b', 'c']]
+
+
+async def test_a_batch_is_flushed_after_the_window():
+    flush = Flush()
+    batcher = WriteBatcher(flush, max_size=100, window=0.01)
+    callers = [asyncio.ensure_future(batcher.submit(item)) for item in 'ab']
+    await settle()
+    assert flush.batches == []
+
+    assert await asyncio.gather(*callers) == ['a', 'b']
+    assert flush.batches == [['a', 'b']]
+    assert batcher.stats() == {
+        "batches": 1,
+        "items": 2,
+        "largest": 2,
+        "pending": 0,
+        "in_flight": 0,
+    }
+
+
+async def test_an_error_outcome_reaches_only_its_caller():
+    flush = Flush(outcomes={'b': DuplicateEntryError('b')})
+    batcher = WriteBatcher(flush, max_size=3, window=LONG_WINDOW)
+
+    results = await asyncio.gather(
+        *(batcher.submit(item) for item in 'abc'),
+        return_exceptions=True
+    )
+
+    assert results[0] == 'a' and results[2] == 'c'
+    assert isinstance(results[1], DuplicateEntryError)
+
+
+async def test_a_caller_cancelled_before_the_flush_leaves_the_batch():
+    flush = Flush()
+    batcher = WriteBatcher(flush, max_size=100, window=LONG_WINDOW)
+    first = asyncio.ensure_future(batcher.submit('a'))
+    second = asyncio.ensure_future(batcher.submit('b'))
+    await settle()
+
+    first.cancel()
+    await settle()
+    await batcher.close()
+
+    assert first.cancelled()
+    assert await second == 'b'
+    assert flush.batches == [['b']]
+
+
+async def test_a_failed_flush_reaches_every_caller():
+    flush = Flush(error=ConnectionError('lost'))
+    batcher = WriteBatcher(flush, max_size=2, window=LONG_WINDOW)
+
+    results = await asyncio.gather(
+        *(batcher.submit(item) for item in 'ab'),
+        return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ConnectionError] * 2
+    assert batcher.stats()["in_flight"] == 0
+
+
+async def test_close_flushes_the_pending_writes():
+    flush = Flush()
+    batcher = WriteBatcher(flush, max_size=100, window=LONG_WINDOW)
+    caller = asyncio.ensure_future(batcher.submit('a'))
+    await settle()
+
+    await batcher.close()
+
+    assert await caller == 'a'
+    assert batcher.stats()["pending"] == 0
+
+
+# batched task inserts, flushed by insert_tasks
+
+
+async def test_batched_creates_report_duplicates_to_their_caller(username):
+    await init_beanie(
+        database=AsyncMongoMockClient()['batching'],
+        document_models=[Task, TaskVersion]
+    )
+    batcher = WriteBatcher(insert_tasks, max_size=4, window=LONG_WINDOW)
+    dal = TaskDataAccessLayer(batcher)
+    await TaskDataAccessLayer().create_task('existing task', username)
+
+    results = await asyncio.gather(*(
+        dal.create_task(title, username)
+        for title in ('task one', 'existing task', 'task two', 'Task One')
+    ), return_exceptions=True)
+
+    assert [type(result).__name__ for result in results] == [
+        'Task', 'DuplicateEntryError', 'Task', 'DuplicateEntryError'
+    ]
+    assert [task['title'] for task in await dal.get_all_tasks(username)] == [
+        'existing task', 'task one', 'task two'
+    ]
+    # one bump for the unbatched create, one for the batch
+    assert await dal.get_tasks_version(username) == 2
+    assert batcher.batches == 1
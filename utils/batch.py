@@ -0,0 +1,122 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple
+)
+
+
+class WriteBatcher:
+    """
+    Merges the writes submitted by concurrent callers into batches, so N
+    writes within `window` seconds cost a single round trip. A batch is
+    flushed `window` seconds after its first write or as soon as it has
+    `max_size` writes, whichever comes first.
+
+    `flush` gets the items of a batch and returns one outcome per item, in
+    the same order: an exception is raised to the caller of its item, any
+    other value is returned to it. If `flush` itself raises, every caller
+    of the batch gets the error.
+
+    A caller cancelled before its batch is flushed leaves the batch, its
+    write is not made. Once flushed, the write goes on without it.
+
+    The pending batch and its timer belong to the event loop that created
+    them, submit must not be called from other threads.
+
+    Attributes:
+        max_size (int): maximum number of writes of a batch.
+        window (float): longest wait of a write for its batch, in seconds.
+        batches (int): number of batches flushed.
+        items (int): number of writes flushed.
+        largest (int): number of writes of the largest batch.
+    """
+    def __init__(
+            self,
+            flush: Callable[[List[Any]], Awaitable[List[Any]]],
+            max_size: int,
+            window: float
+    ):
+        self.flush = flush
+        self.max_size = max_size
+        self.window = window
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Adds the item to the next batch and waits for its outcome.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [
+            (item, future)
+            for item, future in self._pending
+            if not future.cancelled()
+        ]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        try:
+            outcomes = await self.flush([item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def close(self) -> None:
+        """
+        Flushes the pending writes and waits for every batch in flight.
+        """
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest": self.largest,
+            "pending": len(self._pending),
+            "in_flight": len(self._flushes),
+        }
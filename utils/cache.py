@@ -0,0 +1,322 @@
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Optional
+)
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A bounded in-process cache, entries expire after `ttl` seconds and the
+    least recently used entry is evicted once `maxsize` is reached.
+
+    It is not thread-safe, it is meant to be used from the event loop
+    thread only, where no two calls interleave.
+
+    Attributes:
+        maxsize (int): maximum number of entries.
+        ttl (float): default time to live of the entries in seconds.
+        hits (int): number of lookups that found a live entry.
+        misses (int): number of lookups that did not.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """
+        Stores the value, `ttl` overrides the default time to live of the
+        cache for this entry.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers of the same key,
+    so N identical concurrent calls cost a single call.
+
+    Errors are raised to every caller and never remembered. A caller that
+    is cancelled does not cancel the call for the others, the call is only
+    cancelled when its last caller is.
+
+    Attributes:
+        calls (int): number of calls actually made.
+        shared (int): number of callers that joined an in-flight call.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._flights: Dict[Hashable, list] = {}
+
+    async def do(
+            self,
+            key: Hashable,
+            func: Callable[[], Awaitable]
+    ) -> Any:
+        # a flight is [task, number of callers waiting on it]
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = [asyncio.ensure_future(func()), 0]
+            self._flights[key] = flight
+            flight[0].add_done_callback(
+                lambda task: self._land(key, task)
+            )
+        else:
+            self.shared += 1
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if flight[1] == 1 and not task.done():
+                task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        finally:
+            flight[1] -= 1
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Makes the next call of the key start a new flight, callers already
+        waiting keep waiting on the current one.
+        """
+        self._flights.pop(key, None)
+
+    def forget_if(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Forgets the flights of every key the predicate accepts.
+        """
+        for key in [key for key in self._flights if predicate(key)]:
+            del self._flights[key]
+
+    def _land(self, key: Hashable, task: asyncio.Future) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # mark the exception as retrieved in case every caller left
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._flights),
+        }
+
+
+class AsyncTTLCache(TTLCache):
+    """
+    A TTLCache that loads missing entries with a coroutine. Concurrent
+    misses of the same key share one load.
+
+    None results are not cached, so a missing record is looked up again
+    on the next call.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self.invalidations = 0
+        self._flight = SingleFlight()
+
+    async def get_or_load(
+            self,
+            key: Hashable,
+            loader: Callable[[], Awaitable]
+    ) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(
+            self,
+            key: Hashable,
+            loader: Callable[[], Awaitable]
+    ) -> Any:
+        invalidations = self.invalidations
+        value = await loader()
+        # an invalidation during the load may have made the value stale
+        if value is not None and invalidations == self.invalidations:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self.invalidations += 1
+        self.pop(key)
+        self._flight.forget(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **super().stats(),
+            "coalesced": self._flight.shared,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Storage of a ReadThroughCache, it maps string keys to bytes.
+    """
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    An in-process backend over a TTLCache, every worker process has its
+    own entries.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+class SharedCacheBackend(CacheBackend):
+    """
+    A backend over a key-value store shared by every worker process, so an
+    invalidation is seen by all of them at once.
+
+    The client only needs the async get, set (with an `ex` expiration in
+    seconds) and delete of redis.asyncio.Redis, any object with them
+    works, e.g. an in-memory fake.
+    """
+    def __init__(self, client, ttl: float, prefix: str = ''):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(
+            self.prefix + key,
+            value,
+            ex=max(1, int(self.ttl))
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+class ReadThroughCache:
+    """
+    Serves values from a CacheBackend and loads the missing ones with a
+    coroutine, concurrent misses of the same key share one load.
+
+    None results are not cached. An invalidation during a load keeps the
+    loaded value out of the cache, since it may be stale.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._flight = SingleFlight()
+
+    async def get_or_load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        invalidations = self.invalidations
+        value = await loader()
+        if value is not None and invalidations == self.invalidations:
+            await self.backend.set(key, value)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        self.invalidations += 1
+        self._flight.forget(key)
+        await self.backend.delete(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.shared,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,136 @@
+import zlib
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+coreLogger = logging.getLogger('core')
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # a sync flush makes every chunk decodable as soon as it arrives
+        return (
+            self._compressor.compress(data)
+            + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        )
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+# content coding -> (stream class, whether its package is installed)
+CODINGS = {
+    'gzip': (GzipStream, True),
+    'br': (BrotliStream, brotli is not None),
+    'zstd': (ZstdStream, zstandard is not None),
+}
+DEFAULT_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+
+def available_codings(codings: List[str]) -> List[str]:
+    """
+    Returns the codings of the list that can be used, in the same order,
+    and logs the ones whose package is not installed.
+
+    Raises:
+        ValueError: If a coding is unknown
+    """
+    available = []
+    for coding in codings:
+        if coding not in CODINGS:
+            raise ValueError(
+                f"Unknown compression: {coding}, expected one of "
+                f"{', '.join(CODINGS)}"
+            )
+        if CODINGS[coding][1]:
+            available.append(coding)
+        else:
+            coreLogger.warning(
+                "%s compression is disabled, its package is not installed",
+                coding
+            )
+    return available
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parses an Accept-Encoding header into {coding: q value}.
+    """
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate(header: str, codings: List[str]) -> Optional[str]:
+    """
+    Picks the first of the server's codings the client accepts, None when
+    the response should not be compressed.
+
+    Args:
+        header (str): Accept-Encoding of the request
+        codings (List[str]): available codings, in order of preference
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    for coding in codings:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def create_stream(coding: str, level: int = None):
+    stream_class = CODINGS[coding][0]
+    return stream_class(DEFAULT_LEVELS[coding] if level is None else level)
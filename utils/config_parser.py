@@ -1,3 +1,4 @@
+import os
 from typing import Dict, Any
 import tomllib
 import logging
@@ -64,7 +65,7 @@ class TomlConfigParser:
         """
         conf = self._get_inners(category)
         if key:
-            conf = conf.get(key, None)
+            conf = (conf or {}).get(key, default)
         return conf
 
     def _get_inners(self, categories: str|list, config: dict=None):
@@ -85,4 +86,5 @@ class TomlConfigParser:
             return self._get_inners(categories, config)
         return config.get(categories[0])
 
-config = TomlConfigParser('settings.toml')
+# SETTINGS_FILE points at another settings file, e.g. the one of the tests
+config = TomlConfigParser(os.environ.get('SETTINGS_FILE', 'settings.toml'))
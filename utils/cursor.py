@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Tuple,
+    Union
+)
+
+
+def encode_cursor(key: Union[datetime, str], id: str) -> str:
+    """
+    Encodes the position of a document in a (key, _id) ordered list into
+    an opaque cursor.
+
+    Args:
+        key (Union[datetime, str]): sort key of the document, e.g. its
+        creation time or its title
+        id (str): id of the document
+
+    Returns:
+        str: url-safe cursor
+    """
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = f"{key}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(
+        cursor: str,
+        parse_key: Callable[[str], Any] = datetime.fromisoformat
+) -> Tuple[Any, str]:
+    """
+    Decodes a cursor made by encode_cursor.
+
+    Args:
+        cursor (str): the opaque cursor
+        parse_key (Callable[[str], Any]): turns the encoded key back into
+        the sort key, creation times by default
+
+    Returns:
+        Tuple[Any, str]: sort key and id of the document
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        # ids never contain "|", keys such as titles may
+        key, separator, id = base64.urlsafe_b64decode(
+            padded
+        ).decode().rpartition('|')
+        if not separator:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return parse_key(key), id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
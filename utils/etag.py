@@ -0,0 +1,27 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(owner: str, version: int) -> str:
+    """
+    Builds a weak ETag from the owner of a resource and its version, the
+    owner is hashed so responses of different users never share a tag.
+    """
+    digest = hashlib.sha1(owner.encode()).hexdigest()[:12]
+    return f'W/"{digest}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tells whether an If-None-Match header matches the ETag, with the weak
+    comparison GET requests use.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(
+        tag.strip().removeprefix('W/') == opaque
+        for tag in if_none_match.split(',')
+    )
@@ -1,7 +1,116 @@
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor
+)
+from typing import Any, Callable, Dict
+
 from passlib.context import CryptContext
 
+from kernel.settings.auth import (
+    HASH_EXECUTOR,
+    HASH_WORKERS,
+    HASH_MAX_CONCURRENCY
+)
+
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashWorkerPool:
+    """
+    Runs password hashing on a thread or process pool, so the ~250ms of
+    bcrypt work never blocks the event loop.
+
+    At most `max_concurrency` jobs are handed to the pool at once, the rest
+    wait on the event loop and are counted as the queue depth.
+
+    Attributes:
+        waiting (int): jobs waiting for a free slot (queue depth).
+        running (int): jobs being run by the pool.
+        completed (int): jobs finished since startup.
+    """
+    def __init__(
+            self,
+            executor: str = 'thread',
+            workers: int = 4,
+            max_concurrency: int = None
+    ):
+        if executor not in ('thread', 'process'):
+            raise ValueError(
+                f"Unknown hash executor: {executor}, "
+                "expected 'thread' or 'process'"
+            )
+        self.executor_type = executor
+        self.workers = workers
+        self.max_concurrency = max_concurrency or workers
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self._executor = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def executor(self) -> Executor:
+        # created on first use, so importing this module never spawns
+        # threads or processes
+        if self._executor is None:
+            if self.executor_type == 'process':
+                self._executor = ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers,
+                    thread_name_prefix='hash'
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Runs func(*args) on the pool once a slot is free.
+        """
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the queue depth and job counters of the pool.
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = HashWorkerPool(HASH_EXECUTOR, HASH_WORKERS, HASH_MAX_CONCURRENCY)
+
+
 class Hash:
     """
     A class that provides methods to hash and verify passwords.
@@ -17,7 +126,7 @@ class Hash:
         Returns:
             str: The hashed password.
         """
-        return pwd_context.hash(password)
+        return _hash(password)
 
     @staticmethod
     def verify_password(
@@ -36,4 +145,21 @@ class Hash:
             bool: True if the plain password matches the hashed password,
             False otherwise.
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        return _verify(plain_password, hashed_password)
+
+    @staticmethod
+    async def bcrypt_pass_async(password: str) -> str:
+        """
+        Same as bcrypt_pass, but runs on the hash worker pool.
+        """
+        return await hash_pool.run(_hash, password)
+
+    @staticmethod
+    async def verify_password_async(
+            plain_password: str,
+            hashed_password: str
+    ) -> bool:
+        """
+        Same as verify_password, but runs on the hash worker pool.
+        """
+        return await hash_pool.run(_verify, plain_password, hashed_password)